@@ -0,0 +1,80 @@
+"""
+Benchmark del cache de tensores de assets.
+
+Compara, por etapa, el camino completo de ``clasificar_objeto`` (lectura,
+ecualización, gris→RGB + PIL, preprocesado del modelo y forward) con el camino
+que parte del tensor ya cacheado (solo forward).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_cache_tensores --backend pytorch --repeticiones 20
+"""
+
+import argparse
+import os
+import time
+
+import cv2
+from PIL import Image
+
+from vision.vision_system import VisionSystem
+
+ASSETS = [
+    os.path.join('assets', 'objects', 'flor_1.png'),
+    os.path.join('assets', 'objects', 'flor_2.png'),
+    os.path.join('assets', 'objects', 'lata.png'),
+    os.path.join('assets', 'objects', 'tenis.png')
+]
+
+
+def medir(tiempos, etapa, funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    tiempos[etapa] = tiempos.get(etapa, 0.0) + time.perf_counter() - inicio
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del cache de tensores")
+    parser.add_argument("--backend", default="pytorch")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    sistema = VisionSystem(backend=args.backend, usar_prefiltro=False)
+    modelo = sistema.image_classifier
+    if modelo is None or not modelo.soporta_tensores:
+        print(f"El backend '{args.backend}' no trabaja con tensores")
+        return
+
+    sin_cache = {}
+    con_cache = {}
+    total = args.repeticiones * len(ASSETS)
+
+    for _ in range(args.repeticiones):
+        for ruta in ASSETS:
+            imagen = medir(sin_cache, 'lectura', cv2.imread, ruta)
+            mejorada = medir(sin_cache, 'ecualizacion', sistema.ecualizacion_histograma, imagen)
+            imagen_pil = medir(sin_cache, 'gris_rgb_pil', lambda m: Image.fromarray(m).convert('RGB'), mejorada)
+            tensor = medir(sin_cache, 'preprocesado', modelo.preprocesar, [imagen_pil])
+            medir(sin_cache, 'forward', modelo.clasificar_tensor, tensor)
+
+    for ruta in ASSETS:
+        sistema.preparar_asset(ruta)
+    for _ in range(args.repeticiones):
+        for ruta in ASSETS:
+            entrada = medir(con_cache, 'consulta_cache', sistema.preparar_asset, ruta)
+            medir(con_cache, 'forward', modelo.clasificar_tensor, entrada['tensor'])
+
+    print(f"\n📊 Tiempo medio por imagen ({total} clasificaciones, backend {args.backend})")
+    print(f"{'Etapa':<16}{'Sin cache (ms)':>16}{'Con cache (ms)':>16}")
+    for etapa in ['lectura', 'ecualizacion', 'gris_rgb_pil', 'preprocesado', 'consulta_cache', 'forward']:
+        print(f"{etapa:<16}{sin_cache.get(etapa, 0.0) / total * 1000:>16.3f}"
+              f"{con_cache.get(etapa, 0.0) / total * 1000:>16.3f}")
+
+    total_sin = sum(sin_cache.values()) / total * 1000
+    total_con = sum(con_cache.values()) / total * 1000
+    print(f"{'TOTAL':<16}{total_sin:>16.3f}{total_con:>16.3f}")
+    print(f"Ahorro por imagen: {total_sin - total_con:.3f} ms ({(1 - total_con / total_sin) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
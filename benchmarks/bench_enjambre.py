@@ -0,0 +1,108 @@
+"""
+Benchmark del modo enjambre.
+
+Mide el tiempo por frame (actualización vectorizada + dibujado con un solo
+``blits``) según el número de abejas. Con ``--comparar-abejas`` mide también
+el mismo número de objetos ``Abeja`` actualizados uno a uno.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_enjambre --abejas 10 100 500 1000 2000 --frames 300
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from game.constants import *
+from game.grid_model import Mundo
+from game.camara import Camara
+from game.bee_agent import Abeja
+from game.enjambre import Enjambre, rutas_hacia
+
+
+def preparar_mundo(semilla):
+    random.seed(semilla)
+    mundo = Mundo(TAMANO_N)
+    libres = [(celda.r, celda.c) for fila in mundo.grid for celda in fila if celda.tipo != TIPO_OBSTACULO]
+    return mundo, libres
+
+
+def medir_enjambre(pantalla, camara, mundo, rutas, frames):
+    enjambre = Enjambre(rutas)
+    dt = 1.0 / FPS
+    tiempo_actualizar = tiempo_dibujar = 0.0
+    for _ in range(frames):
+        mundo.dibujar(pantalla, camara)
+        inicio = time.perf_counter()
+        enjambre.actualizar(dt)
+        tiempo_actualizar += time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        enjambre.dibujar(pantalla, camara)
+        tiempo_dibujar += time.perf_counter() - inicio
+    return tiempo_actualizar / frames * 1000, tiempo_dibujar / frames * 1000
+
+
+def medir_abejas(pantalla, camara, mundo, rutas, frames):
+    abejas = []
+    for ruta in rutas:
+        abeja = Abeja(mundo, ruta[0])
+        abeja.asignar_ruta(ruta)
+        abeja.detener_sonido_vuelo()
+        abejas.append(abeja)
+    dt = 1.0 / FPS
+    tiempo_actualizar = tiempo_dibujar = 0.0
+    for _ in range(frames):
+        mundo.dibujar(pantalla, camara)
+        inicio = time.perf_counter()
+        for abeja in abejas:
+            abeja.actualizar(dt)
+        tiempo_actualizar += time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for abeja in abejas:
+            abeja.dibujar(pantalla, camara)
+        tiempo_dibujar += time.perf_counter() - inicio
+    return tiempo_actualizar / frames * 1000, tiempo_dibujar / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del modo enjambre")
+    parser.add_argument("--abejas", type=int, nargs="+", default=[1, 10, 100, 500, 1000, 2000])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--comparar-abejas", action="store_true",
+                        help="Medir también objetos Abeja individuales (lento)")
+    args = parser.parse_args()
+
+    pygame.init()
+    pantalla = pygame.display.set_mode((ANCHO_PANTALLA, ALTO_PANTALLA))
+    camara = Camara(ANCHO_PANTALLA, ALTO_PANTALLA, TAMANO_N)
+    mundo, libres = preparar_mundo(args.semilla)
+    meta = libres[-1]
+
+    print(f"\n📊 Tiempo medio por frame ({args.frames} frames, mundo {TAMANO_N}x{TAMANO_N})")
+    cabecera = f"{'Abejas':>8}{'Actualizar (ms)':>18}{'Dibujar (ms)':>15}{'Total (ms)':>13}"
+    if args.comparar_abejas:
+        cabecera += f"{'Abeja x N (ms)':>17}"
+    print(cabecera)
+
+    for cantidad in args.abejas:
+        inicios = [random.choice(libres) for _ in range(cantidad)]
+        rutas = rutas_hacia(mundo, meta, inicios)
+        actualizar, dibujar = medir_enjambre(pantalla, camara, mundo, rutas, args.frames)
+        linea = f"{cantidad:>8}{actualizar:>18.3f}{dibujar:>15.3f}{actualizar + dibujar:>13.3f}"
+        if args.comparar_abejas:
+            actualizar_n, dibujar_n = medir_abejas(pantalla, camara, mundo, rutas, args.frames)
+            linea += f"{actualizar_n + dibujar_n:>17.3f}"
+        print(linea)
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
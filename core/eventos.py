@@ -0,0 +1,116 @@
+"""
+Canal de eventos de progreso (publicar/suscribir).
+
+La búsqueda y la visión publican eventos estructurados (nodos expandidos,
+flores clasificadas, ETA...) y cualquier suscriptor los recibe: la barra
+de progreso de la UI, un archivo de registro o un acumulador de métricas.
+Cada evento es un diccionario con ``tipo``, ``tiempo`` (``perf_counter``)
+y los datos propios del evento.
+
+Sin suscriptores publicar cuesta una consulta a un diccionario; para no
+construir siquiera los datos, el publicador puede preguntar antes con
+``activo(tipo)``. Los suscriptores se llaman en el hilo que publica.
+"""
+
+import json
+import os
+import threading
+import time
+
+TODOS = '*'  # Suscribirse a todos los tipos
+
+
+class CanalEventos:
+    def __init__(self):
+        self._suscriptores = {}  # {tipo: (callback, ...)}; tuplas para iterar sin candado
+        self._candado = threading.Lock()
+
+    def suscribir(self, callback, tipos=None):
+        """
+        Llama a ``callback(evento)`` con los eventos de ``tipos`` (todos si
+        es ``None``). Devuelve una función que cancela la suscripción.
+        """
+        tipos = [TODOS] if tipos is None else list(tipos)
+        with self._candado:
+            for tipo in tipos:
+                self._suscriptores[tipo] = self._suscriptores.get(tipo, ()) + (callback,)
+
+        def cancelar():
+            with self._candado:
+                for tipo in tipos:
+                    restantes = tuple(c for c in self._suscriptores.get(tipo, ()) if c is not callback)
+                    if restantes:
+                        self._suscriptores[tipo] = restantes
+                    else:
+                        self._suscriptores.pop(tipo, None)
+        return cancelar
+
+    def activo(self, tipo):
+        """Si alguien recibiría un evento de ``tipo``."""
+        return tipo in self._suscriptores or TODOS in self._suscriptores
+
+    def publicar(self, tipo, **datos):
+        suscriptores = self._suscriptores
+        if not suscriptores:
+            return
+        destinatarios = suscriptores.get(tipo, ()) + suscriptores.get(TODOS, ())
+        if not destinatarios:
+            return
+        evento = {'tipo': tipo, 'tiempo': time.perf_counter(), **datos}
+        for callback in destinatarios:
+            try:
+                callback(evento)
+            except Exception as e:
+                print(f"⚠ Error en suscriptor de '{tipo}': {e}")
+
+
+class RegistroEventos:
+    """Suscriptor que escribe cada evento como una línea JSON en un archivo."""
+
+    def __init__(self, ruta_archivo):
+        os.makedirs(os.path.dirname(ruta_archivo) or '.', exist_ok=True)
+        self.ruta_archivo = ruta_archivo
+        self.archivo = open(ruta_archivo, 'a', encoding='utf-8')
+        self.candado = threading.Lock()
+
+    def __call__(self, evento):
+        linea = json.dumps(evento, ensure_ascii=False, default=str)
+        with self.candado:
+            self.archivo.write(linea + '\n')
+
+    def cerrar(self):
+        with self.candado:
+            self.archivo.close()
+
+
+class MetricasEventos:
+    """
+    Suscriptor que acumula cuántos eventos llegan de cada tipo y el último de
+    cada uno. Conviene suscribirlo solo a ``TIPOS`` (resúmenes de una búsqueda
+    o de un lote de visión): suscrito a todo, ``activo`` siempre sería cierto
+    y los publicadores construirían los datos de cada evento de progreso.
+    """
+
+    TIPOS = ('busqueda_terminada', 'celdas_clasificadas')
+
+    def __init__(self):
+        self.contadores = {}
+        self.ultimos = {}
+        self.candado = threading.Lock()
+
+    def __call__(self, evento):
+        with self.candado:
+            self.contadores[evento['tipo']] = self.contadores.get(evento['tipo'], 0) + 1
+            self.ultimos[evento['tipo']] = evento
+
+    def resumen(self):
+        with self.candado:
+            return {'contadores': dict(self.contadores), 'ultimos': dict(self.ultimos)}
+
+
+_canal = CanalEventos()
+
+
+def obtener_canal():
+    """Canal de eventos compartido del proceso."""
+    return _canal
@@ -1,6 +1,16 @@
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
 import time
 
+from core.eventos import obtener_canal
+
+PASO_EVENTOS_BUSQUEDA = 256  # Nodos expandidos entre dos eventos de progreso
+# Mundos más pequeños se comparan en el propio proceso: lanzar los procesos
+# (spawn, unas décimas de segundo) cuesta más que las búsquedas
+CELDAS_MINIMAS_PROCESOS = 50 * 50
+
 def reconstruir_ruta(padres, inicio, meta):
     """
     Sigue el diccionario de 'padres' hacia atrás desde la meta
@@ -21,9 +31,11 @@ def bfs_panal(mundo, inicio, meta):
     Búsqueda en Amplitud (BFS) SIN INFORMACIÓN.
     Explora nodo por nodo hasta encontrar la meta.
     Retorna el CAMINO DE EXPLORACIÓN completo (no solo la ruta óptima).
+    ``mundo`` puede ser un ``Mundo`` o una ``InstantaneaMundo``.
     """
     tiempo_inicio = time.time()
     
+    canal = obtener_canal()
     visitados = []  # Lista de nodos visitados EN ORDEN
     cola = deque([inicio])
     padres = {inicio: None}
@@ -38,6 +50,9 @@ def bfs_panal(mundo, inicio, meta):
         # Marcar como visitado
         visitados.append(nodo_actual)
         r_actual, c_actual = nodo_actual
+        if len(visitados) % PASO_EVENTOS_BUSQUEDA == 0 and canal.activo('nodos_expandidos'):
+            canal.publicar('nodos_expandidos', algoritmo='BFS', expandidos=len(visitados),
+                           frontera=len(cola), nuevos=visitados[-PASO_EVENTOS_BUSQUEDA:])
         
         # Si encontramos la meta, DETENERSE
         if nodo_actual == meta:
@@ -46,8 +61,7 @@ def bfs_panal(mundo, inicio, meta):
             return visitados
         
         # Explorar vecinos
-        celda_actual_obj = mundo.grid[r_actual][c_actual]
-        for vecino in mundo.obtener_vecinos_validos(celda_actual_obj):
+        for vecino in mundo.vecinos_de(r_actual, c_actual):
             if vecino not in visitados and vecino not in cola:
                 padres[vecino] = nodo_actual
                 cola.append(vecino)
@@ -60,9 +74,11 @@ def dfs_panal(mundo, inicio, meta):
     Búsqueda en Profundidad (DFS) SIN INFORMACIÓN.
     Explora en profundidad hasta encontrar la meta.
     Retorna el CAMINO DE EXPLORACIÓN completo (no solo la ruta óptima).
+    ``mundo`` puede ser un ``Mundo`` o una ``InstantaneaMundo``.
     """
     tiempo_inicio = time.time()
     
+    canal = obtener_canal()
     visitados = []  # Lista de nodos visitados EN ORDEN
     pila = [inicio]
     padres = {inicio: None}
@@ -77,6 +93,9 @@ def dfs_panal(mundo, inicio, meta):
         # Marcar como visitado
         visitados.append(nodo_actual)
         r_actual, c_actual = nodo_actual
+        if len(visitados) % PASO_EVENTOS_BUSQUEDA == 0 and canal.activo('nodos_expandidos'):
+            canal.publicar('nodos_expandidos', algoritmo='DFS', expandidos=len(visitados),
+                           frontera=len(pila), nuevos=visitados[-PASO_EVENTOS_BUSQUEDA:])
         
         # Si encontramos la meta, DETENERSE
         if nodo_actual == meta:
@@ -85,8 +104,7 @@ def dfs_panal(mundo, inicio, meta):
             return visitados
         
         # Explorar vecinos (en orden inverso para mantener lógica DFS)
-        celda_actual_obj = mundo.grid[r_actual][c_actual]
-        vecinos = mundo.obtener_vecinos_validos(celda_actual_obj)
+        vecinos = mundo.vecinos_de(r_actual, c_actual)
         
         for vecino in reversed(vecinos):
             if vecino not in visitados:
@@ -97,10 +115,17 @@ def dfs_panal(mundo, inicio, meta):
     return visitados  # Si no encuentra meta, devuelve lo explorado
 
 
-def analizar_ruta_con_vision(ruta, mundo, sistema_vision, pantalla, tamano_celda, estadisticas):
+def analizar_ruta_con_vision(ruta, mundo, sistema_vision, pantalla, tamano_celda, estadisticas,
+                             presupuesto_segundos=None, presupuesto_llamadas=None,
+                             prioridad='ruta_final'):
     """
     Analiza cada celda de la ruta encontrada con visión por computadora.
     SOLO analiza las celdas que tienen tipo 'flor' (con imágenes).
+    
+    Con ``presupuesto_segundos`` y/o ``presupuesto_llamadas`` el análisis es
+    "anytime": las flores se ordenan por ``prioridad`` y, al agotarse el
+    presupuesto, las que requieren el modelo se marcan como omitidas (las que
+    ya están en cache se siguen registrando porque no cuestan nada).
     """
     # Contar cuántas flores hay en la ruta
     flores_en_ruta = sum(1 for r, c in ruta if mundo.grid[r][c].tipo == 'flor')
@@ -126,94 +151,307 @@ def analizar_ruta_con_vision(ruta, mundo, sistema_vision, pantalla, tamano_celda
     
     print(f"\n🔬 Iniciando análisis de visión...\n")
     
+    hay_presupuesto = presupuesto_segundos is not None or presupuesto_llamadas is not None
+    inicio_pasada = time.perf_counter()
+    
+    # Las flores sin imagen propia se capturan de la pantalla en un solo lote.
+    # Con presupuesto no: el lote gastaría llamadas sin control, así que esas
+    # celdas pasan una a una por el bucle presupuestado
+    celdas_pantalla = [(r, c) for r, c in ruta
+                       if mundo.grid[r][c].tipo == 'flor' and not mundo.grid[r][c].imagen_original_path]
+    calculadas_pantalla = {}
+    if celdas_pantalla and not hay_presupuesto:
+        calculadas_pantalla = sistema_vision.analizar_celdas_desde_pantalla(
+            mundo, celdas_pantalla, pantalla, tamano_celda)
+    
+    flores = [(r, c) for r, c in ruta if mundo.grid[r][c].tipo == 'flor']
+    estadisticas.flores_en_exploracion = len(flores)
+    
+    if hay_presupuesto:
+        flores = ordenar_flores_por_prioridad(flores, ruta, mundo, sistema_vision, prioridad)
+    
+    tiempo_limite = time.time() + presupuesto_segundos if presupuesto_segundos is not None else None
+    # Solo cuenta lo que costó cada petición: el hilo de precarga también
+    # llama al modelo y no debe gastar el presupuesto de esta búsqueda
+    llamadas_usadas = 0
     flores_analizadas = 0
+    desde_cache = 0
+    desde_pantalla = len(calculadas_pantalla)
+    assets = set()
+    canal = obtener_canal()
+    tiempo_inicio = time.perf_counter()
     
-    for i, (r, c) in enumerate(ruta):
+    for r, c in flores:
         celda = mundo.grid[r][c]
         
-        # SOLO analizar si la celda es de tipo 'flor'
-        if celda.tipo == 'flor':
-            flores_analizadas += 1
+        # Lo que ya está en cache no consume presupuesto
+        resultado_vc = sistema_vision.consultar_cache_celda(mundo, r, c)
+        origen = 'cache'
+        
+        if resultado_vc is None:
+            sin_tiempo = tiempo_limite is not None and time.time() >= tiempo_limite
+            sin_llamadas = presupuesto_llamadas is not None and llamadas_usadas >= presupuesto_llamadas
+            if sin_tiempo or sin_llamadas:
+                estadisticas.registrar_celda_omitida((r, c))
+                continue
             
             # Analizar con visión por computadora
+            origenes = {}
             resultado_vc = sistema_vision.analizar_celda_del_grid(
-                mundo, r, c, pantalla, tamano_celda
-            )
-            
-            # Registrar en estadísticas
-            estadisticas.registrar_celda_analizada(
-                posicion=(r, c),
-                tipo_celda=celda.tipo,
-                es_flor_segun_vision=resultado_vc['es_flor'],
-                etiqueta=resultado_vc['etiqueta'],
-                probabilidad=resultado_vc['probabilidad'],
-                confianza=resultado_vc['confianza']
+                mundo, r, c, pantalla, tamano_celda, origenes
             )
-            
-            # Mostrar progreso
-            if flores_analizadas % 3 == 0 or flores_analizadas == flores_en_ruta:
-                print(f"  Progreso: {flores_analizadas}/{flores_en_ruta} flores analizadas")
+            origen = origenes[(r, c)]
+            llamadas_usadas += origen == 'modelo'
+        
+        flores_analizadas += 1
+        if origen == 'cache':
+            desde_cache += (r, c) not in calculadas_pantalla
+        elif celda.imagen_original_path:
+            assets.add(celda.imagen_original_path)
+        else:
+            desde_pantalla += 1
+        
+        # Registrar en estadísticas
+        estadisticas.registrar_celda_analizada(
+            posicion=(r, c),
+            tipo_celda=celda.tipo,
+            es_flor_segun_vision=resultado_vc['es_flor'],
+            etiqueta=resultado_vc['etiqueta'],
+            probabilidad=resultado_vc['probabilidad'],
+            confianza=resultado_vc['confianza'],
+            origen=origen
+        )
+        
+        # Progreso para quien esté suscrito (UI, registro, métricas)
+        if canal.activo('flores_analizadas'):
+            publicar_progreso_vision(canal, estadisticas.nombre, flores_analizadas,
+                                     len(estadisticas.celdas_omitidas), flores_en_ruta, tiempo_inicio)
+    
+    # Un resumen por pasada, con el mismo formato que ``analizar_celdas_lote``
+    if canal.activo('celdas_clasificadas'):
+        canal.publicar('celdas_clasificadas', celdas=flores_analizadas, desde_cache=desde_cache,
+                       assets=len(assets), desde_pantalla=desde_pantalla,
+                       segundos=time.perf_counter() - inicio_pasada)
+    
+    if estadisticas.celdas_omitidas:
+        print(f"  ⚠ Presupuesto agotado: {len(estadisticas.celdas_omitidas)} flores sin analizar")
 
 
-def ejecutar_busqueda_con_analisis(algoritmo, nombre, mundo, inicio, meta, 
-                                   sistema_vision, pantalla, tamano_celda):
+def publicar_progreso_vision(canal, algoritmo, analizadas, omitidas, total, tiempo_inicio):
+    """Publica un evento 'flores_analizadas' con la ETA estimada a ritmo constante."""
+    transcurrido = time.perf_counter() - tiempo_inicio
+    procesadas = analizadas + omitidas
+    eta = transcurrido / analizadas * (total - procesadas) if analizadas else None
+    canal.publicar('flores_analizadas', algoritmo=algoritmo, analizadas=analizadas,
+                   omitidas=omitidas, total=total, segundos=transcurrido, eta=eta)
+
+
+def ruta_final_desde_exploracion(camino_exploracion, mundo):
     """
-    Ejecuta un algoritmo de búsqueda SIN INFORMACIÓN y luego analiza el camino con visión.
+    Ruta más corta de inicio a meta usando solo las celdas exploradas.
+    El camino de exploración empieza en el inicio y termina en la meta.
+    """
+    if not camino_exploracion:
+        return []
     
-    Flujo:
-    1. Ejecutar algoritmo de búsqueda (BFS o DFS)
-    2. Obtener el CAMINO DE EXPLORACIÓN (no solo ruta óptima)
-    3. Analizar cada flor en el camino con visión por computadora
-    4. Generar estadísticas
+    inicio, meta = camino_exploracion[0], camino_exploracion[-1]
+    explorados = set(camino_exploracion)
+    padres = {inicio: None}
+    cola = deque([inicio])
+    
+    while cola:
+        nodo_actual = cola.popleft()
+        if nodo_actual == meta:
+            return reconstruir_ruta(padres, inicio, meta)
+        
+        r_actual, c_actual = nodo_actual
+        for vecino in mundo.vecinos_de(r_actual, c_actual):
+            if vecino in explorados and vecino not in padres:
+                padres[vecino] = nodo_actual
+                cola.append(vecino)
+    
+    return []
+
+
+def ordenar_flores_por_prioridad(flores, camino_exploracion, mundo, sistema_vision, prioridad):
     """
-    from game.stats_system import EstadisticasAlgoritmo
+    Ordena las flores para el análisis con presupuesto.
     
-    print(f"\n{'='*60}")
-    print(f"🚀 Ejecutando {nombre} (Búsqueda Sin Información)...")
-    print(f"{'='*60}")
+    - 'ruta_final': primero las más cercanas (Manhattan) a la ruta final.
+    - 'no_vistos': primero una celda por cada imagen aún no clasificada, para
+      que cada llamada al modelo descubra un asset nuevo.
+    """
+    if prioridad == 'ruta_final':
+        ruta_final = ruta_final_desde_exploracion(camino_exploracion, mundo) or camino_exploracion
+        
+        def distancia(pos):
+            return min(abs(pos[0] - r) + abs(pos[1] - c) for r, c in ruta_final)
+        
+        return sorted(flores, key=distancia)
+    
+    if prioridad == 'no_vistos':
+        primeras = []
+        resto = []
+        vistos = set()
+        for r, c in flores:
+            ruta_imagen = mundo.grid[r][c].imagen_original_path
+            nuevo = (ruta_imagen not in vistos
+                     and sistema_vision.consultar_cache_celda(mundo, r, c, contar=False) is None)
+            vistos.add(ruta_imagen)
+            (primeras if nuevo else resto).append((r, c))
+        return primeras + resto
+    
+    return flores
+
+
+def buscar_con_estadisticas(algoritmo, nombre, mundo, inicio, meta):
+    """
+    Ejecuta solo el algoritmo, sin imprimir el camino. ``buscar_estrategias``
+    la llama en este proceso o, en los procesos del pool, sobre una
+    ``InstantaneaMundo`` mapeada de memoria compartida (sus eventos se
+    publican en el canal de ese proceso).
+    Devuelve (camino de exploración, estadísticas sin visión).
+    """
+    from game.stats_system import EstadisticasAlgoritmo
     
     estadisticas = EstadisticasAlgoritmo(nombre)
     
-    # Paso 1: Ejecutar el algoritmo de búsqueda
     tiempo_inicio = time.time()
+    camino_exploracion = algoritmo(mundo, inicio, meta)
+    estadisticas.tiempo_ejecucion = time.time() - tiempo_inicio
+    obtener_canal().publicar('busqueda_terminada', algoritmo=nombre,
+                             nodos=len(camino_exploracion or []),
+                             segundos=estadisticas.tiempo_ejecucion)
     
-    if nombre == "BFS":
-        camino_exploracion = bfs_panal(mundo, inicio, meta)
-    elif nombre == "DFS":
-        camino_exploracion = dfs_panal(mundo, inicio, meta)
+    if camino_exploracion:
+        estadisticas.longitud_ruta = len(camino_exploracion)
+        estadisticas.ruta_completa = camino_exploracion
     else:
-        camino_exploracion = []
+        estadisticas.exito = False
+    
+    return camino_exploracion, estadisticas
+
+
+def _buscar_en_proceso(algoritmo, nombre, descriptor, inicio, meta):
+    """Proceso del pool de comparación: mapea la instantánea compartida y busca."""
+    from game.grid_model import InstantaneaMundo
+    
+    mundo = InstantaneaMundo.desde_memoria_compartida(descriptor)
+    try:
+        return buscar_con_estadisticas(algoritmo, nombre, mundo, inicio, meta)
+    finally:
+        mundo.liberar()
+
+
+def _cpus_disponibles():
+    """CPUs que puede usar este proceso (la afinidad puede dejar menos que ``cpu_count``)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def buscar_estrategias(estrategias, mundo, inicio, meta, max_procesos=None):
+    """
+    Ejecuta las búsquedas de ``estrategias`` [(nombre, función)] sobre la
+    instantánea ``mundo`` y devuelve [(nombre, camino, estadísticas)] en el
+    orden de ``estrategias``.
+    
+    Las búsquedas son Python puro y un pool de hilos no las aceleraría (GIL),
+    así que con varias estrategias y un mundo grande se reparten entre
+    procesos: los buffers de la instantánea se publican una vez en memoria
+    compartida y cada proceso los mapea sin copiarlos. Las funciones deben
+    poder importarse desde su módulo (picklables). Los eventos de progreso
+    de los procesos no llegan al canal de este.
+    """
+    procesos = min(max_procesos or _cpus_disponibles(), len(estrategias))
+    if procesos < 2 or mundo.N * mundo.N < CELDAS_MINIMAS_PROCESOS:
+        return [(nombre,) + buscar_con_estadisticas(algoritmo, nombre, mundo, inicio, meta)
+                for nombre, algoritmo in estrategias]
     
-    tiempo_busqueda = time.time() - tiempo_inicio
+    descriptor = mundo.compartir()
+    try:
+        # spawn: el juego tiene hilos vivos (precarga) y fork podría heredar candados tomados
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+            futuros = [(nombre, pool.submit(_buscar_en_proceso, algoritmo, nombre, descriptor, inicio, meta))
+                       for nombre, algoritmo in estrategias]
+            return [(nombre,) + futuro.result() for nombre, futuro in futuros]
+    finally:
+        mundo.liberar(unlink=True)
+
+
+def imprimir_exploracion(nombre, camino_exploracion, estadisticas):
+    """
+    Muestra el resultado de la búsqueda. El camino completo ya no se imprime:
+    se publica como evento 'camino_exploracion' (p. ej. para el registro).
+    """
+    print(f"\n{'='*60}")
+    print(f"🚀 Ejecutando {nombre} (Búsqueda Sin Información)...")
+    print(f"{'='*60}")
     
     if not camino_exploracion:
         print(f"❌ No se encontró camino a la meta")
-        estadisticas.exito = False
-        estadisticas.tiempo_ejecucion = tiempo_busqueda
-        return camino_exploracion, estadisticas
+        return
     
     print(f"✓ Exploración completada: {len(camino_exploracion)} nodos visitados")
-    print(f"✓ Tiempo de búsqueda: {tiempo_busqueda:.4f}s")
+    print(f"✓ Tiempo de búsqueda: {estadisticas.tiempo_ejecucion:.4f}s")
     
-    # Imprimir el camino de exploración completo
-    print(f"\n📍 CAMINO DE EXPLORACIÓN (Coordenadas):")
-    print("=" * 60)
-    print("La abeja explorará en este orden hasta encontrar la meta:\n")
-    
-    # Imprimir en líneas de 10 coordenadas
-    for i in range(0, len(camino_exploracion), 10):
-        linea_coords = []
-        for j in range(i, min(i + 10, len(camino_exploracion))):
-            r, c = camino_exploracion[j]
-            linea_coords.append(f"({r},{c})")
-        print(f"  {' → '.join(linea_coords)}")
+    print(f"✓ Inicio: {camino_exploracion[0]} | Meta: {camino_exploracion[-1]}")
+    obtener_canal().publicar('camino_exploracion', algoritmo=nombre, camino=camino_exploracion)
+
+
+def ejecutar_busqueda(algoritmo, nombre, mundo, inicio, meta):
+    """
+    Paso de búsqueda de ``ejecutar_busqueda_con_analisis``: ejecuta el
+    algoritmo, muestra el camino y devuelve (camino, estadísticas sin visión).
+    """
+    camino_exploracion, estadisticas = buscar_con_estadisticas(algoritmo, nombre, mundo, inicio, meta)
+    imprimir_exploracion(nombre, camino_exploracion, estadisticas)
+    return camino_exploracion, estadisticas
+
+
+def imprimir_resumen_analisis(estadisticas):
+    """Muestra el resumen de búsqueda + visión de un algoritmo."""
+    print(f"\n📊 RESUMEN DE ANÁLISIS ({estadisticas.nombre}):")
+    print(f"  Tiempo total: {estadisticas.tiempo_ejecucion + estadisticas.tiempo_analisis_vision:.4f}s")
+    print(f"  Nodos explorados: {estadisticas.longitud_ruta}")
+    print(f"  Flores analizadas: {estadisticas.celdas_analizadas}")
+    if estadisticas.es_cobertura_parcial():
+        print(f"  Cobertura VC: {estadisticas.calcular_cobertura_vision():.1f}% "
+              f"({len(estadisticas.celdas_omitidas)} omitidas)")
+    print(f"  Flores confirmadas (VC): {estadisticas.flores_detectadas_vision}")
+    print(f"  Imágenes no reconocidas: {estadisticas.no_flores}")
+    print(f"  Score: {estadisticas.calcular_score()}")
+    if estadisticas.prefiltro.get('consultas', 0) > 0:
+        print(f"  Prefiltro: {estadisticas.prefiltro['resueltas']} resueltas, "
+              f"{estadisticas.prefiltro['escaladas']} escaladas al ViT "
+              f"({estadisticas.prefiltro['tasa_escalado']:.1f}%)")
+        if estadisticas.prefiltro.get('tiempo_ahorrado') is not None:
+            print(f"  Tiempo VC ahorrado (estimado): {estadisticas.prefiltro['tiempo_ahorrado']:.4f}s")
+
+
+def ejecutar_busqueda_con_analisis(algoritmo, nombre, mundo, inicio, meta, 
+                                   sistema_vision, pantalla, tamano_celda,
+                                   presupuesto_segundos=None, presupuesto_llamadas=None,
+                                   prioridad='ruta_final'):
+    """
+    Ejecuta un algoritmo de búsqueda SIN INFORMACIÓN y luego analiza el camino con visión.
     
-    print("=" * 60)
-    print(f"Total: {len(camino_exploracion)} nodos explorados")
-    print(f"Inicio: {camino_exploracion[0]} | Meta: {camino_exploracion[-1]}")
+    Flujo:
+    1. Ejecutar algoritmo de búsqueda (BFS o DFS)
+    2. Obtener el CAMINO DE EXPLORACIÓN (no solo ruta óptima)
+    3. Analizar cada flor en el camino con visión por computadora
+    4. Generar estadísticas
+    """
+    # Paso 1: Ejecutar el algoritmo de búsqueda
+    camino_exploracion, estadisticas = ejecutar_busqueda(algoritmo, nombre, mundo, inicio, meta)
+    if not camino_exploracion:
+        return camino_exploracion, estadisticas
     
     # Paso 2: Analizar el camino con visión por computadora
     tiempo_inicio_analisis = time.time()
+    prefiltro_antes = sistema_vision.resumen_prefiltro()
+    sistema_vision.instrumentacion.reiniciar()
     
     analizar_ruta_con_vision(
         ruta=camino_exploracion,
@@ -221,25 +459,140 @@ def ejecutar_busqueda_con_analisis(algoritmo, nombre, mundo, inicio, meta,
         sistema_vision=sistema_vision,
         pantalla=pantalla,
         tamano_celda=tamano_celda,
-        estadisticas=estadisticas
+        estadisticas=estadisticas,
+        presupuesto_segundos=presupuesto_segundos,
+        presupuesto_llamadas=presupuesto_llamadas,
+        prioridad=prioridad
     )
     
     tiempo_analisis = time.time() - tiempo_inicio_analisis
     
     # Paso 3: Completar estadísticas
-    estadisticas.tiempo_ejecucion = tiempo_busqueda
     estadisticas.tiempo_analisis_vision = tiempo_analisis
-    estadisticas.longitud_ruta = len(camino_exploracion)
-    estadisticas.ruta_completa = camino_exploracion
+    estadisticas.prefiltro = sistema_vision.resumen_prefiltro(desde=prefiltro_antes)
+    estadisticas.instrumentacion_vision = sistema_vision.instrumentacion.instantanea()
     estadisticas.exito = True
     
     # Mostrar resumen
-    print(f"\n📊 RESUMEN DE ANÁLISIS:")
-    print(f"  Tiempo total: {tiempo_busqueda + tiempo_analisis:.4f}s")
-    print(f"  Nodos explorados: {len(camino_exploracion)}")
-    print(f"  Flores analizadas: {estadisticas.celdas_analizadas}")
-    print(f"  Flores confirmadas (VC): {estadisticas.flores_detectadas_vision}")
-    print(f"  Imágenes no reconocidas: {estadisticas.no_flores}")
-    print(f"  Score: {estadisticas.calcular_score()}")
+    imprimir_resumen_analisis(estadisticas)
+    
+    return camino_exploracion, estadisticas
+
+
+def ejecutar_comparacion_con_analisis(estrategias, mundo, inicio, meta,
+                                      sistema_vision, pantalla, tamano_celda,
+                                      presupuesto_segundos=None, presupuesto_llamadas=None,
+                                      tamano_lote=16, max_procesos=None):
+    """
+    Modo comparación sin trabajo de visión repetido.
+    
+    1. Ejecuta las búsquedas de todas las ``estrategias`` [(nombre, función)]
+       sobre una instantánea de solo lectura del mundo, en paralelo en hasta
+       ``max_procesos`` procesos si el mundo es grande (``buscar_estrategias``).
+       Los resultados se recogen en el orden de ``estrategias``, no en el de
+       finalización.
+    2. Une las flores de todos los caminos de exploración.
+    3. Clasifica esa unión una sola vez, en lotes de ``tamano_lote`` (el
+       presupuesto, si lo hay, se comprueba entre lotes).
+    4. Asigna a cada algoritmo los resultados compartidos de sus flores.
+    
+    Devuelve ([(nombre, camino, estadisticas)], info_vision_compartida); la
+    información incluye el tiempo propio de cada estrategia y el de pared.
+    """
+    tiempo_inicio_pared = time.time()
+    instantanea = mundo.instantanea()
+    resultados = buscar_estrategias(estrategias, instantanea, inicio, meta, max_procesos)
+    
+    for nombre, camino, estadisticas in resultados:
+        imprimir_exploracion(nombre, camino, estadisticas)
+    
+    # Unión de flores en orden de primera aparición
+    flores_por_algoritmo = {}
+    union = {}
+    for nombre, camino, _ in resultados:
+        flores = [(r, c) for r, c in camino if instantanea.tipo_en(r, c) == 'flor']
+        flores_por_algoritmo[nombre] = flores
+        for pos in flores:
+            union[pos] = True
+    union = list(union)
+    total_individual = sum(len(flores) for flores in flores_por_algoritmo.values())
+    
+    print(f"\n🔬 Visión compartida: {len(union)} flores únicas "
+          f"(frente a {total_individual} analizando cada algoritmo por separado)")
+    
+    tiempo_inicio_analisis = time.time()
+    prefiltro_antes = sistema_vision.resumen_prefiltro()
+    sistema_vision.instrumentacion.reiniciar()
+    
+    tiempo_limite = time.time() + presupuesto_segundos if presupuesto_segundos is not None else None
+    consumo = {'llamadas_modelo': 0}  # Llamadas de estos lotes, sin las de la precarga
+    resultados_vision = {}
+    canal = obtener_canal()
+    tiempo_inicio_lotes = time.perf_counter()
+    
+    for i in range(0, len(union), tamano_lote):
+        if tiempo_limite is not None and time.time() >= tiempo_limite:
+            break
+        if presupuesto_llamadas is not None and consumo['llamadas_modelo'] >= presupuesto_llamadas:
+            break
+        resultados_vision.update(
+            sistema_vision.analizar_celdas_lote(mundo, union[i:i + tamano_lote], pantalla, tamano_celda,
+                                                consumo)
+        )
+        if canal.activo('flores_analizadas'):
+            publicar_progreso_vision(canal, 'compartida', len(resultados_vision), 0,
+                                     len(union), tiempo_inicio_lotes)
+    
+    tiempo_analisis = time.time() - tiempo_inicio_analisis
+    prefiltro = sistema_vision.resumen_prefiltro(desde=prefiltro_antes)
+    instrumentacion = sistema_vision.instrumentacion.instantanea()
+    
+    # Coste medio por flor única, para repartir el tiempo y estimar el ahorro
+    tiempo_por_flor = tiempo_analisis / len(resultados_vision) if resultados_vision else 0.0
+    
+    for nombre, camino, estadisticas in resultados:
+        if not camino:
+            continue
+        
+        flores = flores_por_algoritmo[nombre]
+        estadisticas.flores_en_exploracion = len(flores)
+        for r, c in flores:
+            if (r, c) not in resultados_vision:
+                estadisticas.registrar_celda_omitida((r, c))
+                continue
+            resultado_vc, origen = resultados_vision[(r, c)]
+            estadisticas.registrar_celda_analizada(
+                posicion=(r, c),
+                tipo_celda='flor',
+                es_flor_segun_vision=resultado_vc['es_flor'],
+                etiqueta=resultado_vc['etiqueta'],
+                probabilidad=resultado_vc['probabilidad'],
+                confianza=resultado_vc['confianza'],
+                origen=origen
+            )
+        
+        estadisticas.tiempo_analisis_vision = tiempo_por_flor * estadisticas.celdas_analizadas
+        estadisticas.prefiltro = prefiltro
+        estadisticas.instrumentacion_vision = instrumentacion
+        estadisticas.exito = True
+        imprimir_resumen_analisis(estadisticas)
+    
+    celdas_repetidas = total_individual - len(union)
+    info_vision_compartida = {
+        'flores_unicas': len(union),
+        'flores_por_algoritmo': {nombre: len(f) for nombre, f in flores_por_algoritmo.items()},
+        'celdas_repetidas': celdas_repetidas,
+        'tiempo_vision_total': tiempo_analisis,
+        'tiempo_vision_ahorrado': celdas_repetidas * tiempo_por_flor,
+        'tiempos_por_estrategia': {
+            nombre: estadisticas.tiempo_ejecucion + estadisticas.tiempo_analisis_vision
+            for nombre, _, estadisticas in resultados
+        },
+        'tiempo_pared': time.time() - tiempo_inicio_pared
+    }
+    print(f"\n♻ Visión compartida: {celdas_repetidas} análisis repetidos evitados "
+          f"(~{info_vision_compartida['tiempo_vision_ahorrado']:.4f}s ahorrados)")
+    print(f"⏱ Tiempo de pared de la comparación: {info_vision_compartida['tiempo_pared']:.4f}s "
+          f"(suma por estrategia: {sum(info_vision_compartida['tiempos_por_estrategia'].values()):.4f}s)")
     
-    return camino_exploracion, estadisticas
\ No newline at end of file
+    return resultados, info_vision_compartida
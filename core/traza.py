@@ -0,0 +1,338 @@
+"""
+Trazas binarias de exploración.
+
+Una traza guarda todo lo necesario para volver a mostrar una búsqueda ya
+hecha sin repetir la búsqueda ni el análisis de visión: el orden de
+exploración, el padre de cada nodo, el resultado de visión de cada flor,
+los tiempos medidos y el propio mundo. Se reproduce con ``reproducir_traza``.
+Los mundos son aleatorios y no se guardan en otro sitio, así que la traza
+lleva los buffers de su instantánea (tipos, índice de ruta y rutas de las
+flores, unos pocos KB comprimidos) para poder restaurarlo tras reiniciar.
+
+Formato::
+
+    MAGIA (8 bytes) | huella del mundo (16 bytes) | cuerpo comprimido con zlib
+
+El cuerpo, en orden:
+
+- nombre del algoritmo, N, tiempos (2 x float64), éxito, flores en exploración
+- orden de exploración: índices lineales ``fila * N + columna`` como
+  diferencias con el anterior, en zigzag + varint (casi todas ocupan 1 byte)
+- padres: dirección desde el padre de cada nodo salvo el primero, en 2 bits
+- tabla de cadenas (etiquetas, confianza y origen de visión)
+- visión: posición en el orden (diferencias zigzag varint), índices en la
+  tabla de cadenas, ``es_flor`` en bits y probabilidades en float32
+- flores omitidas por presupuesto: posiciones en el orden (zigzag varint)
+- mundo: ``tipos`` (N x N uint8), ``indice_ruta`` (N x N int16) y las
+  rutas de las flores
+
+Las trazas ``BEETRZ01`` (sin mundo) se siguen leyendo; su 'mundo' es ``None``.
+
+La huella va fuera de la parte comprimida para poder elegir la traza de un
+mundo sin descomprimir nada.
+"""
+
+import hashlib
+import io
+import struct
+import zlib
+
+import numpy as np
+
+MAGIA = b'BEETRZ02'
+MAGIAS_LEGIBLES = (MAGIA, b'BEETRZ01')
+TAMANO_HUELLA = 16
+
+# Códigos de 2 bits: dirección del padre al nodo, en el orden de obtener_vecinos_validos
+DIRECCIONES = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def huella_mundo(mundo):
+    """Resumen de 16 bytes de los tipos y las imágenes de todas las celdas."""
+    instantanea = mundo.instantanea()
+    resumen = hashlib.blake2b(digest_size=TAMANO_HUELLA)
+    resumen.update(struct.pack('<I', instantanea.N))
+    resumen.update(instantanea.tipos.tobytes())
+    rutas = np.array([''] + list(instantanea.rutas_flores), dtype=object)
+    resumen.update('\n'.join(rutas[instantanea.indice_ruta.ravel() + 1]).encode('utf-8'))
+    return resumen.digest()
+
+
+# --- Varints (vectorizados con NumPy) ---
+
+def _zigzag(valores):
+    valores = np.asarray(valores, dtype=np.int64)
+    return ((valores << 1) ^ (valores >> 63)).astype(np.uint64)
+
+
+def _deszigzag(valores):
+    valores = np.asarray(valores, dtype=np.uint64)
+    return (valores >> np.uint64(1)).astype(np.int64) ^ -(valores & np.uint64(1)).astype(np.int64)
+
+
+def codificar_varints(valores):
+    """Enteros no negativos en varint (7 bits por byte, el bit alto indica que sigue)."""
+    valores = np.asarray(valores, dtype=np.uint64)
+    if len(valores) == 0:
+        return b''
+    max_grupos = max(1, -(-int(valores.max()).bit_length() // 7))
+    desplazamientos = np.arange(max_grupos, dtype=np.uint64) * np.uint64(7)
+    grupos = ((valores[:, None] >> desplazamientos) & np.uint64(0x7f)).astype(np.uint8)
+    longitudes = np.ones(len(valores), dtype=np.int64)
+    for k in range(1, max_grupos):
+        longitudes += valores >> np.uint64(7 * k) > 0
+    columnas = np.arange(max_grupos)
+    grupos[columnas < (longitudes - 1)[:, None]] |= 0x80
+    return grupos[columnas < longitudes[:, None]].tobytes()
+
+
+def decodificar_varints(datos):
+    bytes_ = np.frombuffer(datos, dtype=np.uint8)
+    if len(bytes_) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    fin = (bytes_ & 0x80) == 0
+    inicios = np.flatnonzero(np.concatenate(([True], fin[:-1])))
+    numero = np.cumsum(np.concatenate(([0], fin[:-1])))
+    posicion = np.arange(len(bytes_)) - inicios[numero]
+    partes = (bytes_ & 0x7f).astype(np.uint64) << (posicion * 7).astype(np.uint64)
+    return np.add.reduceat(partes, inicios)
+
+
+def _escribir_varint(flujo, valor):
+    flujo.write(codificar_varints([valor]))
+
+
+def _leer_varint(flujo):
+    valor = desplazamiento = 0
+    while True:
+        byte = flujo.read(1)[0]
+        valor |= (byte & 0x7f) << desplazamiento
+        if byte < 0x80:
+            return valor
+        desplazamiento += 7
+
+
+def _escribir_bloque(flujo, datos):
+    _escribir_varint(flujo, len(datos))
+    flujo.write(datos)
+
+
+def _leer_bloque(flujo):
+    return flujo.read(_leer_varint(flujo))
+
+
+def _escribir_cadena(flujo, texto):
+    _escribir_bloque(flujo, texto.encode('utf-8'))
+
+
+def _leer_cadena(flujo):
+    return _leer_bloque(flujo).decode('utf-8')
+
+
+def _deltas(valores):
+    valores = np.asarray(valores, dtype=np.int64)
+    return codificar_varints(_zigzag(np.diff(valores, prepend=0)))
+
+
+def _desde_deltas(datos):
+    return np.cumsum(_deszigzag(decodificar_varints(datos)))
+
+
+# --- Padres ---
+
+def codigos_padres(orden, N):
+    """
+    Dirección desde el padre de cada nodo del orden (salvo el primero). En
+    BFS y DFS el padre de un nodo es el vecino que se visitó antes que él y
+    lo descubrió primero, es decir, el vecino visitado más temprano.
+    """
+    filas, columnas = np.divmod(orden, N)
+    indice_visita = np.full((N + 2, N + 2), np.iinfo(np.int64).max, dtype=np.int64)
+    indice_visita[filas + 1, columnas + 1] = np.arange(len(orden))
+
+    # Índice de visita de cada vecino del nodo, en el orden de DIRECCIONES (padre = nodo - dirección)
+    vecinos = np.stack([indice_visita[filas + 1 - dr, columnas + 1 - dc] for dr, dc in DIRECCIONES], axis=1)
+    codigos = np.argmin(vecinos, axis=1).astype(np.uint8)[1:]
+    if np.any(vecinos[1:].min(axis=1) >= np.arange(1, len(orden))):
+        raise ValueError("El orden de exploración no es conexo: algún nodo no tiene padre visitado antes")
+    return codigos
+
+
+def _empaquetar_2bits(codigos):
+    relleno = np.zeros(-len(codigos) % 4, dtype=np.uint8)
+    grupos = np.concatenate((codigos, relleno)).reshape(-1, 4)
+    return (grupos[:, 0] | grupos[:, 1] << 2 | grupos[:, 2] << 4 | grupos[:, 3] << 6).tobytes()
+
+
+def _desempaquetar_2bits(datos, cantidad):
+    bytes_ = np.frombuffer(datos, dtype=np.uint8)
+    codigos = np.stack([(bytes_ >> desplazamiento) & 3 for desplazamiento in (0, 2, 4, 6)], axis=1)
+    return codigos.ravel()[:cantidad]
+
+
+# --- Escritura y lectura ---
+
+def guardar_traza(ruta_archivo, mundo, estadisticas):
+    """Escribe la traza de ``estadisticas`` (búsqueda ya analizada) sobre ``mundo``."""
+    N = mundo.N
+    camino = estadisticas.ruta_completa
+    orden = np.array([r * N + c for r, c in camino], dtype=np.int64)
+    posicion_en_orden = {pos: i for i, pos in enumerate(camino)}
+
+    cuerpo = io.BytesIO()
+    _escribir_cadena(cuerpo, estadisticas.nombre)
+    _escribir_varint(cuerpo, N)
+    cuerpo.write(struct.pack('<dd', estadisticas.tiempo_ejecucion, estadisticas.tiempo_analisis_vision))
+    cuerpo.write(bytes([bool(estadisticas.exito)]))
+    _escribir_varint(cuerpo, estadisticas.flores_en_exploracion)
+
+    _escribir_varint(cuerpo, len(orden))
+    _escribir_bloque(cuerpo, _deltas(orden))
+    _escribir_bloque(cuerpo, _empaquetar_2bits(codigos_padres(orden, N)) if len(orden) else b'')
+
+    detalles = estadisticas.detalles_celdas
+    cadenas = {}
+    for detalle in detalles:
+        for clave in ('etiqueta_vision', 'confianza', 'origen'):
+            cadenas.setdefault(str(detalle[clave]), len(cadenas))
+    _escribir_varint(cuerpo, len(cadenas))
+    for texto in cadenas:
+        _escribir_cadena(cuerpo, texto)
+
+    _escribir_varint(cuerpo, len(detalles))
+    _escribir_bloque(cuerpo, _deltas([posicion_en_orden[tuple(d['posicion'])] for d in detalles]))
+    indices = [cadenas[str(d[clave])] for d in detalles for clave in ('etiqueta_vision', 'confianza', 'origen')]
+    _escribir_bloque(cuerpo, codificar_varints(indices))
+    _escribir_bloque(cuerpo, np.packbits(np.array([d['es_flor_segun_vision'] for d in detalles], dtype=bool)).tobytes())
+    _escribir_bloque(cuerpo, np.array([d['probabilidad'] for d in detalles], dtype='<f4').tobytes())
+
+    omitidas = estadisticas.celdas_omitidas
+    _escribir_varint(cuerpo, len(omitidas))
+    _escribir_bloque(cuerpo, _deltas([posicion_en_orden[tuple(p)] for p in omitidas]))
+
+    instantanea = mundo.instantanea()
+    _escribir_bloque(cuerpo, instantanea.tipos.tobytes())
+    _escribir_bloque(cuerpo, instantanea.indice_ruta.astype('<i2').tobytes())
+    _escribir_varint(cuerpo, len(instantanea.rutas_flores))
+    for ruta in instantanea.rutas_flores:
+        _escribir_cadena(cuerpo, ruta)
+
+    with open(ruta_archivo, 'wb') as archivo:
+        archivo.write(MAGIA)
+        archivo.write(huella_mundo(mundo))
+        archivo.write(zlib.compress(cuerpo.getvalue(), 6))
+
+
+def leer_huella(ruta_archivo):
+    """Huella del mundo de una traza, sin leer el resto."""
+    with open(ruta_archivo, 'rb') as archivo:
+        cabecera = archivo.read(len(MAGIA) + TAMANO_HUELLA)
+    if cabecera[:len(MAGIA)] not in MAGIAS_LEGIBLES:
+        raise ValueError(f"{ruta_archivo} no es una traza de exploración")
+    return cabecera[len(MAGIA):]
+
+
+def cargar_traza(ruta_archivo):
+    """
+    Lee una traza. Devuelve un diccionario con 'huella', 'nombre', 'N',
+    'orden' [(fila, col)], 'codigos_padres', tiempos, 'vision' (lista de
+    detalles como los de EstadisticasAlgoritmo), 'omitidas' y 'mundo'
+    (tipos, indice_ruta, rutas_flores) para ``InstantaneaMundo``.
+    """
+    with open(ruta_archivo, 'rb') as archivo:
+        datos = archivo.read()
+    if datos[:len(MAGIA)] not in MAGIAS_LEGIBLES:
+        raise ValueError(f"{ruta_archivo} no es una traza de exploración")
+    huella = datos[len(MAGIA):len(MAGIA) + TAMANO_HUELLA]
+    cuerpo = io.BytesIO(zlib.decompress(datos[len(MAGIA) + TAMANO_HUELLA:]))
+
+    traza = {'huella': huella, 'nombre': _leer_cadena(cuerpo), 'N': _leer_varint(cuerpo)}
+    traza['tiempo_ejecucion'], traza['tiempo_analisis_vision'] = struct.unpack('<dd', cuerpo.read(16))
+    traza['exito'] = bool(cuerpo.read(1)[0])
+    traza['flores_en_exploracion'] = _leer_varint(cuerpo)
+
+    N = traza['N']
+    cantidad = _leer_varint(cuerpo)
+    orden = _desde_deltas(_leer_bloque(cuerpo))
+    filas, columnas = np.divmod(orden, N)
+    traza['orden'] = list(zip(filas.tolist(), columnas.tolist()))
+    traza['codigos_padres'] = _desempaquetar_2bits(_leer_bloque(cuerpo), max(cantidad - 1, 0))
+
+    cadenas = [_leer_cadena(cuerpo) for _ in range(_leer_varint(cuerpo))]
+
+    cantidad_vision = _leer_varint(cuerpo)
+    posiciones = _desde_deltas(_leer_bloque(cuerpo)).tolist()
+    indices = decodificar_varints(_leer_bloque(cuerpo)).astype(np.int64).reshape(-1, 3).tolist()
+    es_flor = np.unpackbits(np.frombuffer(_leer_bloque(cuerpo), dtype=np.uint8))[:cantidad_vision]
+    probabilidades = np.frombuffer(_leer_bloque(cuerpo), dtype='<f4').tolist()
+    traza['vision'] = [
+        {'posicion': traza['orden'][posicion], 'es_flor_segun_vision': bool(flor),
+         'etiqueta_vision': cadenas[etiqueta], 'confianza': cadenas[confianza],
+         'origen': cadenas[origen], 'probabilidad': round(probabilidad, 6)}
+        for posicion, (etiqueta, confianza, origen), flor, probabilidad
+        in zip(posiciones, indices, es_flor, probabilidades)
+    ]
+
+    _leer_varint(cuerpo)
+    traza['omitidas'] = [traza['orden'][i] for i in _desde_deltas(_leer_bloque(cuerpo)).tolist()]
+
+    traza['mundo'] = None
+    if datos[:len(MAGIA)] == MAGIA:
+        tipos = np.frombuffer(_leer_bloque(cuerpo), dtype=np.uint8).reshape(N, N)
+        indice_ruta = np.frombuffer(_leer_bloque(cuerpo), dtype='<i2').reshape(N, N)
+        rutas_flores = [_leer_cadena(cuerpo) for _ in range(_leer_varint(cuerpo))]
+        traza['mundo'] = (tipos, indice_ruta, rutas_flores)
+    return traza
+
+
+def ruta_final_traza(traza):
+    """Ruta de inicio al último nodo explorado siguiendo los padres guardados."""
+    orden = traza['orden']
+    if not orden:
+        return []
+    indice = {pos: i for i, pos in enumerate(orden)}
+    ruta = [orden[-1]]
+    i = len(orden) - 1
+    while i > 0:
+        dr, dc = DIRECCIONES[traza['codigos_padres'][i - 1]]
+        r, c = orden[i]
+        i = indice[(r - dr, c - dc)]
+        ruta.append(orden[i])
+    return ruta[::-1]
+
+
+def reproducir_traza(traza, mundo=None):
+    """
+    Reconstruye (camino de exploración, EstadisticasAlgoritmo) de una traza
+    sin ejecutar búsqueda ni visión. Si se pasa ``mundo`` se comprueba que
+    sea el de la traza; si no lo es, avisa y devuelve (None, None).
+    """
+    from game.stats_system import EstadisticasAlgoritmo
+
+    if mundo is not None and huella_mundo(mundo) != traza['huella']:
+        print(f"⚠ La traza de {traza['nombre']} es de otro mundo, no se reproduce")
+        return None, None
+
+    estadisticas = EstadisticasAlgoritmo(traza['nombre'])
+    camino = list(traza['orden'])
+    estadisticas.tiempo_ejecucion = traza['tiempo_ejecucion']
+    estadisticas.tiempo_analisis_vision = traza['tiempo_analisis_vision']
+    estadisticas.longitud_ruta = len(camino)
+    estadisticas.ruta_completa = camino
+    estadisticas.exito = traza['exito']
+    estadisticas.flores_en_exploracion = traza['flores_en_exploracion']
+
+    for detalle in traza['vision']:
+        estadisticas.registrar_celda_analizada(
+            posicion=detalle['posicion'],
+            tipo_celda='flor',
+            es_flor_segun_vision=detalle['es_flor_segun_vision'],
+            etiqueta=detalle['etiqueta_vision'],
+            probabilidad=detalle['probabilidad'],
+            confianza=detalle['confianza'],
+            origen=detalle['origen']
+        )
+    for posicion in traza['omitidas']:
+        estadisticas.registrar_celda_omitida(posicion)
+
+    return camino, estadisticas
@@ -0,0 +1,171 @@
+"""
+Almacén de resultados de comparaciones en SQLite.
+
+Cada guardado es una inserción dentro de una transacción: no se reescribe
+nada de lo anterior y, si el proceso se corta a mitad, la comparación no
+queda a medias. La comparación completa se guarda como JSON en
+``comparaciones`` y cada algoritmo tiene además una fila en ``resultados``
+con columnas indexadas (fecha, algoritmo, tamaño del grid, score, tiempos)
+para consultarlas sin leer el JSON.
+
+Al abrirse importa una sola vez el antiguo ``data/comparaciones.json``.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from .constants import *
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS comparaciones (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    tamano_grid INTEGER,
+    ganador_score TEXT,
+    ganador_tiempo TEXT,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY,
+    comparacion_id INTEGER NOT NULL REFERENCES comparaciones(id),
+    fecha TEXT NOT NULL,
+    algoritmo TEXT NOT NULL,
+    tamano_grid INTEGER,
+    score INTEGER,
+    tiempo_busqueda REAL,
+    tiempo_vision REAL,
+    nodos_explorados INTEGER,
+    flores_confirmadas INTEGER,
+    eficiencia REAL
+);
+CREATE TABLE IF NOT EXISTS migraciones (
+    origen TEXT PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    cantidad INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_comparaciones_fecha ON comparaciones(fecha);
+CREATE INDEX IF NOT EXISTS idx_resultados_fecha ON resultados(fecha);
+CREATE INDEX IF NOT EXISTS idx_resultados_algoritmo ON resultados(algoritmo, tamano_grid);
+CREATE INDEX IF NOT EXISTS idx_resultados_tamano ON resultados(tamano_grid);
+CREATE INDEX IF NOT EXISTS idx_resultados_score ON resultados(score);
+CREATE INDEX IF NOT EXISTS idx_resultados_tiempo ON resultados(tiempo_busqueda);
+"""
+
+
+class AlmacenResultados:
+    def __init__(self, ruta_base=RUTA_BASE_RESULTADOS, ruta_json_antiguo=RUTA_COMPARACIONES_JSON):
+        self.ruta_base = ruta_base
+        os.makedirs(os.path.dirname(ruta_base) or '.', exist_ok=True)
+        with self._conectar() as conexion:
+            conexion.executescript(ESQUEMA)
+        if ruta_json_antiguo:
+            self.migrar_json(ruta_json_antiguo)
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta_base)
+        # WAL: los lectores no bloquean al escritor; FULL: cada commit llega al disco (fsync)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=FULL")
+        return _ConexionQueSeCierra(conexion)
+
+    def _insertar(self, conexion, comparacion, tamano_grid):
+        cursor = conexion.execute(
+            "INSERT INTO comparaciones (fecha, tamano_grid, ganador_score, ganador_tiempo, datos) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (comparacion.get('fecha'), tamano_grid, comparacion.get('ganador_score'),
+             comparacion.get('ganador_tiempo'), json.dumps(comparacion, ensure_ascii=False))
+        )
+        comparacion_id = cursor.lastrowid
+        conexion.executemany(
+            "INSERT INTO resultados (comparacion_id, fecha, algoritmo, tamano_grid, score, tiempo_busqueda, "
+            "tiempo_vision, nodos_explorados, flores_confirmadas, eficiencia) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(comparacion_id, comparacion.get('fecha'), nombre, tamano_grid, stats.get('score'),
+              stats.get('tiempo_ejecucion'), stats.get('tiempo_analisis_vision'),
+              stats.get('longitud_ruta'), stats.get('flores_detectadas'), stats.get('eficiencia'))
+             for nombre, stats in comparacion.get('algoritmos', {}).items()]
+        )
+        return comparacion_id
+
+    def guardar(self, comparacion, tamano_grid=None):
+        """Añade una comparación (atómico: se guarda entera o nada). Devuelve su id."""
+        with self._conectar() as conexion:
+            return self._insertar(conexion, comparacion, tamano_grid)
+
+    def migrar_json(self, ruta_json):
+        """
+        Importa las comparaciones de un JSON antiguo (lista de comparaciones)
+        en una sola transacción. Cada archivo se importa una sola vez; el
+        archivo no se modifica. Devuelve cuántas se importaron.
+        """
+        if not os.path.exists(ruta_json):
+            return 0
+        origen = os.path.abspath(ruta_json)
+        with self._conectar() as conexion:
+            if conexion.execute("SELECT 1 FROM migraciones WHERE origen = ?", (origen,)).fetchone():
+                return 0
+            try:
+                with open(ruta_json, 'r', encoding='utf-8') as f:
+                    comparaciones = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ No se pudo migrar {ruta_json}: {e}")
+                return 0
+            for comparacion in comparaciones:
+                self._insertar(conexion, comparacion, None)
+            conexion.execute("INSERT INTO migraciones (origen, fecha, cantidad) VALUES (?, ?, ?)",
+                             (origen, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), len(comparaciones)))
+        print(f"✓ {len(comparaciones)} comparaciones migradas de {ruta_json} a {self.ruta_base}")
+        return len(comparaciones)
+
+    def historial(self, limite=None):
+        """Comparaciones completas, de la más antigua a la más reciente (las ``limite`` últimas)."""
+        consulta = "SELECT datos FROM comparaciones ORDER BY fecha DESC, id DESC"
+        parametros = ()
+        if limite is not None:
+            consulta += " LIMIT ?"
+            parametros = (limite,)
+        with self._conectar() as conexion:
+            filas = conexion.execute(consulta, parametros).fetchall()
+        return [json.loads(datos) for (datos,) in reversed(filas)]
+
+    def mejores(self, algoritmo=None, tamano_grid=None, limite=10):
+        """Resultados por algoritmo con mayor score (desempate: menor tiempo de búsqueda)."""
+        condiciones = []
+        parametros = []
+        if algoritmo is not None:
+            condiciones.append("algoritmo = ?")
+            parametros.append(algoritmo)
+        if tamano_grid is not None:
+            condiciones.append("tamano_grid = ?")
+            parametros.append(tamano_grid)
+        consulta = ("SELECT fecha, algoritmo, tamano_grid, score, tiempo_busqueda, tiempo_vision, "
+                    "nodos_explorados, flores_confirmadas, eficiencia FROM resultados")
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY score DESC, tiempo_busqueda ASC LIMIT ?"
+        parametros.append(limite)
+        with self._conectar() as conexion:
+            cursor = conexion.execute(consulta, parametros)
+            columnas = [descripcion[0] for descripcion in cursor.description]
+            return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+
+class _ConexionQueSeCierra:
+    """
+    ``with`` sobre una conexión sqlite3: confirma o deshace la transacción
+    (como la conexión) y además la cierra.
+    """
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def __enter__(self):
+        return self.conexion.__enter__()
+
+    def __exit__(self, *excepcion):
+        try:
+            return self.conexion.__exit__(*excepcion)
+        finally:
+            self.conexion.close()
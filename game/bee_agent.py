@@ -1,7 +1,26 @@
 import pygame
 import os
 import time
+import numpy as np
 from game.constants import *
+from game.gestor_recursos import RUTAS_SPRITES_ABEJA, obtener_gestor
+
+def cargar_sprites_abeja():
+    """Fotogramas de la animación de vuelo escalados a la celda (compartidos)."""
+    gestor = obtener_gestor()
+    lado = int(TAMANO_CELDA * 0.8)
+    sprites = []
+    for path in RUTAS_SPRITES_ABEJA:
+        try:
+            sprites.append(gestor.imagen(path, (lado, lado)))
+        except (pygame.error, FileNotFoundError):
+            print(f"ERROR: No se pudo cargar sprite en {path}. Usando respaldo.")
+    if not sprites:
+        backup = pygame.Surface((int(TAMANO_CELDA * 0.8), int(TAMANO_CELDA * 0.8)), pygame.SRCALPHA)
+        backup.fill((255, 255, 0))
+        sprites.append(backup)
+    return sprites
+
 
 class Abeja(pygame.sprite.Sprite):
     def __init__(self, mundo, pos_inicial):
@@ -14,12 +33,16 @@ class Abeja(pygame.sprite.Sprite):
         self.contador_animacion = 0
         self.velocidad_animacion = 4
         self.image = self.sprites_animacion[self.indice_sprite]
+        self.sprites_escalados = {}  # {(indice_sprite, tamano_celda): Surface} para el zoom de la cámara
+        # rect en píxeles de mundo (escala TAMANO_CELDA); la cámara lo pasa a pantalla
         self.rect = self.image.get_rect(center=self.obtener_posicion_pixel(self.r, self.c))
         self.ruta_planificada = [] # para guardar la lista de coordenadas
         self.paso_actual = 0 # para saber en qué punto de la ruta vamos
         self.esta_en_movimiento = False # un interruptor para iniciar/detener el movimiento
         self.posicion_objetivo = self.rect.center # las coordenadas en píxeles de la siguiente celda a la que queremos llegar
-        self.velocidad_movimiento = TAMANO_CELDA // 8 # Píxeles que se mueve por frame
+        self.posicion = list(map(float, self.rect.center)) # posición exacta en píxeles de mundo
+        self.velocidad_movimiento = VELOCIDAD_ABEJA * TAMANO_CELDA # Píxeles por segundo simulado
+        self.multiplicador_velocidad = 1.0 # Velocidad de reproducción (x1, x2, ...)
         
         # Sistema de sonido
         self.sonido_vuelo = None
@@ -27,56 +50,29 @@ class Abeja(pygame.sprite.Sprite):
         self.cargar_sonidos()
         self.sonido_reproduciendo = False
         
-        # Temporizador
+        # Temporizador: tiempo real (reloj de pared) y simulado (afectado por el multiplicador)
         self.tiempo_inicio = 0
         self.tiempo_actual = 0
         self.tiempo_llegada = 0
+        self.tiempo_simulado = 0.0
 
     def cargar_sonidos(self):
-        """Carga los efectos de sonido de la abeja."""
-        try:
-            # Inicializar el mixer de pygame si no está inicializado
-            if not pygame.mixer.get_init():
-                pygame.mixer.init()
-            
-            # Cargar sonido de vuelo
-            if os.path.exists(SOUND_BEE_STEP):
-                self.sonido_vuelo = pygame.mixer.Sound(SOUND_BEE_STEP)
-                self.sonido_vuelo.set_volume(0.3)  # Volumen al 30%
-                print("✓ Sonido de vuelo cargado")
-            else:
-                print(f"⚠ No se encontró el sonido de vuelo en: {SOUND_BEE_STEP}")
-            
-            # Cargar sonido de encontrar flor
-            if os.path.exists(SOUND_FLOWER_FOUND):
-                self.sonido_flor = pygame.mixer.Sound(SOUND_FLOWER_FOUND)
-                self.sonido_flor.set_volume(0.5)  # Volumen al 50%
-                print("✓ Sonido de flor cargado")
-            else:
-                print(f"⚠ No se encontró el sonido de flor en: {SOUND_FLOWER_FOUND}")
-                
-        except pygame.error as e:
-            print(f"⚠ Error cargando sonidos: {e}")
-            self.sonido_vuelo = None
-            self.sonido_flor = None
+        """Obtiene los efectos de sonido de la abeja del gestor de recursos."""
+        gestor = obtener_gestor()
+        
+        self.sonido_vuelo = gestor.sonido(SOUND_BEE_STEP)
+        if self.sonido_vuelo:
+            self.sonido_vuelo.set_volume(0.3)  # Volumen al 30%
+        
+        self.sonido_flor = gestor.sonido(SOUND_FLOWER_FOUND)
+        if self.sonido_flor:
+            self.sonido_flor.set_volume(0.5)  # Volumen al 50%
 
     def cargar_sprites_animacion(self):
-        sprites = []
-        for i in range(0, 6):
-            path = os.path.join('assets', 'sprites', f'{i}.png')
-            try:
-                imagen = pygame.image.load(path).convert_alpha()
-                scaled_image = pygame.transform.scale(imagen, (int(TAMANO_CELDA * 0.8), int(TAMANO_CELDA * 0.8)))
-                sprites.append(scaled_image)
-            except pygame.error:
-                print(f"ERROR: No se pudo cargar sprite en {path}. Usando respaldo.")
-        if not sprites:
-            backup = pygame.Surface((int(TAMANO_CELDA * 0.8), int(TAMANO_CELDA * 0.8)), pygame.SRCALPHA)
-            backup.fill((255, 255, 0))
-            sprites.append(backup)
-        return sprites
+        return cargar_sprites_abeja()
         
     def obtener_posicion_pixel(self, r, c):
+        """Centro de la celda en píxeles de mundo."""
         x_pixel = c * TAMANO_CELDA + (TAMANO_CELDA // 2)
         y_pixel = r * TAMANO_CELDA + (TAMANO_CELDA // 2)
         return (x_pixel, y_pixel)
@@ -88,19 +84,18 @@ class Abeja(pygame.sprite.Sprite):
             return
         
         # 1. Limpiamos cualquier ruta anterior y marcas en_ruta
-        for fila in self.mundo.grid:
-            for celda in fila:
-                celda.en_ruta = False
+        self.mundo.limpiar_marcas_ruta()
 
-        # 2. Filtrar la ruta para ELIMINAR obstáculos
-        ruta_filtrada = []
-        for r, c in ruta:
-            celda = self.mundo.grid[r][c]
-            # SOLO agregar si NO es obstáculo
-            if celda.tipo != TIPO_OBSTACULO:
-                ruta_filtrada.append((r, c))
-            else:
-                print(f"⚠ Advertencia: Se intentó pasar por obstáculo en ({r},{c}), saltando...")
+        # 2. Filtrar la ruta para ELIMINAR obstáculos (máscara sobre la instantánea del mundo)
+        posiciones = np.asarray(ruta, dtype=np.int64).reshape(-1, 2)
+        libres = self.mundo.instantanea().transitable[posiciones[:, 0], posiciones[:, 1]]
+        if libres.all():
+            ruta_filtrada = [(r, c) for r, c in ruta]
+        else:
+            ruta_filtrada = [ruta[i] for i in np.flatnonzero(libres)]
+            bloqueadas = [tuple(p) for p in posiciones[~libres][:5].tolist()]
+            print(f"⚠ Advertencia: la ruta pasaba por {int((~libres).sum())} obstáculos "
+                  f"(p. ej. {bloqueadas}), se saltan")
         
         if not ruta_filtrada:
             print("❌ Error: La ruta está bloqueada por obstáculos")
@@ -115,12 +110,17 @@ class Abeja(pygame.sprite.Sprite):
         # 4. Asegurarse de que la abeja comience en el primer punto de la ruta
         self.r, self.c = self.ruta_planificada[self.paso_actual]
         self.rect.center = self.obtener_posicion_pixel(self.r, self.c)
+        self.posicion = list(map(float, self.rect.center))
+        if len(self.ruta_planificada) == 1:
+            self.esta_en_movimiento = False
+            return
         self.actualizar_siguiente_objetivo()
         
         # 5. Iniciar temporizador
         self.tiempo_inicio = time.time()
         self.tiempo_actual = 0
         self.tiempo_llegada = 0
+        self.tiempo_simulado = 0.0
         
         # 6. Iniciar sonido de vuelo
         self.reproducir_sonido_vuelo()
@@ -143,22 +143,46 @@ class Abeja(pygame.sprite.Sprite):
             self.sonido_flor.play()
     
     def obtener_tiempo_transcurrido(self):
-        """Obtiene el tiempo transcurrido desde que empezó a moverse."""
+        """
+        Tiempo desde que empezó a moverse como (simulado, real): el simulado
+        es lo que habría tardado a velocidad x1, el real el del reloj.
+        """
         if self.tiempo_llegada > 0:
-            return self.tiempo_llegada
+            return self.tiempo_simulado, self.tiempo_llegada
         elif self.esta_en_movimiento:
-            return time.time() - self.tiempo_inicio
-        return 0
+            return self.tiempo_simulado, time.time() - self.tiempo_inicio
+        return 0.0, 0.0
+
+    def cambiar_velocidad(self, factor):
+        """Multiplica la velocidad de reproducción (limitada a MULTIPLICADOR_MIN..MAX)."""
+        self.multiplicador_velocidad = max(MULTIPLICADOR_MIN,
+                                           min(self.multiplicador_velocidad * factor, MULTIPLICADOR_MAX))
+        print(f"Velocidad de la abeja: x{self.multiplicador_velocidad:g}")
+
+    def saltar_al_final(self):
+        """Recorre de golpe lo que queda de ruta (marcas y tiempo simulado incluidos)."""
+        if not self.esta_en_movimiento:
+            return
+        # Distancia pendiente: hasta el objetivo actual y entre los pasos restantes
+        restante = abs(self.posicion_objetivo[0] - self.posicion[0]) + abs(self.posicion_objetivo[1] - self.posicion[1])
+        pendientes = self.ruta_planificada[self.paso_actual:]
+        restante += sum(abs(r2 - r1) + abs(c2 - c1)
+                        for (r1, c1), (r2, c2) in zip(pendientes, pendientes[1:])) * TAMANO_CELDA
+        self.tiempo_simulado += restante / self.velocidad_movimiento
+        self.avanzar(restante, reproducir_sonidos=False)
 
-    def actualizar(self):
+    def actualizar(self, dt=1.0 / FPS):
+        """Avanza ``dt`` segundos reales (escalados por el multiplicador)."""
         if not self.esta_en_movimiento:
             return 
         
         # Actualizar temporizador
         self.tiempo_actual = time.time() - self.tiempo_inicio
+        dt_simulado = dt * self.multiplicador_velocidad
+        self.tiempo_simulado += dt_simulado
         
         self.animar_sprite()
-        self.mover_hacia_objetivo()
+        self.avanzar(self.velocidad_movimiento * dt_simulado)
         
     def animar_sprite(self):
         """Cambia la imagen de la abeja para simular que vuela."""
@@ -168,16 +192,16 @@ class Abeja(pygame.sprite.Sprite):
             self.indice_sprite = (self.indice_sprite + 1) % len(self.sprites_animacion)
             self.image = self.sprites_animacion[self.indice_sprite]
         
-    def llegar_a_celda(self):
+    def llegar_a_celda(self, reproducir_sonidos=True):
         """Se ejecuta cuando la abeja llega al centro de una celda."""
         self.r, self.c = self.ruta_planificada[self.paso_actual]
         
         # Marcar la celda como parte de la ruta recorrida
         celda_actual = self.mundo.grid[self.r][self.c]
-        celda_actual.en_ruta = True
+        self.mundo.marcar_celda_en_ruta(self.r, self.c)
         
         # Verificar si la celda actual es una flor
-        if celda_actual.tipo == 'flor':
+        if celda_actual.tipo == 'flor' and reproducir_sonidos:
             self.reproducir_sonido_flor()
 
         # Comprobar si hemos llegado al final de la ruta
@@ -195,25 +219,47 @@ class Abeja(pygame.sprite.Sprite):
         siguiente_paso = self.ruta_planificada[self.paso_actual]
         self.posicion_objetivo = self.obtener_posicion_pixel(siguiente_paso[0], siguiente_paso[1])
 
-    def mover_hacia_objetivo(self):
-        """Mueve la abeja unos píxeles hacia la celda objetivo."""
-        if self.rect.center == self.posicion_objetivo:
-            # Si hemos llegado, decidimos cuál es el siguiente objetivo
-            self.llegar_a_celda()
-        else:
-            # Si no hemos llegado, nos movemos un poco
-            dx = self.posicion_objetivo[0] - self.rect.centerx
-            dy = self.posicion_objetivo[1] - self.rect.centery
+    def avanzar(self, distancia, reproducir_sonidos=True):
+        """
+        Mueve la abeja ``distancia`` píxeles a lo largo de la ruta. Si la
+        distancia supera la celda objetivo se encadenan varias celdas en el
+        mismo frame; el sonido de flor suena como mucho una vez por llamada.
+        """
+        while self.esta_en_movimiento:
+            dx = self.posicion_objetivo[0] - self.posicion[0]
+            dy = self.posicion_objetivo[1] - self.posicion[1]
+            hasta_objetivo = abs(dx) + abs(dy)  # Distancia Manhattan, como el avance por ejes
+            
+            if distancia < hasta_objetivo:
+                self.posicion[0] += distancia * dx / hasta_objetivo
+                self.posicion[1] += distancia * dy / hasta_objetivo
+                break
             
-            if abs(dx) > self.velocidad_movimiento:
-                self.rect.x += self.velocidad_movimiento if dx > 0 else -self.velocidad_movimiento
-            else:
-                self.rect.centerx = self.posicion_objetivo[0]
-                
-            if abs(dy) > self.velocidad_movimiento:
-                self.rect.y += self.velocidad_movimiento if dy > 0 else -self.velocidad_movimiento
-            else:
-                self.rect.centery = self.posicion_objetivo[1]
+            distancia -= hasta_objetivo
+            self.posicion = list(map(float, self.posicion_objetivo))
+            self.rect.center = self.posicion_objetivo
+            self.llegar_a_celda(reproducir_sonidos)
+            if self.mundo.grid[self.r][self.c].tipo == 'flor':
+                reproducir_sonidos = False
+        
+        self.rect.center = (round(self.posicion[0]), round(self.posicion[1]))
+
+    def obtener_imagen_escalada(self, tamano_celda):
+        """Sprite actual al tamaño de celda de la cámara (cacheado)."""
+        if tamano_celda == TAMANO_CELDA:
+            return self.image
+        clave = (self.indice_sprite, tamano_celda)
+        imagen = self.sprites_escalados.get(clave)
+        if imagen is None:
+            lado = max(int(tamano_celda * 0.8), 1)
+            imagen = pygame.transform.scale(self.image, (lado, lado))
+            self.sprites_escalados[clave] = imagen
+        return imagen
 
-    def dibujar(self, pantalla):
-        pantalla.blit(self.image, self.rect)
\ No newline at end of file
+    def dibujar(self, pantalla, camara=None):
+        """Dibuja la abeja y devuelve el rect de pantalla que ocupa."""
+        if camara is None:
+            return pantalla.blit(self.image, self.rect)
+        imagen = self.obtener_imagen_escalada(camara.tamano_celda)
+        centro = camara.mundo_a_pantalla(*self.rect.center)
+        return pantalla.blit(imagen, imagen.get_rect(center=centro))
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Paquete de recursos pre-decodificados.
+
+``construir_paquete`` guarda en un solo archivo los píxeles RGBA de cada
+imagen en los tamaños que usa el juego y el PCM de cada sonido ya
+decodificado en el formato del mixer, con un índice JSON al principio.
+``PaqueteRecursos`` abre ese archivo con ``mmap`` y envuelve los bloques
+como ``Surface`` (``pygame.image.frombuffer``) o arreglos NumPy sin volver
+a decodificar PNG ni MP3.
+
+Formato::
+
+    MAGIA (8 bytes) | longitud del índice (uint32 LE) | índice JSON | datos
+
+Cada bloque de datos empieza alineado a ``ALINEACION`` bytes.
+
+Uso (desde la raíz del proyecto):
+    python -m game.bundle_recursos            # construye assets/recursos.bundle
+    python -m game.bundle_recursos --info     # muestra el contenido
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+import pygame
+from game.constants import *
+
+RUTA_PAQUETE = os.path.join('assets', 'recursos.bundle')
+MAGIA = b'BEEPAQ01'
+ALINEACION = 16
+
+
+def tamanos_necesarios():
+    """{ruta: [tamaño o None (original)]} de las imágenes que pide el juego."""
+    from game.gestor_recursos import RUTAS_SPRITES_ABEJA, RUTAS_FLORES  # El gestor importa este módulo
+    lado_abeja = int(TAMANO_CELDA * 0.8)
+    lado_flor = int(TAMANO_CELDA * 0.9)
+    tamanos = {ruta: [(lado_abeja, lado_abeja)] for ruta in RUTAS_SPRITES_ABEJA}
+    # Las flores también se usan a tamaño original (visión)
+    tamanos.update({ruta: [None, (lado_flor, lado_flor)] for ruta in RUTAS_FLORES})
+    return tamanos
+
+
+def _clave_imagen(ruta, tamano):
+    return f"{os.path.normpath(ruta)}@{tamano[0]}x{tamano[1]}" if tamano else os.path.normpath(ruta)
+
+
+def _firma_origen(ruta):
+    estado = os.stat(ruta)
+    return [estado.st_size, estado.st_mtime_ns]
+
+
+def construir_paquete(ruta_salida=RUTA_PAQUETE, tamanos=None, rutas_sonidos=None):
+    """
+    Decodifica las imágenes y sonidos y los escribe en ``ruta_salida``.
+    Escribe primero en un temporal y lo renombra, así un juego abierto
+    nunca ve un paquete a medio escribir. Devuelve el índice.
+    """
+    tamanos = tamanos_necesarios() if tamanos is None else tamanos
+    if rutas_sonidos is None:
+        from game.gestor_recursos import RUTAS_SONIDOS
+        rutas_sonidos = RUTAS_SONIDOS
+
+    bloques = []  # [(clave, entrada del índice, bytes)]
+    for ruta, lista_tamanos in tamanos.items():
+        try:
+            original = pygame.image.load(ruta)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"⚠ No se pudo leer {ruta}: {e}")
+            continue
+        for tamano in lista_tamanos:
+            imagen = pygame.transform.scale(original, tamano) if tamano else original
+            entrada = {'tipo': 'imagen', 'ancho': imagen.get_width(), 'alto': imagen.get_height(),
+                       'origen': _firma_origen(ruta)}
+            bloques.append((_clave_imagen(ruta, tamano), entrada, pygame.image.tobytes(imagen, 'RGBA')))
+
+    try:
+        if rutas_sonidos and not pygame.mixer.get_init():
+            pygame.mixer.init()
+    except pygame.error as e:
+        print(f"⚠ Sin mixer, los sonidos no se incluyen: {e}")
+        rutas_sonidos = []
+    if rutas_sonidos:
+        frecuencia, formato, canales = pygame.mixer.get_init()
+        for ruta in rutas_sonidos:
+            try:
+                pcm = pygame.mixer.Sound(ruta).get_raw()
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"⚠ No se pudo decodificar {ruta}: {e}")
+                continue
+            entrada = {'tipo': 'sonido', 'frecuencia': frecuencia, 'formato': formato,
+                       'canales': canales, 'origen': _firma_origen(ruta)}
+            bloques.append((os.path.normpath(ruta), entrada, pcm))
+
+    # Los desplazamientos son relativos al inicio de la zona de datos
+    indice = {}
+    desplazamiento = 0
+    for clave, entrada, datos in bloques:
+        entrada['desplazamiento'] = desplazamiento
+        entrada['bytes'] = len(datos)
+        indice[clave] = entrada
+        desplazamiento += -(-len(datos) // ALINEACION) * ALINEACION
+
+    cabecera = json.dumps(indice).encode('utf-8')
+    inicio_datos = -(-(len(MAGIA) + 4 + len(cabecera)) // ALINEACION) * ALINEACION
+
+    temporal = ruta_salida + '.tmp'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(MAGIA)
+        archivo.write(struct.pack('<I', len(cabecera)))
+        archivo.write(cabecera)
+        for clave, entrada, datos in bloques:
+            archivo.seek(inicio_datos + entrada['desplazamiento'])
+            archivo.write(datos)
+    os.replace(temporal, ruta_salida)
+    return indice
+
+
+class PaqueteRecursos:
+    """Paquete abierto con ``mmap``; los recursos comparten su memoria."""
+
+    def __init__(self, ruta=RUTA_PAQUETE):
+        self.ruta = ruta
+        self._archivo = open(ruta, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mapa[:len(MAGIA)] != MAGIA:
+                raise ValueError(f"{ruta} no es un paquete de recursos")
+            longitud, = struct.unpack_from('<I', self._mapa, len(MAGIA))
+            inicio_indice = len(MAGIA) + 4
+            self.indice = json.loads(self._mapa[inicio_indice:inicio_indice + longitud])
+            self.inicio_datos = -(-(inicio_indice + longitud) // ALINEACION) * ALINEACION
+        except Exception:
+            self._archivo.close()
+            raise
+        self._vista = memoryview(self._mapa)
+        self.rutas = {clave.split('@')[0] for clave in self.indice}
+
+    def contiene(self, ruta):
+        """Si el paquete tiene alguna versión de ``ruta``."""
+        return os.path.normpath(ruta) in self.rutas
+
+    @classmethod
+    def abrir(cls, ruta=RUTA_PAQUETE):
+        """Paquete de ``ruta``, o ``None`` si no existe o no es válido."""
+        if not os.path.exists(ruta):
+            return None
+        try:
+            return cls(ruta)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Paquete de recursos ignorado ({ruta}): {e}")
+            return None
+
+    def _entrada(self, clave, ruta):
+        entrada = self.indice.get(clave)
+        if entrada is None:
+            return None
+        # Si el archivo suelto cambió desde que se construyó el paquete, manda el archivo
+        try:
+            if _firma_origen(ruta) != entrada['origen']:
+                return None
+        except OSError:
+            pass
+        return entrada
+
+    def _bloque(self, entrada):
+        inicio = self.inicio_datos + entrada['desplazamiento']
+        return self._vista[inicio:inicio + entrada['bytes']]
+
+    def arreglo(self, ruta, tamano=None):
+        """Píxeles (alto, ancho, 4) uint8 de solo lectura, o ``None`` si no están."""
+        entrada = self._entrada(_clave_imagen(ruta, tamano), ruta)
+        if entrada is None or entrada['tipo'] != 'imagen':
+            return None
+        return np.frombuffer(self._bloque(entrada), dtype=np.uint8).reshape(
+            entrada['alto'], entrada['ancho'], 4)
+
+    def imagen(self, ruta, tamano=None):
+        """``Surface`` RGBA sobre la memoria del paquete, o ``None`` si no está."""
+        entrada = self._entrada(_clave_imagen(ruta, tamano), ruta)
+        if entrada is None or entrada['tipo'] != 'imagen':
+            return None
+        return pygame.image.frombuffer(self._bloque(entrada), (entrada['ancho'], entrada['alto']), 'RGBA')
+
+    def sonido(self, ruta):
+        """
+        ``Sound`` creado desde el PCM guardado, o ``None`` si no está o si el
+        mixer usa otro formato que el del paquete.
+        """
+        entrada = self._entrada(os.path.normpath(ruta), ruta)
+        if entrada is None or entrada['tipo'] != 'sonido':
+            return None
+        if pygame.mixer.get_init() != (entrada['frecuencia'], entrada['formato'], entrada['canales']):
+            return None
+        return pygame.mixer.Sound(buffer=self._bloque(entrada))
+
+    def cerrar(self):
+        """Cierra el mapa; las Surfaces creadas con ``imagen`` dejan de ser válidas."""
+        self._vista.release()
+        self._mapa.close()
+        self._archivo.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construye el paquete de recursos pre-decodificados")
+    parser.add_argument("--salida", default=RUTA_PAQUETE)
+    parser.add_argument("--info", action="store_true", help="Mostrar el contenido del paquete y salir")
+    args = parser.parse_args()
+
+    if args.info:
+        paquete = PaqueteRecursos.abrir(args.salida)
+        if paquete is None:
+            print(f"❌ No hay paquete en {args.salida}")
+            return
+        for clave, entrada in paquete.indice.items():
+            print(f"  • {clave}: {entrada['tipo']}, {entrada['bytes'] / 1024:.1f} KB")
+        paquete.cerrar()
+        return
+
+    pygame.init()
+    inicio = time.perf_counter()
+    indice = construir_paquete(args.salida)
+    print(f"✓ Paquete {args.salida}: {len(indice)} recursos, "
+          f"{os.path.getsize(args.salida) / 1024 / 1024:.1f} MB en {time.perf_counter() - inicio:.2f}s")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import pygame
+from .constants import *
+
+
+class Camara:
+    """
+    Vista sobre el mundo con desplazamiento y zoom.
+
+    ``tamano_celda`` son los píxeles de pantalla por celda (el zoom) y
+    (``x``, ``y``) el píxel del mundo, a esa escala, que queda en la esquina
+    superior izquierda de la vista. Las posiciones "de mundo" del resto del
+    juego (p. ej. la abeja) están en píxeles a escala ``TAMANO_CELDA``.
+    """
+
+    def __init__(self, ancho_vista, alto_vista, N, tamano_celda=TAMANO_CELDA):
+        self.ancho_vista = ancho_vista
+        self.alto_vista = alto_vista
+        self.N = N
+        self.tamano_celda = tamano_celda
+        self.x = 0
+        self.y = 0
+        self.version = 0  # Aumenta con cada movimiento o zoom
+        self._limitar()
+
+    @property
+    def escala(self):
+        """Factor entre píxeles de pantalla y píxeles de mundo a ``TAMANO_CELDA``."""
+        return self.tamano_celda / TAMANO_CELDA
+
+    def _limitar(self):
+        """Mantiene el mundo dentro de la vista (centrado si cabe entero)."""
+        lado = self.N * self.tamano_celda
+        if lado <= self.ancho_vista:
+            self.x = -((self.ancho_vista - lado) // 2)
+        else:
+            self.x = max(0, min(self.x, lado - self.ancho_vista))
+        if lado <= self.alto_vista:
+            self.y = -((self.alto_vista - lado) // 2)
+        else:
+            self.y = max(0, min(self.y, lado - self.alto_vista))
+
+    def desplazar(self, dx, dy):
+        """Mueve la vista ``dx``, ``dy`` píxeles de pantalla."""
+        self.x += int(dx)
+        self.y += int(dy)
+        self._limitar()
+        self.version += 1
+
+    def hacer_zoom(self, factor, ancla=None):
+        """
+        Multiplica el tamaño de celda por ``factor`` dejando fijo el punto del
+        mundo que está bajo ``ancla`` (por defecto el centro de la vista).
+        """
+        if ancla is None:
+            ancla = (self.ancho_vista // 2, self.alto_vista // 2)
+
+        nuevo = int(round(self.tamano_celda * factor))
+        if nuevo == self.tamano_celda:
+            nuevo += 1 if factor > 1 else -1
+        nuevo = max(ZOOM_MIN_CELDA, min(nuevo, ZOOM_MAX_CELDA))
+        if nuevo == self.tamano_celda:
+            return
+
+        # Punto bajo el ancla, en celdas, antes del zoom
+        punto_x = (ancla[0] + self.x) / self.tamano_celda
+        punto_y = (ancla[1] + self.y) / self.tamano_celda
+        self.tamano_celda = nuevo
+        self.x = int(punto_x * nuevo - ancla[0])
+        self.y = int(punto_y * nuevo - ancla[1])
+        self._limitar()
+        self.version += 1
+
+    # --- Transformaciones ---
+
+    def pantalla_a_celda(self, pos_pixel):
+        """(fila, columna) bajo un píxel de pantalla (puede quedar fuera del grid)."""
+        columna = (pos_pixel[0] + self.x) // self.tamano_celda
+        fila = (pos_pixel[1] + self.y) // self.tamano_celda
+        return fila, columna
+
+    def rect_celda(self, fila, columna):
+        """Rect de pantalla de una celda."""
+        return pygame.Rect(columna * self.tamano_celda - self.x, fila * self.tamano_celda - self.y,
+                           self.tamano_celda, self.tamano_celda)
+
+    def mundo_a_pantalla(self, x_mundo, y_mundo):
+        """Convierte píxeles de mundo (escala ``TAMANO_CELDA``) a píxeles de pantalla."""
+        escala = self.escala
+        return int(x_mundo * escala) - self.x, int(y_mundo * escala) - self.y
+
+    def rango_visible(self, zona=None):
+        """
+        Filas y columnas que tocan ``zona`` (rect de pantalla; por defecto
+        toda la vista) como (fila_ini, fila_fin, col_ini, col_fin), con fin
+        exclusivo y recortado al grid.
+        """
+        if zona is None:
+            zona = pygame.Rect(0, 0, self.ancho_vista, self.alto_vista)
+        t = self.tamano_celda
+        fila_ini = max(0, (zona.top + self.y) // t)
+        fila_fin = min(self.N, (zona.bottom - 1 + self.y) // t + 1)
+        col_ini = max(0, (zona.left + self.x) // t)
+        col_fin = min(self.N, (zona.right - 1 + self.x) // t + 1)
+        return fila_ini, fila_fin, col_ini, col_fin
@@ -5,7 +5,44 @@ ANCHO_PANTALLA = 600
 ALTO_PANTALLA = 600
 FPS = 60
 TAMANO_N = 20
-TAMANO_CELDA = ANCHO_PANTALLA // TAMANO_N # Divide el ancho para obtener el tamaño de cada celda
+TAMANO_CELDA = max(ANCHO_PANTALLA // TAMANO_N, 8) # Divide el ancho para obtener el tamaño de cada celda (mínimo 8 px; la cámara hace el resto)
+
+# --- Cámara y render por chunks ---
+ZOOM_MIN_CELDA = 2  # Píxeles por celda con el zoom más alejado
+ZOOM_MAX_CELDA = 120  # Píxeles por celda con el zoom más cercano
+TAMANO_CHUNK = 32  # Celdas por lado de cada superficie pre-renderizada
+MAX_CHUNKS_EN_CACHE = 64  # Chunks que se conservan (LRU)
+MAX_TEXTOS_EN_CACHE = 512  # Textos renderizados que conserva la UI (LRU)
+PASO_DESPLAZAMIENTO = 60  # Píxeles por pulsación de flecha
+
+# --- Movimiento de la abeja ---
+VELOCIDAD_ABEJA = 6.0  # Celdas por segundo con multiplicador x1
+MULTIPLICADOR_MIN = 0.25
+MULTIPLICADOR_MAX = 64.0
+DT_MAXIMO = 0.1  # Segundos; evita saltos tras un frame bloqueado (p. ej. una búsqueda)
+ABEJAS_ENJAMBRE = 300  # Abejas del modo enjambre
+
+# --- Presupuesto del análisis de visión (None = sin límite) ---
+PRESUPUESTO_VISION_SEGUNDOS = None
+PRESUPUESTO_VISION_LLAMADAS = None
+PRIORIDAD_VISION = 'ruta_final'  # 'ruta_final' o 'no_vistos'
+MODO_RAPIDO_VISION = False  # es_flor por la masa softmax de las clases de flor, sin decodificar etiquetas
+
+# --- Eventos de progreso ---
+INTERVALO_PROGRESO_SEGUNDOS = 0.05  # Mínimo entre dos repintados de la barra de progreso
+RUTA_REGISTRO_EVENTOS = None  # p. ej. 'data/eventos.jsonl' para guardar todos los eventos
+
+# --- Perfilador de frames ---
+MUESTRAS_PERFIL = 1200  # Frames que guarda el búfer circular (20 s a 60 FPS)
+INTERVALO_RESUMEN_PERFIL = 0.5  # Segundos entre recálculos de los percentiles
+RUTA_PERFIL_FRAMES = os.path.join('data', 'perfil_frames.csv')
+
+# --- Trazas de exploración ---
+DIRECTORIO_TRAZAS = os.path.join('data', 'trazas')
+
+# --- Resultados de comparaciones ---
+RUTA_BASE_RESULTADOS = os.path.join('data', 'resultados.db')  # SQLite, solo inserciones
+RUTA_COMPARACIONES_JSON = os.path.join('data', 'comparaciones.json')  # Formato antiguo, se migra una vez
 
 # --- Colores (RGB) ---
 COLOR_NEGRO = (0, 0, 0)
@@ -17,6 +54,7 @@ COLOR_INICIO = (0, 200, 0)
 COLOR_META = (200, 0, 0)
 COLOR_RUTA = (255, 255, 0) # Amarillo
 COLOR_VISITADO = (50, 50, 150) # Azul oscuro
+ALFA_MAPA_CALOR = 150 # Transparencia de la capa de orden de exploración
 
 # --- Tipos de Celda ---
 TIPO_VACIO = 'vacio'
@@ -0,0 +1,134 @@
+import random
+from collections import deque
+
+import numpy as np
+import pygame
+from game.constants import *
+from game.bee_agent import cargar_sprites_abeja
+
+
+def rutas_hacia(mundo, meta, inicios):
+    """
+    Rutas más cortas desde cada celda de ``inicios`` hasta ``meta`` con un
+    único BFS desde la meta. Los inicios inalcanzables se omiten.
+    """
+    padres = {meta: None}
+    cola = deque([meta])
+    while cola:
+        r, c = cola.popleft()
+        for vecino in mundo.obtener_vecinos_validos(mundo.grid[r][c]):
+            if vecino not in padres:
+                padres[vecino] = (r, c)
+                cola.append(vecino)
+
+    rutas = []
+    for inicio in inicios:
+        if inicio not in padres:
+            continue
+        ruta = []
+        nodo = inicio
+        while nodo is not None:
+            ruta.append(nodo)
+            nodo = padres[nodo]
+        rutas.append(ruta)
+    return rutas
+
+
+class Enjambre:
+    """
+    Muchas abejas siguiendo rutas independientes.
+
+    En lugar de un objeto por abeja, el estado vive en arreglos NumPy:
+    todos los puntos de todas las rutas concatenados (``puntos``), el cursor
+    de cada abeja dentro de ellos, su posición y si sigue activa. Cada frame
+    se avanza a todas a la vez y se dibujan con un único ``blits``.
+    """
+
+    def __init__(self, rutas, sprites=None):
+        self.sprites = sprites or cargar_sprites_abeja()
+        self.velocidad_movimiento = VELOCIDAD_ABEJA * TAMANO_CELDA  # Píxeles de mundo por segundo
+        self.sprites_escalados = {}  # {tamano_celda: [Surface]}
+
+        rutas = [ruta for ruta in rutas if ruta]
+        self.cantidad = len(rutas)
+        longitudes = np.array([len(ruta) for ruta in rutas], dtype=np.int64)
+        self.fin_ruta = np.cumsum(longitudes) - 1  # Índice del último punto de cada ruta
+
+        # Centros de celda en píxeles de mundo, como Abeja.obtener_posicion_pixel
+        celdas = np.array([paso for ruta in rutas for paso in ruta], dtype=np.float64).reshape(-1, 2)
+        self.puntos = celdas[:, ::-1] * TAMANO_CELDA + TAMANO_CELDA // 2  # (x, y)
+
+        inicio_ruta = self.fin_ruta - longitudes + 1
+        self.posiciones = self.puntos[inicio_ruta].copy()
+        self.cursor = np.minimum(inicio_ruta + 1, self.fin_ruta)  # Punto objetivo de cada abeja
+        self.activas = longitudes > 1
+        self.fase_animacion = np.random.randint(0, len(self.sprites), self.cantidad)
+        self.tiempo_animacion = 0.0
+
+    @classmethod
+    def aleatorio(cls, mundo, meta, cantidad):
+        """Enjambre de ``cantidad`` abejas que vuelven a ``meta`` desde celdas libres al azar."""
+        libres = [(celda.r, celda.c) for fila in mundo.grid for celda in fila
+                  if celda.tipo != TIPO_OBSTACULO and (celda.r, celda.c) != meta]
+        inicios = [random.choice(libres) for _ in range(cantidad)] if libres else []
+        return cls(rutas_hacia(mundo, meta, inicios))
+
+    def activas_restantes(self):
+        return int(self.activas.sum())
+
+    def actualizar(self, dt):
+        """Avanza todas las abejas ``dt`` segundos, encadenando celdas si hace falta."""
+        self.tiempo_animacion += dt
+        if not self.activas.any():
+            return
+
+        restante = np.where(self.activas, self.velocidad_movimiento * dt, 0.0)
+        while True:
+            objetivo = self.puntos[self.cursor]
+            delta = objetivo - self.posiciones
+            distancia = np.abs(delta).sum(axis=1)  # Manhattan, como Abeja
+
+            llegan = self.activas & (restante >= distancia)
+            mueven = self.activas & ~llegan & (restante > 0)
+
+            if mueven.any():
+                fraccion = restante[mueven] / distancia[mueven]
+                self.posiciones[mueven] += delta[mueven] * fraccion[:, None]
+                restante[mueven] = 0.0
+
+            if not llegan.any():
+                break
+
+            self.posiciones[llegan] = objetivo[llegan]
+            restante[llegan] -= distancia[llegan]
+            terminan = llegan & (self.cursor >= self.fin_ruta)
+            self.activas &= ~terminan
+            restante[terminan] = 0.0
+            self.cursor[llegan & ~terminan] += 1
+
+    def _sprites_para(self, tamano_celda):
+        if tamano_celda == TAMANO_CELDA:
+            return self.sprites
+        sprites = self.sprites_escalados.get(tamano_celda)
+        if sprites is None:
+            lado = max(int(tamano_celda * 0.8), 1)
+            sprites = [pygame.transform.scale(sprite, (lado, lado)) for sprite in self.sprites]
+            self.sprites_escalados[tamano_celda] = sprites
+        return sprites
+
+    def dibujar(self, pantalla, camara):
+        """Dibuja las abejas visibles con un solo ``blits`` y devuelve sus rects."""
+        if self.cantidad == 0:
+            return []
+
+        sprites = self._sprites_para(camara.tamano_celda)
+        lado = sprites[0].get_width()
+        esquinas = (self.posiciones * camara.escala).astype(np.int64) - (camara.x, camara.y) - lado // 2
+
+        visibles = ((esquinas[:, 0] > -lado) & (esquinas[:, 0] < camara.ancho_vista) &
+                    (esquinas[:, 1] > -lado) & (esquinas[:, 1] < camara.alto_vista))
+        fotograma = int(self.tiempo_animacion * FPS / 4)  # Mismo ritmo que Abeja.velocidad_animacion
+        indices = (self.fase_animacion + fotograma) % len(sprites)
+
+        return pantalla.blits([(sprites[i], (x, y))
+                               for i, (x, y) in zip(indices[visibles], esquinas[visibles].tolist())])
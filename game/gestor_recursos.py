@@ -0,0 +1,200 @@
+"""
+Gestor de recursos compartido por todo el proceso.
+
+Cada imagen se lee del disco una sola vez y cada escalado se calcula una
+sola vez por tamaño; los sonidos se decodifican una sola vez. Todos los
+que piden el mismo recurso reciben la misma ``Surface``/``Sound``, así que
+no deben modificarla (``set_volume`` de un sonido afecta a todos).
+
+Si existe el paquete pre-decodificado (``game/bundle_recursos.py``), las
+imágenes y sonidos que contiene se toman de él sin decodificar; lo que
+no esté en el paquete se lee de los archivos sueltos.
+"""
+
+import os
+import threading
+import time
+
+import pygame
+from game.constants import *
+from game.bundle_recursos import PaqueteRecursos
+
+RUTAS_SPRITES_ABEJA = [os.path.join('assets', 'sprites', f'{i}.png') for i in range(0, 6)]
+RUTAS_FLORES = [
+    os.path.join('assets', 'objects', 'flor_1.png'),
+    os.path.join('assets', 'objects', 'flor_2.png'),
+    os.path.join('assets', 'objects', 'lata.png'),
+    os.path.join('assets', 'objects', 'tenis.png')
+]
+RUTAS_SONIDOS = [SOUND_BEE_STEP, SOUND_FLOWER_FOUND]
+
+
+class GestorRecursos:
+    """Cache de imágenes (originales y escaladas) y sonidos."""
+
+    def __init__(self):
+        self.crudas = {}  # {ruta: Surface leída en segundo plano, sin convertir}
+        self.imagenes = {}  # {ruta: Surface convertida}
+        self.escaladas = {}  # {(ruta, (ancho, alto)): Surface}
+        self.sonidos = {}  # {ruta: Sound o None si no existe}
+        self.tiempos_carga = {}  # {ruta: segundos de lectura/decodificación}
+        self.candado = threading.RLock()
+        self.hilo_precarga = None
+        self.paquete = PaqueteRecursos.abrir()
+        if self.paquete is not None:
+            print(f"📦 Paquete de recursos: {self.paquete.ruta} ({len(self.paquete.indice)} recursos)")
+
+    def imagen(self, ruta, tamano=None):
+        """
+        Imagen con alfa, escalada a ``tamano`` (ancho, alto) si se indica.
+        Lanza ``pygame.error`` si no se puede leer, como ``pygame.image.load``.
+        """
+        with self.candado:
+            if tamano is not None:
+                clave = (ruta, tuple(tamano))
+                escalada = self.escaladas.get(clave)
+                if escalada is None:
+                    escalada = self._imagen_paquete(ruta, clave[1])
+                    if escalada is None:
+                        escalada = pygame.transform.scale(self.imagen(ruta), clave[1])
+                    self.escaladas[clave] = escalada
+                return escalada
+
+            imagen = self.imagenes.get(ruta)
+            if imagen is None:
+                imagen = self._imagen_paquete(ruta)
+            if imagen is None:
+                cruda = self.crudas.pop(ruta, None)
+                if cruda is None:
+                    cruda = self._leer_imagen(ruta)
+                # La conversión necesita la ventana, así que se hace aquí y no en la precarga
+                imagen = cruda.convert_alpha()
+            self.imagenes[ruta] = imagen
+            return imagen
+
+    def sonido(self, ruta):
+        """Sonido decodificado, o ``None`` si el archivo no existe o no se puede abrir."""
+        with self.candado:
+            if ruta not in self.sonidos:
+                sonido = self._sonido_paquete(ruta)
+                self.sonidos[ruta] = sonido if sonido is not None else self._leer_sonido(ruta)
+            return self.sonidos[ruta]
+
+    def _imagen_paquete(self, ruta, tamano=None):
+        if self.paquete is None:
+            return None
+        inicio = time.perf_counter()
+        imagen = self.paquete.imagen(ruta, tamano)
+        if imagen is None:
+            return None
+        # convert_alpha copia los píxeles al formato de la pantalla: sin decodificar, y la
+        # Surface deja de depender del mmap
+        imagen = imagen.convert_alpha()
+        self.tiempos_carga[_clave_tiempo(ruta, tamano)] = time.perf_counter() - inicio
+        return imagen
+
+    def _sonido_paquete(self, ruta):
+        if self.paquete is None:
+            return None
+        inicio = time.perf_counter()
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            sonido = self.paquete.sonido(ruta)
+        except pygame.error as e:
+            print(f"⚠ Error cargando sonido {ruta} del paquete: {e}")
+            return None
+        if sonido is not None:
+            self.tiempos_carga[_clave_tiempo(ruta)] = time.perf_counter() - inicio
+        return sonido
+
+    def _leer_imagen(self, ruta):
+        inicio = time.perf_counter()
+        cruda = pygame.image.load(ruta)
+        self.tiempos_carga[ruta] = time.perf_counter() - inicio
+        return cruda
+
+    def _leer_sonido(self, ruta):
+        if not os.path.exists(ruta):
+            print(f"⚠ No se encontró el sonido en: {ruta}")
+            return None
+        inicio = time.perf_counter()
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            sonido = pygame.mixer.Sound(ruta)
+        except pygame.error as e:
+            print(f"⚠ Error cargando sonido {ruta}: {e}")
+            return None
+        self.tiempos_carga[ruta] = time.perf_counter() - inicio
+        return sonido
+
+    def precargar_en_segundo_plano(self, rutas_imagenes=None, rutas_sonidos=None):
+        """
+        Lee y decodifica en un hilo las imágenes y sonidos indicados (por
+        defecto los del juego). Lo que aún no esté listo cuando se pida se
+        carga en ese momento, así que no hace falta esperar al hilo.
+        """
+        rutas_imagenes = RUTAS_SPRITES_ABEJA + RUTAS_FLORES if rutas_imagenes is None else rutas_imagenes
+        rutas_sonidos = RUTAS_SONIDOS if rutas_sonidos is None else rutas_sonidos
+
+        def precargar():
+            inicio = time.perf_counter()
+            # La lectura se hace fuera del candado para no bloquear al hilo principal
+            # Lo que está en el paquete no hace falta leerlo: se envuelve al pedirlo
+            en_paquete = self.paquete.contiene if self.paquete is not None else lambda ruta: False
+            for ruta in rutas_imagenes:
+                if ruta in self.imagenes or ruta in self.crudas or en_paquete(ruta):
+                    continue
+                try:
+                    cruda = self._leer_imagen(ruta)
+                except (pygame.error, FileNotFoundError) as e:
+                    print(f"⚠ Precarga: no se pudo leer {ruta}: {e}")
+                    continue
+                with self.candado:
+                    if ruta not in self.imagenes:
+                        self.crudas.setdefault(ruta, cruda)
+            for ruta in rutas_sonidos:
+                if ruta in self.sonidos or en_paquete(ruta):
+                    continue
+                sonido = self._leer_sonido(ruta)
+                with self.candado:
+                    self.sonidos.setdefault(ruta, sonido)
+            print(f"✓ {len(rutas_imagenes) + len(rutas_sonidos)} recursos precargados "
+                  f"en {time.perf_counter() - inicio:.3f}s")
+
+        self.hilo_precarga = threading.Thread(target=precargar, daemon=True)
+        self.hilo_precarga.start()
+        return self.hilo_precarga
+
+    def resumen_tiempos(self):
+        """Tiempos de carga por recurso y total, en segundos."""
+        with self.candado:
+            tiempos = dict(self.tiempos_carga)
+        return {'recursos': tiempos, 'total': sum(tiempos.values()),
+                'escalados': len(self.escaladas)}
+
+    def imprimir_tiempos(self):
+        resumen = self.resumen_tiempos()
+        print(f"\n📦 Recursos cargados: {len(resumen['recursos'])} "
+              f"({resumen['total'] * 1000:.1f} ms, {resumen['escalados']} escalados en cache)")
+        for ruta, segundos in sorted(resumen['recursos'].items(), key=lambda x: -x[1]):
+            print(f"  • {ruta}: {segundos * 1000:.1f} ms")
+
+
+def _clave_tiempo(ruta, tamano=None):
+    origen = f"{ruta} [paquete]"
+    return f"{origen} {tamano[0]}x{tamano[1]}" if tamano else origen
+
+
+_gestor = None
+_candado_gestor = threading.Lock()
+
+
+def obtener_gestor():
+    """Gestor de recursos compartido del proceso (se crea en el primer uso)."""
+    global _gestor
+    with _candado_gestor:
+        if _gestor is None:
+            _gestor = GestorRecursos()
+        return _gestor
@@ -1,7 +1,13 @@
 import random
 import pygame
 import os
+from collections import OrderedDict, namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
 from .constants import *
+from .camara import Camara
+from .gestor_recursos import RUTAS_FLORES, obtener_gestor
 
 class Celda:
     def __init__(self, fila, columna):
@@ -12,22 +18,35 @@ class Celda:
         self.imagen_original_path = None
 
 class Mundo:
-    def __init__(self, N):
+    def __init__(self, N, instantanea=None):
+        """Mundo aleatorio de N x N, o el de ``instantanea`` si se pasa (p. ej. de una traza)."""
         self.N = N
         self.grid = []
-        self.inicializar_grid_aleatorio()
+        self.version = 0  # Aumenta con cada cambio de tipos; invalida la instantánea
+        self._instantanea = None
+        
+        # Render: chunks de TAMANO_CHUNK x TAMANO_CHUNK celdas pre-renderizados
+        # (fondo, obstáculos, flores, bordes y marcas de ruta) en un cache LRU;
+        # solo se redibujan las celdas sucias de los chunks ya cacheados
+        self.chunks = OrderedDict()  # {(fila_chunk, col_chunk): Surface}
+        self.tamano_chunks = None  # Tamaño de celda con el que se renderizaron
+        self.celdas_sucias = set()
+        self.celdas_en_ruta = set()  # (fila, columna) con en_ruta=True
+        self.camara_por_defecto = None
+        if instantanea is None:
+            self.inicializar_grid_aleatorio()
+        else:
+            self.cargar_instantanea(instantanea)
         self.cargar_imagenes_flores()
 
     def inicializar_grid_aleatorio(self):
         self.grid = []
+        self.version += 1
+        self.invalidar_capa_estatica()
+        self.celdas_en_ruta = set()
         PROB_OBSTACULO = 0.25
         PROB_FLOR = 0.10
-        rutas_flores = [
-            os.path.join('assets', 'objects', 'flor_1.png'),
-            os.path.join('assets', 'objects', 'flor_2.png'),
-            os.path.join('assets', 'objects', 'lata.png'),
-            os.path.join('assets', 'objects', 'tenis.png')
-        ]
+        rutas_flores = RUTAS_FLORES
         for fila_num in range(self.N):
             fila_actual = []
             for col_num in range(self.N):
@@ -42,33 +61,67 @@ class Mundo:
                 fila_actual.append(celda)
             self.grid.append(fila_actual)
 
+    def cargar_instantanea(self, instantanea):
+        """Reconstruye el grid con los tipos y las imágenes de una ``InstantaneaMundo``."""
+        self.grid = []
+        self.version += 1
+        self.invalidar_capa_estatica()
+        self.celdas_en_ruta = set()
+        for fila_num in range(self.N):
+            fila_actual = []
+            for col_num in range(self.N):
+                celda = Celda(fila_num, col_num)
+                celda.tipo = instantanea.tipo_en(fila_num, col_num)
+                celda.imagen_original_path = instantanea.ruta_en(fila_num, col_num)
+                fila_actual.append(celda)
+            self.grid.append(fila_actual)
+
     def cargar_imagenes_flores(self):
         self.imagenes_sprites_flores = {}
+        self.imagenes_originales_flores = {}
         for fila in self.grid:
             for celda in fila:
                 if celda.tipo == TIPO_FLOR and celda.imagen_original_path:
                     path = celda.imagen_original_path
                     if path not in self.imagenes_sprites_flores:
                         try:
-                            img = pygame.image.load(path).convert_alpha()
-                            self.imagenes_sprites_flores[path] = pygame.transform.scale(img, (int(TAMANO_CELDA * 0.9), int(TAMANO_CELDA * 0.9)))
-                        except pygame.error as e:
+                            gestor = obtener_gestor()
+                            self.imagenes_originales_flores[path] = gestor.imagen(path)
+                            self.imagenes_sprites_flores[path] = gestor.imagen(path, (int(TAMANO_CELDA * 0.9), int(TAMANO_CELDA * 0.9)))
+                        except (pygame.error, FileNotFoundError) as e:
                             print(f"Error cargando imagen de flor en {path}: {e}")
 
-    def seleccionar_punto(self, pos_pixel, tipo_punto):
-        columna = pos_pixel[0] // TAMANO_CELDA
-        fila = pos_pixel[1] // TAMANO_CELDA
+    def seleccionar_punto(self, pos_pixel, tipo_punto, camara=None):
+        if camara is not None:
+            fila, columna = camara.pantalla_a_celda(pos_pixel)
+        else:
+            columna = pos_pixel[0] // TAMANO_CELDA
+            fila = pos_pixel[1] // TAMANO_CELDA
         if 0 <= fila < self.N and 0 <= columna < self.N:
             celda = self.grid[fila][columna]
             if celda.tipo not in [TIPO_OBSTACULO, TIPO_FLOR]:
                 celda.tipo = tipo_punto
+                self.version += 1
+                self.invalidar_capa_estatica()
                 return True
         return False
     
+    def instantanea(self):
+        """
+        Copia de solo lectura del estado actual, para búsquedas concurrentes.
+        Se reutiliza mientras el mundo no cambie.
+        """
+        if self._instantanea is None or self._instantanea[0] != self.version:
+            self._instantanea = (self.version, InstantaneaMundo.desde_mundo(self))
+        return self._instantanea[1]
+    
     def obtener_vecinos_validos(self, celda_actual):
+        return self.vecinos_de(celda_actual.r, celda_actual.c)
+    
+    def vecinos_de(self, r, c):
+        """Posiciones transitables vecinas de (r, c), sin pasar por el objeto celda."""
         vecinos = []
         movimientos = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        r, c = celda_actual.r, celda_actual.c
         for dr, dc in movimientos:
             nr, nc = r + dr, c + dc
             if 0 <= nr < self.N and 0 <= nc < self.N:
@@ -76,28 +129,281 @@ class Mundo:
                     vecinos.append((nr, nc))
         return vecinos
 
-    def dibujar(self, pantalla):
-        for fila in self.grid:
+    def marcar_celda_en_ruta(self, fila, columna, en_ruta=True):
+        """Cambia la marca de ruta de una celda y la apunta para redibujarla."""
+        celda = self.grid[fila][columna]
+        if celda.en_ruta != en_ruta:
+            celda.en_ruta = en_ruta
+            if en_ruta:
+                self.celdas_en_ruta.add((fila, columna))
+            else:
+                self.celdas_en_ruta.discard((fila, columna))
+            self.celdas_sucias.add((fila, columna))
+    
+    def limpiar_marcas_ruta(self):
+        """Quita todas las marcas de ruta (solo recorre las celdas marcadas)."""
+        for fila, columna in self.celdas_en_ruta:
+            self.grid[fila][columna].en_ruta = False
+        self.celdas_sucias |= self.celdas_en_ruta
+        self.celdas_en_ruta = set()
+    
+    def invalidar_capa_estatica(self):
+        """Descarta los chunks pre-renderizados; se reconstruyen al dibujar."""
+        self.chunks.clear()
+    
+    def sprite_flor(self, path, tamano_celda):
+        """Sprite de una flor escalado para un tamaño de celda (cacheado)."""
+        if tamano_celda == TAMANO_CELDA:
+            return self.imagenes_sprites_flores.get(path)
+        if path not in self.imagenes_originales_flores:
+            return None
+        lado = max(int(tamano_celda * 0.9), 1)
+        return obtener_gestor().imagen(path, (lado, lado))
+    
+    def _dibujar_celda(self, superficie, celda, rect_celda, con_ruta):
+        pygame.draw.rect(superficie, COLOR_FONDO_CELDA, rect_celda)
+        if con_ruta:
+            pygame.draw.rect(superficie, COLOR_RUTA, rect_celda)
+        
+        if celda.tipo == TIPO_OBSTACULO:
+            pygame.draw.rect(superficie, COLOR_OBSTACULO, rect_celda)
+        elif celda.tipo == TIPO_FLOR:
+            sprite = self.sprite_flor(celda.imagen_original_path, rect_celda.width)
+            if sprite:
+                superficie.blit(sprite, sprite.get_rect(center=rect_celda.center))
+        elif celda.tipo == TIPO_INICIO:
+            pygame.draw.rect(superficie, COLOR_INICIO, rect_celda)
+        elif celda.tipo == TIPO_ENJAMBRE:
+            pygame.draw.rect(superficie, COLOR_META, rect_celda)
+        
+        # Con celdas muy pequeñas el borde taparía la celda entera
+        if rect_celda.width >= 6:
+            pygame.draw.rect(superficie, (80, 80, 80), rect_celda, 1)
+    
+    def _obtener_chunk(self, fila_chunk, col_chunk, tamano_celda):
+        """Superficie de un chunk, renderizándola si no está en el cache."""
+        clave = (fila_chunk, col_chunk)
+        superficie = self.chunks.get(clave)
+        if superficie is not None:
+            self.chunks.move_to_end(clave)
+            return superficie
+        
+        fila_ini = fila_chunk * TAMANO_CHUNK
+        col_ini = col_chunk * TAMANO_CHUNK
+        filas = min(TAMANO_CHUNK, self.N - fila_ini)
+        columnas = min(TAMANO_CHUNK, self.N - col_ini)
+        superficie = pygame.Surface((columnas * tamano_celda, filas * tamano_celda))
+        for r in range(filas):
+            fila = self.grid[fila_ini + r]
+            for c in range(columnas):
+                celda = fila[col_ini + c]
+                rect_celda = pygame.Rect(c * tamano_celda, r * tamano_celda, tamano_celda, tamano_celda)
+                self._dibujar_celda(superficie, celda, rect_celda, celda.en_ruta)
+        
+        self.chunks[clave] = superficie
+        if len(self.chunks) > MAX_CHUNKS_EN_CACHE:
+            self.chunks.popitem(last=False)
+        return superficie
+    
+    def _actualizar_celdas_sucias(self, camara):
+        """Redibuja en sus chunks las celdas con cambios de ruta y devuelve sus rects en pantalla."""
+        rects = []
+        t = camara.tamano_celda
+        for fila, columna in self.celdas_sucias:
+            superficie = self.chunks.get((fila // TAMANO_CHUNK, columna // TAMANO_CHUNK))
+            if superficie is not None:
+                rect_local = pygame.Rect((columna % TAMANO_CHUNK) * t, (fila % TAMANO_CHUNK) * t, t, t)
+                celda = self.grid[fila][columna]
+                self._dibujar_celda(superficie, celda, rect_local, celda.en_ruta)
+            rects.append(camara.rect_celda(fila, columna))
+        self.celdas_sucias.clear()
+        return rects
+    
+    def _pintar_zona(self, pantalla, camara, zona):
+        """Repinta una zona de pantalla con los chunks visibles que la cubren."""
+        zona = zona.clip(pantalla.get_rect())
+        if zona.width == 0 or zona.height == 0:
+            return None
+        
+        pantalla.set_clip(zona)
+        pantalla.fill(COLOR_FONDO, zona)
+        fila_ini, fila_fin, col_ini, col_fin = camara.rango_visible(zona)
+        if fila_ini < fila_fin and col_ini < col_fin:
+            lado_chunk = TAMANO_CHUNK * camara.tamano_celda
+            for fila_chunk in range(fila_ini // TAMANO_CHUNK, (fila_fin - 1) // TAMANO_CHUNK + 1):
+                for col_chunk in range(col_ini // TAMANO_CHUNK, (col_fin - 1) // TAMANO_CHUNK + 1):
+                    superficie = self._obtener_chunk(fila_chunk, col_chunk, camara.tamano_celda)
+                    pantalla.blit(superficie, (col_chunk * lado_chunk - camara.x,
+                                               fila_chunk * lado_chunk - camara.y))
+        pantalla.set_clip(None)
+        return zona
+    
+    def dibujar(self, pantalla, camara=None, areas=None):
+        """
+        Dibuja la parte visible del mundo a partir de los chunks cacheados.
+        
+        Sin ``areas`` se repinta toda la vista. Con ``areas`` (las zonas que
+        otros elementos ensuciaron en el frame anterior) solo se restauran
+        esas zonas y las celdas cuya marca de ruta cambió. Devuelve la lista
+        de rects de pantalla modificados, para ``pygame.display.update``.
+        """
+        if camara is None:
+            if self.camara_por_defecto is None:
+                self.camara_por_defecto = Camara(pantalla.get_width(), pantalla.get_height(), self.N)
+            camara = self.camara_por_defecto
+        
+        if camara.tamano_celda != self.tamano_chunks:
+            # Con otro zoom los chunks y las celdas sucias pendientes ya no sirven
+            self.invalidar_capa_estatica()
+            self.celdas_sucias.clear()
+            self.tamano_chunks = camara.tamano_celda
+            areas = None
+        elif not self.chunks:
+            areas = None
+        
+        rects_celdas = self._actualizar_celdas_sucias(camara)
+        
+        if areas is None:
+            return [self._pintar_zona(pantalla, camara, pantalla.get_rect())]
+        
+        rects = []
+        for rect in list(areas) + rects_celdas:
+            zona = self._pintar_zona(pantalla, camara, rect)
+            if zona:
+                rects.append(zona)
+        return rects
+
+# Códigos de tipo usados en los buffers de la instantánea
+CODIGOS_TIPO = (TIPO_VACIO, TIPO_OBSTACULO, TIPO_FLOR, TIPO_ENJAMBRE, TIPO_INICIO)
+_CODIGO_POR_TIPO = {tipo: codigo for codigo, tipo in enumerate(CODIGOS_TIPO)}
+
+# Celda inmutable de una instantánea
+CeldaInstantanea = namedtuple('CeldaInstantanea', ['r', 'c', 'tipo', 'en_ruta', 'imagen_original_path'])
+
+
+def _solo_lectura(arreglo):
+    arreglo.flags.writeable = False
+    return arreglo
+
+
+class InstantaneaMundo:
+    """
+    Copia congelada de un ``Mundo`` para lectores concurrentes.
+    
+    Tipos, transitabilidad y rutas de las flores se guardan en buffers NumPy
+    contiguos y de solo lectura (``tipos``, ``transitable``, ``indice_ruta``
+    contra la tupla ``rutas_flores``). Expone además la interfaz de lectura
+    del mundo (``N``, ``grid``, ``vecinos_de``, ``obtener_vecinos_validos``),
+    así que las búsquedas aceptan indistintamente un ``Mundo`` o una
+    instantánea; ``vecinos_de`` y ``tipo_en`` leen los buffers sin construir
+    ``grid``.
+    
+    Los cambios no modifican la instantánea: ``con_tipo`` devuelve otra que
+    copia solo el buffer afectado y comparte el resto. ``compartir`` la copia
+    a memoria compartida para que otros procesos la mapeen sin copiarla.
+    """
+
+    def __init__(self, N, tipos, indice_ruta, rutas_flores, memoria=None):
+        self.N = N
+        self.tipos = _solo_lectura(np.ascontiguousarray(tipos, dtype=np.uint8))
+        self.indice_ruta = _solo_lectura(np.ascontiguousarray(indice_ruta, dtype=np.int16))
+        self.rutas_flores = tuple(rutas_flores)
+        self.transitable = _solo_lectura(self.tipos != _CODIGO_POR_TIPO[TIPO_OBSTACULO])
+        self.memoria = memoria  # SharedMemory si la instantánea vive en un bloque compartido
+        self._grid = None
+
+    @classmethod
+    def desde_mundo(cls, mundo):
+        tipos = np.empty((mundo.N, mundo.N), dtype=np.uint8)
+        indice_ruta = np.full((mundo.N, mundo.N), -1, dtype=np.int16)
+        rutas = {}
+        for fila in mundo.grid:
             for celda in fila:
-                x = celda.c * TAMANO_CELDA
-                y = celda.r * TAMANO_CELDA
-                rect_celda = pygame.Rect(x, y, TAMANO_CELDA, TAMANO_CELDA)
-
-                
-                pygame.draw.rect(pantalla, COLOR_FONDO_CELDA, rect_celda)
-                if celda.en_ruta:
-                    pygame.draw.rect(pantalla, COLOR_RUTA, rect_celda)
-
-                if celda.tipo == TIPO_OBSTACULO:
-                    pygame.draw.rect(pantalla, COLOR_OBSTACULO, rect_celda)
-                elif celda.tipo == TIPO_FLOR:
-                    sprite = self.imagenes_sprites_flores.get(celda.imagen_original_path)
-                    if sprite:
-                        pantalla.blit(sprite, sprite.get_rect(center=rect_celda.center))
-                elif celda.tipo == TIPO_INICIO:
-                    pygame.draw.rect(pantalla, COLOR_INICIO, rect_celda)
-                elif celda.tipo == TIPO_ENJAMBRE:
-                    pygame.draw.rect(pantalla, COLOR_META, rect_celda)
-                
-                # Asegúrate de tener COLOR_BORDE_CELDA en constants.py o usa un color
-                pygame.draw.rect(pantalla, (80, 80, 80), rect_celda, 1)
\ No newline at end of file
+                tipos[celda.r, celda.c] = _CODIGO_POR_TIPO[celda.tipo]
+                if celda.imagen_original_path:
+                    indice_ruta[celda.r, celda.c] = rutas.setdefault(celda.imagen_original_path, len(rutas))
+        return cls(mundo.N, tipos, indice_ruta, rutas)
+
+    # --- Interfaz de lectura compatible con Mundo ---
+
+    @property
+    def grid(self):
+        """Celdas inmutables construidas a partir de los buffers (solo la primera vez)."""
+        if self._grid is None:
+            self._grid = tuple(
+                tuple(CeldaInstantanea(r, c, self.tipo_en(r, c), False, self.ruta_en(r, c))
+                      for c in range(self.N))
+                for r in range(self.N)
+            )
+        return self._grid
+
+    def tipo_en(self, fila, columna):
+        return CODIGOS_TIPO[self.tipos[fila, columna]]
+
+    def ruta_en(self, fila, columna):
+        indice = self.indice_ruta[fila, columna]
+        return self.rutas_flores[indice] if indice >= 0 else None
+
+    def obtener_vecinos_validos(self, celda_actual):
+        return self.vecinos_de(celda_actual.r, celda_actual.c)
+
+    def vecinos_de(self, r, c):
+        """Vecinos leídos del buffer ``transitable`` (no construye ``grid``)."""
+        vecinos = []
+        movimientos = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        for dr, dc in movimientos:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.N and 0 <= nc < self.N and self.transitable[nr, nc]:
+                vecinos.append((nr, nc))
+        return vecinos
+
+    def instantanea(self):
+        return self
+
+    # --- Copia en escritura ---
+
+    def con_tipo(self, fila, columna, tipo):
+        """Nueva instantánea con una celda cambiada; el buffer de rutas se comparte."""
+        tipos = self.tipos.copy()
+        tipos[fila, columna] = _CODIGO_POR_TIPO[tipo]
+        return InstantaneaMundo(self.N, tipos, self.indice_ruta, self.rutas_flores)
+
+    # --- Memoria compartida entre procesos ---
+
+    def compartir(self):
+        """
+        Copia los buffers a un bloque de memoria compartida y devuelve un
+        descriptor serializable para ``desde_memoria_compartida``. El bloque
+        pertenece a quien llama, que debe liberarlo con ``liberar(unlink=True)``.
+        """
+        celdas = self.N * self.N
+        desplazamiento = celdas + celdas % 2  # int16 alineado
+        memoria = shared_memory.SharedMemory(create=True, size=desplazamiento + 2 * celdas)
+        np.ndarray((self.N, self.N), dtype=np.uint8, buffer=memoria.buf)[...] = self.tipos
+        np.ndarray((self.N, self.N), dtype=np.int16, buffer=memoria.buf,
+                   offset=desplazamiento)[...] = self.indice_ruta
+        self.memoria = memoria
+        return {'memoria': memoria.name, 'N': self.N, 'rutas_flores': self.rutas_flores}
+
+    @classmethod
+    def desde_memoria_compartida(cls, descriptor):
+        """Mapea (sin copiar) una instantánea publicada con ``compartir``."""
+        memoria = shared_memory.SharedMemory(name=descriptor['memoria'])
+        N = descriptor['N']
+        celdas = N * N
+        desplazamiento = celdas + celdas % 2
+        tipos = np.ndarray((N, N), dtype=np.uint8, buffer=memoria.buf)
+        indice_ruta = np.ndarray((N, N), dtype=np.int16, buffer=memoria.buf, offset=desplazamiento)
+        return cls(N, tipos, indice_ruta, descriptor['rutas_flores'], memoria=memoria)
+
+    def liberar(self, unlink=False):
+        """Suelta el bloque compartido (y lo borra si ``unlink`` y es el dueño)."""
+        if self.memoria is None:
+            return
+        # Las vistas deben soltarse antes de cerrar el bloque
+        self.tipos = _solo_lectura(self.tipos.copy())
+        self.indice_ruta = _solo_lectura(self.indice_ruta.copy())
+        self.memoria.close()
+        if unlink:
+            self.memoria.unlink()
+        self.memoria = None
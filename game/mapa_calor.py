@@ -0,0 +1,106 @@
+import numpy as np
+import pygame
+from .constants import *
+
+# Paradas de la rampa de color: primeras visitas en azul, últimas en rojo
+PARADAS_RAMPA = [
+    (0.0, (40, 60, 255)),
+    (0.5, (255, 240, 40)),
+    (1.0, (255, 40, 30)),
+]
+
+
+def construir_rampa(niveles=256):
+    """Tabla (niveles, 3) de colores interpolados entre ``PARADAS_RAMPA``."""
+    posiciones = [p for p, _ in PARADAS_RAMPA]
+    x = np.linspace(0.0, 1.0, niveles)
+    canales = [np.interp(x, posiciones, [color[i] for _, color in PARADAS_RAMPA]) for i in range(3)]
+    return np.stack(canales, axis=1).astype(np.uint8)
+
+
+class MapaCalor:
+    """
+    Capa con el orden de exploración de una búsqueda.
+
+    Cada celda visitada guarda su índice en el orden de visita dentro de un
+    arreglo NumPy (N, N) y se pinta con la rampa de color en una superficie
+    de N x N píxeles, que se escala a la vista de la cámara al dibujar. El
+    color depende del índice sobre el total de celdas transitables, así que
+    al añadir visitas nuevas (búsqueda en streaming) solo se pintan esas.
+    """
+
+    def __init__(self, mundo):
+        self.N = mundo.N
+        self.rampa = construir_rampa()
+        self.superficie = pygame.Surface((self.N, self.N))
+        self.superficie.set_colorkey(COLOR_NEGRO)  # Celdas sin visitar: transparentes
+        self.cache_escalada = None  # (clave, Surface) de la última vista dibujada
+        self.reiniciar(mundo)
+
+    def reiniciar(self, mundo):
+        """Vacía el mapa para un mundo (nuevo o el mismo)."""
+        self.orden = np.full((self.N, self.N), -1, dtype=np.int32)
+        self.visitas = 0
+        # Escala fija: como mucho se visitan todas las celdas transitables
+        self.escala = max(sum(1 for fila in mundo.grid for celda in fila
+                              if celda.tipo != TIPO_OBSTACULO), 1)
+        self.superficie.fill(COLOR_NEGRO)
+        self.version = 0
+
+    def _colores(self, indices):
+        niveles = len(self.rampa) - 1
+        return self.rampa[np.minimum(indices * niveles // self.escala, niveles)]
+
+    def cargar_exploracion(self, ruta_completa):
+        """Sustituye el contenido por una exploración completa, en una sola copia surfarray."""
+        self.orden.fill(-1)
+        self.visitas = 0
+        if ruta_completa:
+            filas, columnas = np.array(ruta_completa, dtype=np.int32).T
+            self.orden[filas, columnas] = np.arange(len(ruta_completa), dtype=np.int32)
+            self.visitas = len(ruta_completa)
+
+        imagen = np.zeros((self.N, self.N, 3), dtype=np.uint8)
+        visitadas = self.orden >= 0
+        imagen[visitadas] = self._colores(self.orden[visitadas])
+        # surfarray usa (x, y) = (columna, fila)
+        pygame.surfarray.blit_array(self.superficie, imagen.transpose(1, 0, 2))
+        self.version += 1
+
+    def agregar_visitas(self, posiciones):
+        """Añade visitas nuevas al final del orden y pinta solo esas celdas."""
+        nuevas = [(r, c) for r, c in posiciones if self.orden[r, c] < 0]
+        if not nuevas:
+            return
+        filas, columnas = np.array(nuevas, dtype=np.int32).T
+        indices = np.arange(self.visitas, self.visitas + len(nuevas), dtype=np.int32)
+        self.orden[filas, columnas] = indices
+        self.visitas += len(nuevas)
+
+        pixeles = pygame.surfarray.pixels3d(self.superficie)
+        try:
+            pixeles[columnas, filas] = self._colores(indices)
+        finally:
+            del pixeles
+        self.version += 1
+
+    def dibujar(self, pantalla, camara):
+        """Dibuja la capa sobre las celdas visibles y devuelve el rect ocupado."""
+        if self.visitas == 0:
+            return None
+        fila_ini, fila_fin, col_ini, col_fin = camara.rango_visible()
+        if fila_ini >= fila_fin or col_ini >= col_fin:
+            return None
+
+        t = camara.tamano_celda
+        clave = (fila_ini, fila_fin, col_ini, col_fin, t, self.version)
+        if self.cache_escalada is None or self.cache_escalada[0] != clave:
+            recorte = self.superficie.subsurface(
+                pygame.Rect(col_ini, fila_ini, col_fin - col_ini, fila_fin - fila_ini))
+            escalada = pygame.transform.scale(
+                recorte, ((col_fin - col_ini) * t, (fila_fin - fila_ini) * t))
+            escalada.set_colorkey(COLOR_NEGRO)
+            escalada.set_alpha(ALFA_MAPA_CALOR)
+            self.cache_escalada = (clave, escalada)
+
+        return pantalla.blit(self.cache_escalada[1], camara.rect_celda(fila_ini, col_ini).topleft)
@@ -0,0 +1,90 @@
+import os
+import time
+
+import numpy as np
+from .constants import *
+
+# Etapas de un frame de Juego.run, en el orden en que ocurren
+ETAPAS_FRAME = ['espera', 'eventos', 'actualizar', 'mundo', 'mapa_calor',
+                'abeja', 'enjambre', 'ui', 'display']
+
+
+class PerfiladorFrames:
+    """
+    Tiempos por etapa de los últimos frames.
+
+    Cada frame ocupa una fila (en nanosegundos, ``perf_counter_ns``) de un
+    búfer circular NumPy de ``capacidad`` frames; la última columna es el
+    total. Los percentiles se recalculan como mucho cada
+    ``INTERVALO_RESUMEN_PERFIL`` segundos y ``version`` aumenta cada vez,
+    para que el overlay solo se recomponga cuando cambian.
+    """
+
+    def __init__(self, etapas=ETAPAS_FRAME, capacidad=MUESTRAS_PERFIL):
+        self.etapas = list(etapas)
+        self.columnas = {etapa: i for i, etapa in enumerate(self.etapas)}
+        self.muestras = np.zeros((capacidad, len(self.etapas) + 1), dtype=np.int64)
+        self.frames = 0  # Frames registrados en total (el búfer guarda los últimos)
+        self.fila = np.zeros(len(self.etapas) + 1, dtype=np.int64)
+        self.inicio_frame = None
+        self.marca = None
+        self.resumen = {}
+        self.version = 0
+        self.ultimo_resumen = 0.0
+
+    def iniciar_frame(self):
+        self.fila[:] = 0
+        self.inicio_frame = self.marca = time.perf_counter_ns()
+
+    def medir(self, etapa):
+        """
+        Atribuye a ``etapa`` el tiempo desde la medición anterior del frame
+        (no hace nada fuera de un frame, p. ej. si se dibuja desde otro sitio).
+        """
+        if self.inicio_frame is None:
+            return
+        ahora = time.perf_counter_ns()
+        self.fila[self.columnas[etapa]] += ahora - self.marca
+        self.marca = ahora
+
+    def terminar_frame(self):
+        if self.inicio_frame is None:
+            return
+        self.fila[-1] = time.perf_counter_ns() - self.inicio_frame
+        self.muestras[self.frames % len(self.muestras)] = self.fila
+        self.frames += 1
+        self.inicio_frame = None
+
+        ahora = time.perf_counter()
+        if ahora - self.ultimo_resumen >= INTERVALO_RESUMEN_PERFIL:
+            self.ultimo_resumen = ahora
+            self.resumen = self.calcular_percentiles()
+            self.version += 1
+
+    def muestras_ordenadas(self):
+        """Filas guardadas, de la más antigua a la más reciente."""
+        capacidad = len(self.muestras)
+        if self.frames <= capacidad:
+            return self.muestras[:self.frames]
+        inicio = self.frames % capacidad
+        return np.concatenate([self.muestras[inicio:], self.muestras[:inicio]])
+
+    def calcular_percentiles(self, percentiles=(50, 95, 99)):
+        """{etapa (y 'frame'): (p50, p95, p99) en milisegundos}."""
+        muestras = self.muestras[:min(self.frames, len(self.muestras))]
+        if len(muestras) == 0:
+            return {}
+        valores = np.percentile(muestras, percentiles, axis=0) / 1e6
+        nombres = self.etapas + ['frame']
+        return {nombre: tuple(valores[:, i].tolist()) for i, nombre in enumerate(nombres)}
+
+    def volcar(self, ruta_archivo=RUTA_PERFIL_FRAMES):
+        """Guarda los frames del búfer en CSV (una fila por frame, en ms)."""
+        try:
+            os.makedirs(os.path.dirname(ruta_archivo) or '.', exist_ok=True)
+            muestras = self.muestras_ordenadas() / 1e6
+            np.savetxt(ruta_archivo, muestras, delimiter=',', fmt='%.4f',
+                       header=','.join(self.etapas + ['frame']), comments='')
+            print(f"✓ {len(muestras)} frames guardados en {ruta_archivo}")
+        except Exception as e:
+            print(f"⚠ Error guardando el perfil de frames: {e}")
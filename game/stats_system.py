@@ -1,8 +1,9 @@
 import time
-import json
-import os
 from datetime import datetime
 
+from .almacen_resultados import AlmacenResultados
+from .constants import RUTA_BASE_RESULTADOS
+
 class EstadisticasAlgoritmo:
     """Almacena las estadísticas de un algoritmo de búsqueda."""
     
@@ -22,16 +23,29 @@ class EstadisticasAlgoritmo:
         # Detalles de cada celda analizada
         self.detalles_celdas = []  # Lista con info de cada celda en la ruta
         
+        # Cobertura del análisis (con presupuesto puede quedar parcial)
+        self.flores_en_exploracion = 0
+        self.celdas_omitidas = []  # Flores sin analizar por presupuesto
+        self.origenes = {'modelo': 0, 'prefiltro': 0, 'cache': 0}
+        
         # Score (flores detectadas)
         self.score = 0
         
+        # Cascada de visión: resueltas por el prefiltro vs escaladas al ViT
+        self.prefiltro = {}
+        
+        # Latencias por etapa y contadores del sistema de visión
+        self.instrumentacion_vision = {}
+        
     def registrar_celda_analizada(self, posicion, tipo_celda, es_flor_segun_vision, 
-                                   etiqueta, probabilidad, confianza):
+                                   etiqueta, probabilidad, confianza, origen='modelo'):
         """
         Registra el análisis de una celda de tipo 'flor' en la ruta.
         Solo se llama para celdas que tienen imágenes de flores.
+        ``origen`` indica de dónde salió el resultado: 'modelo', 'prefiltro' o 'cache'.
         """
         self.celdas_analizadas += 1
+        self.origenes[origen] = self.origenes.get(origen, 0) + 1
         
         # Actualizar contadores según resultado de visión
         if es_flor_segun_vision:
@@ -47,9 +61,24 @@ class EstadisticasAlgoritmo:
             'es_flor_segun_vision': es_flor_segun_vision,
             'etiqueta_vision': etiqueta,
             'probabilidad': probabilidad,
-            'confianza': confianza
+            'confianza': confianza,
+            'origen': origen
         })
     
+    def registrar_celda_omitida(self, posicion):
+        """Registra una flor de la exploración que no se analizó por falta de presupuesto."""
+        self.celdas_omitidas.append(posicion)
+    
+    def calcular_cobertura_vision(self):
+        """Porcentaje de flores de la exploración que tienen resultado de visión."""
+        if self.flores_en_exploracion == 0:
+            return 100.0
+        return (self.celdas_analizadas / self.flores_en_exploracion) * 100
+    
+    def es_cobertura_parcial(self):
+        """Indica si el análisis de visión dejó flores sin analizar."""
+        return len(self.celdas_omitidas) > 0
+    
     def calcular_score(self):
         """Calcula el score total (flores detectadas por visión)."""
         return self.flores_detectadas_vision
@@ -85,6 +114,12 @@ class EstadisticasAlgoritmo:
         lineas.append(f"  • 🌸 Flores confirmadas (VC): {self.flores_detectadas_vision}")
         lineas.append(f"  • ❌ Imágenes no reconocidas: {self.no_flores}")
         lineas.append(f"  • 🏆 SCORE: {self.calcular_score()}")
+        if self.es_cobertura_parcial():
+            lineas.append(f"  • ⚠ COBERTURA PARCIAL: {self.celdas_analizadas}/{self.flores_en_exploracion} "
+                          f"flores ({self.calcular_cobertura_vision():.1f}%), "
+                          f"{len(self.celdas_omitidas)} omitidas por presupuesto")
+        lineas.append(f"  • Origen: {self.origenes.get('modelo', 0)} modelo, "
+                      f"{self.origenes.get('prefiltro', 0)} prefiltro, {self.origenes.get('cache', 0)} cache")
         
         # Mostrar coordenadas de flores detectadas
         if self.flores_detectadas_vision > 0:
@@ -109,6 +144,21 @@ class EstadisticasAlgoritmo:
         lineas.append(f"\n📈 MÉTRICAS:")
         lineas.append(f"  • Eficiencia: {self.calcular_eficiencia():.2f}% (flores/exploración)")
         lineas.append(f"  • Precisión VC: {self.calcular_precision_deteccion():.2f}%")
+        if self.prefiltro.get('consultas', 0) > 0:
+            lineas.append(f"  • Escaladas al ViT: {self.prefiltro['escaladas']}/{self.prefiltro['consultas']} "
+                          f"({self.prefiltro['tasa_escalado']:.1f}%)")
+            if self.prefiltro.get('tiempo_ahorrado') is not None:
+                lineas.append(f"  • Tiempo VC ahorrado: {self.prefiltro['tiempo_ahorrado']:.4f}s")
+        
+        etapas = self.instrumentacion_vision.get('etapas', {})
+        if etapas:
+            lineas.append(f"\n⏱  ETAPAS DE VISIÓN (media / p95):")
+            for etapa, datos in sorted(etapas.items(), key=lambda e: -e[1]['total_ms']):
+                lineas.append(f"  • {etapa}: {datos['media_ms']:.3f}ms / {datos['p95_ms']:.3f}ms "
+                              f"(x{datos['cantidad']}, total {datos['total_ms']:.1f}ms)")
+            contadores = self.instrumentacion_vision.get('contadores', {})
+            for contador, valor in sorted(contadores.items()):
+                lineas.append(f"  • {contador}: {valor}")
         lineas.append(f"{'='*50}")
         
         return "\n".join(lineas)
@@ -127,6 +177,13 @@ class EstadisticasAlgoritmo:
             'eficiencia': self.calcular_eficiencia(),
             'precision': self.calcular_precision_deteccion(),
             'detalles_celdas': self.detalles_celdas,
+            'flores_en_exploracion': self.flores_en_exploracion,
+            'celdas_omitidas': self.celdas_omitidas,
+            'cobertura_vision': self.calcular_cobertura_vision(),
+            'cobertura_parcial': self.es_cobertura_parcial(),
+            'origenes': self.origenes,
+            'prefiltro': self.prefiltro,
+            'instrumentacion_vision': self.instrumentacion_vision,
             'exito': self.exito
         }
 
@@ -137,19 +194,34 @@ class ComparadorAlgoritmos:
     def __init__(self):
         self.estadisticas = {}  # {nombre_algoritmo: EstadisticasAlgoritmo}
         self.historial_comparaciones = []
+        self.vision_compartida = None  # Resumen del análisis de visión deduplicado
+        self.version = 0  # Aumenta con cada cambio; la UI y comparar_algoritmos cachean por ella
+        self._ultima_comparacion = None  # (versión, comparación)
         
     def agregar_estadistica(self, nombre_algoritmo, estadistica):
         """Agrega las estadísticas de un algoritmo."""
         self.estadisticas[nombre_algoritmo] = estadistica
+        self.version += 1
+        
+    def registrar_vision_compartida(self, info):
+        """Guarda el resumen del análisis de visión compartido entre algoritmos."""
+        self.vision_compartida = info
+        self.version += 1
         
     def obtener_estadistica(self, nombre_algoritmo):
         """Obtiene las estadísticas de un algoritmo específico."""
         return self.estadisticas.get(nombre_algoritmo)
     
     def comparar_algoritmos(self):
-        """Genera un análisis comparativo entre todos los algoritmos."""
+        """
+        Genera un análisis comparativo entre todos los algoritmos. Mientras no
+        cambien las estadísticas devuelve la misma comparación, sin volver a
+        calcularla ni añadirla otra vez al historial.
+        """
         if len(self.estadisticas) < 2:
             return None
+        if self._ultima_comparacion is not None and self._ultima_comparacion[0] == self.version:
+            return self._ultima_comparacion[1]
         
         comparacion = {
             'fecha': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -183,11 +255,15 @@ class ComparadorAlgoritmos:
         mejor_ruta = min(nombres, key=lambda n: self.estadisticas[n].longitud_ruta)
         comparacion['mejor_ruta'] = mejor_ruta
         
+        if self.vision_compartida:
+            comparacion['vision_compartida'] = self.vision_compartida
+        
         # Análisis textual
         comparacion['analisis'] = self._generar_analisis_textual(comparacion)
         
         # Guardar en historial
         self.historial_comparaciones.append(comparacion)
+        self._ultima_comparacion = (self.version, comparacion)
         
         return comparacion
     
@@ -218,47 +294,45 @@ class ComparadorAlgoritmos:
         lineas.append(f"🛤️  Mejor Ruta: {comparacion['mejor_ruta']}")
         lineas.append("=" * 70)
         
+        vision = comparacion.get('vision_compartida')
+        if vision:
+            lineas.append(f"♻ Visión compartida: {vision['flores_unicas']} flores únicas, "
+                         f"{vision['celdas_repetidas']} análisis repetidos evitados "
+                         f"(~{vision['tiempo_vision_ahorrado']:.4f}s ahorrados)")
+            for nombre, tiempo in vision.get('tiempos_por_estrategia', {}).items():
+                lineas.append(f"  ⏱  {nombre}: {tiempo:.4f}s (búsqueda + visión)")
+            if 'tiempo_pared' in vision:
+                lineas.append(f"⏱ Tiempo de pared total: {vision['tiempo_pared']:.4f}s")
+            lineas.append("=" * 70)
+        
         return "\n".join(lineas)
     
-    def guardar_comparacion(self, ruta_archivo="data/comparaciones.json"):
-        """Guarda la comparación en un archivo JSON."""
+    def guardar_comparacion(self, ruta_base=RUTA_BASE_RESULTADOS, tamano_grid=None):
+        """Añade la comparación actual al almacén de resultados (sin reescribir las anteriores)."""
         try:
-            # Crear directorio si no existe
-            os.makedirs(os.path.dirname(ruta_archivo), exist_ok=True)
-            
-            # Cargar comparaciones existentes
-            if os.path.exists(ruta_archivo):
-                with open(ruta_archivo, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            else:
-                data = []
-            
-            # Agregar nueva comparación
-            if self.historial_comparaciones:
-                data.append(self.historial_comparaciones[-1])
-            
-            # Guardar
-            with open(ruta_archivo, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-            print(f"✓ Comparación guardada en {ruta_archivo}")
+            if not self.historial_comparaciones:
+                print("⚠ No hay comparación para guardar")
+                return
+            almacen = AlmacenResultados(ruta_base)
+            almacen.guardar(self.historial_comparaciones[-1], tamano_grid)
+            print(f"✓ Comparación guardada en {ruta_base}")
             
         except Exception as e:
             print(f"⚠ Error guardando comparación: {e}")
     
-    def cargar_historial(self, ruta_archivo="data/comparaciones.json"):
-        """Carga el historial de comparaciones."""
+    def cargar_historial(self, ruta_base=RUTA_BASE_RESULTADOS, limite=None):
+        """Carga el historial de comparaciones (las ``limite`` últimas si se indica)."""
         try:
-            if os.path.exists(ruta_archivo):
-                with open(ruta_archivo, 'r', encoding='utf-8') as f:
-                    self.historial_comparaciones = json.load(f)
-                print(f"✓ Historial cargado: {len(self.historial_comparaciones)} comparaciones")
+            self.historial_comparaciones = AlmacenResultados(ruta_base).historial(limite)
+            print(f"✓ Historial cargado: {len(self.historial_comparaciones)} comparaciones")
         except Exception as e:
             print(f"⚠ Error cargando historial: {e}")
     
     def limpiar(self):
         """Limpia las estadísticas actuales para una nueva comparación."""
         self.estadisticas = {}
+        self.vision_compartida = None
+        self.version += 1
     
     def imprimir_comparacion(self):
         """Imprime la última comparación en consola."""
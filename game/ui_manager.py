@@ -1,4 +1,7 @@
+from collections import OrderedDict
+
 import pygame
+from .constants import *
 
 class UIManager:
     """Gestor de interfaz de usuario para mostrar estadísticas y información."""
@@ -15,8 +18,60 @@ class UIManager:
         self.comparador = None
         self.mostrar_panel_completo = False
         
+        # Cache de render: textos por (fuente, texto, color) y paneles ya compuestos
+        self.textos = OrderedDict()  # {(fuente, texto, color): Surface}, LRU
+        self.fondo_instrucciones = None
+        self.cache_panel = None  # ((id comparador, versión, con temporizador), Surface)
+        self.cache_resumen = None  # (textos, Surface)
+        self.cache_perfil = None  # (versión del perfilador, Surface)
+        
+    def _texto(self, fuente, texto, color):
+        """``fuente.render`` con cache LRU por (fuente, texto, color)."""
+        clave = (fuente, texto, tuple(color))
+        superficie = self.textos.get(clave)
+        if superficie is None:
+            superficie = fuente.render(texto, True, color)
+            self.textos[clave] = superficie
+            if len(self.textos) > MAX_TEXTOS_EN_CACHE:
+                self.textos.popitem(last=False)
+        else:
+            self.textos.move_to_end(clave)
+        return superficie
+    
+    def _blit_panel(self, pantalla, panel, posicion, franja=None, dinamicos=()):
+        """
+        Dibuja un panel cacheado. Si hay ``franja`` (rect local del panel), esa
+        zona se recompone sobre una copia con los textos ``dinamicos``
+        [(Surface, (x, y) locales)] y el resto se copia tal cual del cache.
+        Devuelve el rect ocupado.
+        """
+        if franja is None:
+            return pantalla.blit(panel, posicion)
+        
+        x, y = posicion
+        ancho, alto = panel.get_size()
+        if franja.top > 0:
+            pantalla.blit(panel, (x, y), pygame.Rect(0, 0, ancho, franja.top))
+        if franja.bottom < alto:
+            pantalla.blit(panel, (x, y + franja.bottom),
+                          pygame.Rect(0, franja.bottom, ancho, alto - franja.bottom))
+        
+        zona = panel.subsurface(franja).copy()
+        for superficie, (dx, dy) in dinamicos:
+            zona.blit(superficie, (dx - franja.x, dy - franja.y))
+        zona.set_alpha(panel.get_alpha())
+        pantalla.blit(zona, (x + franja.x, y + franja.y))
+        return pygame.Rect(x, y, ancho, alto)
+    
+    def _texto_tiempo(self, agente_abeja, fuente, plantilla):
+        """Texto del temporizador de la abeja (cambia cada frame, no se cachea)."""
+        tiempo_simulado, tiempo_real = agente_abeja.obtener_tiempo_transcurrido()
+        return fuente.render(plantilla.format(simulado=tiempo_simulado, real=tiempo_real,
+                                              multiplicador=agente_abeja.multiplicador_velocidad),
+                             True, (100, 255, 255))
+    
     def dibujar_instrucciones(self, pantalla, estado_seleccion):
-        """Dibuja las instrucciones en la parte superior."""
+        """Dibuja las instrucciones en la parte superior. Devuelve el rect ocupado."""
         instrucciones = {
             'inicio': 'Click para seleccionar INICIO (verde)',
             'meta': 'Click para seleccionar META/ENJAMBRE (rojo)',
@@ -24,15 +79,17 @@ class UIManager:
         }
         
         texto = instrucciones.get(estado_seleccion, '')
-        superficie_texto = self.fuente_texto.render(texto, True, (255, 255, 255))
+        superficie_texto = self._texto(self.fuente_texto, texto, (255, 255, 255))
         rect_texto = superficie_texto.get_rect(center=(self.ancho // 2, 15))
         
         # Fondo semi-transparente
-        fondo = pygame.Surface((self.ancho, 30))
-        fondo.set_alpha(200)
-        fondo.fill((0, 0, 0))
-        pantalla.blit(fondo, (0, 0))
+        if self.fondo_instrucciones is None:
+            self.fondo_instrucciones = pygame.Surface((self.ancho, 30))
+            self.fondo_instrucciones.set_alpha(200)
+            self.fondo_instrucciones.fill((0, 0, 0))
+        rect_barra = pantalla.blit(self.fondo_instrucciones, (0, 0))
         pantalla.blit(superficie_texto, rect_texto)
+        return rect_barra
     
     def dibujar_estadisticas_algoritmo(self, pantalla, stats, x, y, color_titulo):
         """Dibuja las estadísticas de un algoritmo en una posición específica."""
@@ -42,12 +99,12 @@ class UIManager:
         offset_y = y
         
         # Título
-        titulo = self.fuente_titulo.render(f"{stats.nombre}", True, color_titulo)
+        titulo = self._texto(self.fuente_titulo, f"{stats.nombre}", color_titulo)
         pantalla.blit(titulo, (x, offset_y))
         offset_y += 30
         
         # SCORE destacado
-        score_texto = self.fuente_titulo.render(f"🏆 SCORE: {stats.calcular_score()}", True, (255, 215, 0))
+        score_texto = self._texto(self.fuente_titulo, f"🏆 SCORE: {stats.calcular_score()}", (255, 215, 0))
         pantalla.blit(score_texto, (x, offset_y))
         offset_y += 35
         
@@ -63,19 +120,40 @@ class UIManager:
         ]
         
         for linea in lineas:
-            texto = self.fuente_pequena.render(linea, True, (200, 200, 200))
+            texto = self._texto(self.fuente_pequena, linea, (200, 200, 200))
             pantalla.blit(texto, (x, offset_y))
             offset_y += 18
         
         return offset_y
     
     def dibujar_panel_comparacion(self, pantalla, comparador, agente_abeja=None):
-        """Dibuja un panel con la comparación de algoritmos."""
+        """
+        Dibuja un panel con la comparación de algoritmos. Devuelve el rect ocupado.
+        El panel se compone una vez por versión del comparador; cada frame solo
+        se renderiza el temporizador de la abeja.
+        """
         if not comparador or len(comparador.estadisticas) == 0:
             return
         
-        # Crear superficie para el panel
         ancho_panel = 380
+        con_tiempo = agente_abeja is not None
+        clave = (id(comparador), comparador.version, con_tiempo)
+        if self.cache_panel is None or self.cache_panel[0] != clave:
+            self.cache_panel = (clave, self._componer_panel_comparacion(comparador, ancho_panel, con_tiempo))
+        panel = self.cache_panel[1]
+        
+        posicion = (self.ancho - ancho_panel, 0)
+        if not con_tiempo:
+            return self._blit_panel(pantalla, panel, posicion)
+        
+        tiempo_texto = self._texto_tiempo(
+            agente_abeja, self.fuente_texto,
+            "Tiempo Recorrido: {simulado:.2f}s (real {real:.2f}s, x{multiplicador:g})")
+        franja = pygame.Rect(0, 45, ancho_panel, 30)  # Fila del temporizador
+        return self._blit_panel(pantalla, panel, posicion, franja, [(tiempo_texto, (20, 45))])
+    
+    def _componer_panel_comparacion(self, comparador, ancho_panel, con_tiempo):
+        """Superficie estática del panel de comparación (sin el temporizador)."""
         alto_panel = self.alto
         panel = pygame.Surface((ancho_panel, alto_panel))
         panel.set_alpha(240)
@@ -87,15 +165,12 @@ class UIManager:
         y_offset = 10
         
         # Título principal
-        titulo = self.fuente_titulo.render("COMPARACIÓN", True, (255, 200, 0))
+        titulo = self._texto(self.fuente_titulo, "COMPARACIÓN", (255, 200, 0))
         panel.blit(titulo, (ancho_panel // 2 - titulo.get_width() // 2, y_offset))
         y_offset += 35
         
-        # Temporizador si la abeja está activa
-        if agente_abeja:
-            tiempo_abeja = agente_abeja.obtener_tiempo_transcurrido()
-            tiempo_texto = self.fuente_texto.render(f"Tiempo Recorrido: {tiempo_abeja:.2f}s", True, (100, 255, 255))
-            panel.blit(tiempo_texto, (20, y_offset))
+        # Hueco del temporizador (se dibuja en cada frame)
+        if con_tiempo:
             y_offset += 30
         
         # Dibujar estadísticas de cada algoritmo
@@ -108,12 +183,12 @@ class UIManager:
             color = colores_algoritmos.get(nombre, (200, 200, 200))
             
             # Título del algoritmo
-            texto_algo = self.fuente_texto.render(f"{nombre}", True, color)
+            texto_algo = self._texto(self.fuente_texto, f"{nombre}", color)
             panel.blit(texto_algo, (20, y_offset))
             y_offset += 25
             
             # SCORE GRANDE
-            score_texto = self.fuente_titulo.render(f"SCORE: {stats.calcular_score()}", True, (255, 215, 0))
+            score_texto = self._texto(self.fuente_titulo, f"SCORE: {stats.calcular_score()}", (255, 215, 0))
             panel.blit(score_texto, (30, y_offset))
             y_offset += 30
             
@@ -129,7 +204,7 @@ class UIManager:
             ]
             
             for linea in lineas:
-                texto = self.fuente_pequena.render(linea, True, (220, 220, 220))
+                texto = self._texto(self.fuente_pequena, linea, (220, 220, 220))
                 panel.blit(texto, (30, y_offset))
                 y_offset += 18
             
@@ -143,7 +218,7 @@ class UIManager:
         if len(comparador.estadisticas) >= 2:
             comparacion = comparador.comparar_algoritmos()
             
-            titulo_ganadores = self.fuente_texto.render("🏆 GANADORES", True, (255, 215, 0))
+            titulo_ganadores = self._texto(self.fuente_texto, "🏆 GANADORES", (255, 215, 0))
             panel.blit(titulo_ganadores, (ancho_panel // 2 - titulo_ganadores.get_width() // 2, y_offset))
             y_offset += 30
             
@@ -155,7 +230,7 @@ class UIManager:
             ]
             
             for ganador in ganadores:
-                texto = self.fuente_pequena.render(ganador, True, (150, 255, 150))
+                texto = self._texto(self.fuente_pequena, ganador, (150, 255, 150))
                 panel.blit(texto, (20, y_offset))
                 y_offset += 20
         
@@ -170,53 +245,100 @@ class UIManager:
         ]
         
         for inst in instrucciones:
-            texto = self.fuente_pequena.render(inst, True, (150, 150, 150))
+            texto = self._texto(self.fuente_pequena, inst, (150, 150, 150))
             panel.blit(texto, (20, y_offset))
             y_offset += 16
         
-        # Dibujar el panel en la pantalla
-        pantalla.blit(panel, (self.ancho - ancho_panel, 0))
+        return panel
     
     def dibujar_resumen_simple(self, pantalla, stats, nombre, agente_abeja=None):
-        """Dibuja un resumen simple en la parte inferior de la pantalla."""
+        """
+        Dibuja un resumen simple en la parte inferior de la pantalla. Devuelve
+        el rect ocupado. La barra se compone solo cuando cambian sus textos.
+        """
         if not stats:
             return
         
-        # Crear barra inferior
         altura_barra = 90
+        y_barra = self.alto - altura_barra
+        
+        # Información resumida (la clave del cache son los propios textos)
+        textos = (
+            f"SCORE: {stats.calcular_score()}",
+            f"{nombre} | Búsqueda: {stats.tiempo_ejecucion:.3f}s | Explorados: {stats.longitud_ruta} nodos | Flores: {stats.flores_detectadas_vision}",
+            f"Confirmadas: {stats.flores_detectadas_vision} | No reconocidas: {stats.no_flores}",
+            f"Eficiencia: {stats.calcular_eficiencia():.1f}% | Precisión VC: {stats.calcular_precision_deteccion():.1f}%"
+        )
+        if self.cache_resumen is None or self.cache_resumen[0] != textos:
+            self.cache_resumen = (textos, self._componer_resumen_simple(textos, altura_barra))
+        barra = self.cache_resumen[1]
+        
+        if not agente_abeja:
+            return self._blit_panel(pantalla, barra, (0, y_barra))
+        
+        tiempo_texto = self._texto_tiempo(
+            agente_abeja, self.fuente_texto,
+            "Tiempo: {simulado:.2f}s (real {real:.2f}s) x{multiplicador:g}")
+        franja = pygame.Rect(0, 0, self.ancho, 34)  # Fila del SCORE y el temporizador
+        return self._blit_panel(pantalla, barra, (0, y_barra), franja,
+                                [(tiempo_texto, (self.ancho - tiempo_texto.get_width() - 20, 8))])
+    
+    def _componer_resumen_simple(self, textos, altura_barra):
+        """Superficie estática de la barra de resumen (sin el temporizador)."""
+        score, resumen, detalle, eficiencia = textos
         barra = pygame.Surface((self.ancho, altura_barra))
         barra.set_alpha(220)
         barra.fill((25, 25, 35))
         
-        y_barra = self.alto - altura_barra
-        
         # SCORE destacado
-        score_texto = self.fuente_titulo.render(f"SCORE: {stats.calcular_score()}", True, (255, 215, 0))
-        barra.blit(score_texto, (20, 8))
-        
-        # Temporizador si la abeja está activa
-        if agente_abeja:
-            tiempo_abeja = agente_abeja.obtener_tiempo_transcurrido()
-            tiempo_texto = self.fuente_texto.render(f"Tiempo: {tiempo_abeja:.2f}s", True, (100, 255, 255))
-            barra.blit(tiempo_texto, (self.ancho - 200, 8))
-        
-        # Información resumida
-        resumen = f"{nombre} | Búsqueda: {stats.tiempo_ejecucion:.3f}s | Explorados: {stats.longitud_ruta} nodos | Flores: {stats.flores_detectadas_vision}"
+        barra.blit(self._texto(self.fuente_titulo, score, (255, 215, 0)), (20, 8))
         
-        texto = self.fuente_pequena.render(resumen, True, (150, 255, 150))
-        barra.blit(texto, (20, 42))
+        barra.blit(self._texto(self.fuente_pequena, resumen, (150, 255, 150)), (20, 42))
         
         # Tercera línea
-        detalle = f"Confirmadas: {stats.flores_detectadas_vision} | No reconocidas: {stats.no_flores}"
-        texto2 = self.fuente_pequena.render(detalle, True, (200, 200, 200))
-        barra.blit(texto2, (20, 58))
+        barra.blit(self._texto(self.fuente_pequena, detalle, (200, 200, 200)), (20, 58))
         
         # Cuarta línea
-        eficiencia = f"Eficiencia: {stats.calcular_eficiencia():.1f}% | Precisión VC: {stats.calcular_precision_deteccion():.1f}%"
-        texto3 = self.fuente_pequena.render(eficiencia, True, (200, 200, 200))
-        barra.blit(texto3, (20, 74))
+        barra.blit(self._texto(self.fuente_pequena, eficiencia, (200, 200, 200)), (20, 74))
         
-        pantalla.blit(barra, (0, y_barra))
+        return barra
+    
+    def dibujar_perfil(self, pantalla, perfilador):
+        """
+        Overlay con p50/p95/p99 (ms) de cada etapa del frame. Se recompone solo
+        cuando el perfilador recalcula los percentiles. Devuelve el rect ocupado.
+        """
+        if not perfilador.resumen:
+            return
+        if self.cache_perfil is None or self.cache_perfil[0] != perfilador.version:
+            self.cache_perfil = (perfilador.version, self._componer_perfil(perfilador))
+        return pantalla.blit(self.cache_perfil[1], (0, 34))
+    
+    def _componer_perfil(self, perfilador):
+        """Tabla del overlay del perfilador: una columna por percentil, alineadas a la derecha."""
+        fuente = self.fuente_pequena
+        filas = [("Etapa (ms)", "p50", "p95", "p99", (255, 200, 0))]
+        for etapa, valores in perfilador.resumen.items():
+            color = (255, 255, 255) if etapa == 'frame' else (200, 200, 200)
+            filas.append((etapa,) + tuple(f"{v:.2f}" for v in valores) + (color,))
+        pie = f"{min(perfilador.frames, len(perfilador.muestras))} frames | G: guardar"
+        
+        ancho_nombre, ancho_columna, alto_linea = 80, 48, 16
+        ancho = 8 + ancho_nombre + 3 * ancho_columna + 8
+        overlay = pygame.Surface((ancho, alto_linea * (len(filas) + 1) + 12))
+        overlay.set_alpha(210)
+        overlay.fill((10, 10, 20))
+        pygame.draw.rect(overlay, (100, 100, 150), overlay.get_rect(), 1)
+        
+        y = 6
+        for *celdas, color in filas:
+            overlay.blit(self._texto(fuente, celdas[0], color), (8, y))
+            for i, valor in enumerate(celdas[1:], start=1):
+                texto = self._texto(fuente, valor, color)
+                overlay.blit(texto, (8 + ancho_nombre + i * ancho_columna - texto.get_width(), y))
+            y += alto_linea
+        overlay.blit(self._texto(fuente, pie, (150, 150, 150)), (8, y))
+        return overlay
     
     def dibujar_detalles_flores(self, pantalla, stats, x_inicio, y_inicio):
         """Dibuja detalles de las flores encontradas."""
@@ -224,7 +346,7 @@ class UIManager:
             return
         
         y = y_inicio
-        titulo = self.fuente_texto.render("Celdas Analizadas:", True, (255, 200, 100))
+        titulo = self._texto(self.fuente_texto, "Celdas Analizadas:", (255, 200, 100))
         pantalla.blit(titulo, (x_inicio, y))
         y += 25
         
@@ -242,7 +364,7 @@ class UIManager:
                 texto = f"🌸 ({pos[0]},{pos[1]}) {etiqueta} {prob:.2f}"
                 color = (150, 255, 150)
                 
-                superficie = self.fuente_pequena.render(texto, True, color)
+                superficie = self._texto(self.fuente_pequena, texto, color)
                 pantalla.blit(superficie, (x_inicio, y))
                 y += 18
                 flores_mostradas += 1
@@ -257,12 +379,35 @@ class UIManager:
         overlay.fill((0, 0, 0))
         pantalla.blit(overlay, (0, 0))
         
-        texto = self.fuente_titulo.render(mensaje, True, (255, 255, 100))
+        texto = self._texto(self.fuente_titulo, mensaje, (255, 255, 100))
         rect = texto.get_rect(center=(self.ancho // 2, self.alto // 2))
         pantalla.blit(texto, rect)
         
         pygame.display.flip()
     
+    def dibujar_progreso(self, pantalla, texto, fraccion=None):
+        """
+        Barra de progreso bajo el mensaje de carga (``fraccion`` entre 0 y 1,
+        o ``None`` si no se conoce el total). Actualiza solo su zona de la
+        pantalla, porque se llama mientras el bucle principal está bloqueado.
+        """
+        ancho_barra = 420
+        rect = pygame.Rect(0, 0, ancho_barra, 56)
+        rect.midtop = (self.ancho // 2, self.alto // 2 + 30)
+        pygame.draw.rect(pantalla, (25, 25, 35), rect)
+        pygame.draw.rect(pantalla, (100, 100, 150), rect, 2)
+        
+        texto_superficie = self._texto(self.fuente_texto, texto, (220, 220, 220))
+        pantalla.blit(texto_superficie, (rect.x + 12, rect.y + 8))
+        
+        if fraccion is not None:
+            barra = pygame.Rect(rect.x + 12, rect.y + 32, ancho_barra - 24, 12)
+            pygame.draw.rect(pantalla, (60, 60, 80), barra)
+            barra.width = int(barra.width * max(0.0, min(fraccion, 1.0)))
+            pygame.draw.rect(pantalla, (255, 215, 0), barra)
+        
+        pygame.display.update(rect)
+    
     def dibujar_error(self, pantalla, mensaje_error):
         """Muestra un mensaje de error."""
         altura_barra = 40
@@ -270,7 +415,7 @@ class UIManager:
         barra.set_alpha(220)
         barra.fill((150, 0, 0))
         
-        texto = self.fuente_texto.render(f"⚠ {mensaje_error}", True, (255, 255, 255))
+        texto = self._texto(self.fuente_texto, f"⚠ {mensaje_error}", (255, 255, 255))
         barra.blit(texto, (20, 10))
         
         pantalla.blit(barra, (0, self.alto - altura_barra))
@@ -298,7 +443,7 @@ class UIManager:
         
         y = 5
         for linea in lineas:
-            texto = self.fuente_pequena.render(linea, True, (220, 220, 220))
+            texto = self._texto(self.fuente_pequena, linea, (220, 220, 220))
             tooltip.blit(texto, (10, y))
             y += 18
         
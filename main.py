@@ -1,9 +1,23 @@
 import pygame
+import glob
+import os
 import sys
+import threading
+from datetime import datetime
 from game.constants import *
 from game.grid_model import *
+from game.camara import Camara
+from game.mapa_calor import MapaCalor
+from game.enjambre import Enjambre
+from game.gestor_recursos import obtener_gestor
+from game.perfilador import PerfiladorFrames
 from game.bee_agent import *
-from core.search_algorithms import bfs_panal, dfs_panal, ejecutar_busqueda_con_analisis
+from core.eventos import obtener_canal, RegistroEventos, MetricasEventos
+from core.traza import guardar_traza, cargar_traza, leer_huella, huella_mundo, reproducir_traza
+from core.search_algorithms import (
+    bfs_panal, dfs_panal, ejecutar_busqueda_con_analisis, ejecutar_comparacion_con_analisis,
+    PASO_EVENTOS_BUSQUEDA
+)
 from vision.vision_system import VisionSystem
 from game.stats_system import ComparadorAlgoritmos, EstadisticasAlgoritmo
 from game.ui_manager import UIManager
@@ -14,13 +28,20 @@ class Juego:
 
         self.pantalla = pygame.display.set_mode((ANCHO_PANTALLA, ALTO_PANTALLA))
         pygame.display.set_caption("Proyecto Abeja Buscadora (IA + Visión por Computadora)")
+        # Sprites, flores y sonidos se leen en segundo plano mientras arranca el resto
+        obtener_gestor().precargar_en_segundo_plano()
         self.mundo = Mundo(TAMANO_N)
+        self.camara = Camara(ANCHO_PANTALLA, ALTO_PANTALLA, TAMANO_N)
+        self.mapa_calor = MapaCalor(self.mundo)
+        self.mostrar_mapa_calor = False
         self.estado_seleccion = 'inicio'
         self.agente_abeja = None
+        self.enjambre = None
         self.reloj = pygame.time.Clock()
         
         # Nuevos sistemas
-        self.sistema_vision = VisionSystem()
+        self.sistema_vision = VisionSystem(modo_rapido=MODO_RAPIDO_VISION)
+        self.sistema_vision.precargar_en_segundo_plano(self.mundo)
         self.comparador = ComparadorAlgoritmos()
         self.ui_manager = UIManager(ANCHO_PANTALLA, ALTO_PANTALLA)
         self.ui_manager.comparador = self.comparador
@@ -30,6 +51,29 @@ class Juego:
         self.ultimo_algoritmo_ejecutado = None
         self.estadisticas_actuales = None
         
+        # Render por zonas sucias
+        self.redibujo_completo = True  # El próximo frame repinta toda la pantalla
+        self.rects_frame_anterior = []  # Zonas de abeja/UI dibujadas en el frame anterior
+        self.version_camara_dibujada = self.camara.version
+        
+        # Perfilador de frames (siempre midiendo; el overlay se alterna con P)
+        self.perfilador = PerfiladorFrames()
+        self.mostrar_perfil = False
+        
+        # Progreso de búsqueda y visión: barra en pantalla, métricas y registro opcional
+        canal = obtener_canal()
+        self.ultimo_progreso = 0.0
+        self.ultimo_mapa_calor = 0.0
+        # El mapa de calor va antes que la barra para que esta quede encima
+        canal.suscribir(self.actualizar_mapa_calor, ['nodos_expandidos'])
+        canal.suscribir(self.mostrar_progreso, ['nodos_expandidos', 'flores_analizadas'])
+        self.metricas_eventos = MetricasEventos()
+        canal.suscribir(self.metricas_eventos, MetricasEventos.TIPOS)
+        self.registro_eventos = None
+        if RUTA_REGISTRO_EVENTOS:
+            self.registro_eventos = RegistroEventos(RUTA_REGISTRO_EVENTOS)
+            canal.suscribir(self.registro_eventos)
+        
         print("=" * 60)
         print("🐝 PROYECTO ABEJA BUSCADORA")
         print("=" * 60)
@@ -42,12 +86,21 @@ class Juego:
         print("  6. Presiona 'TAB' para mostrar/ocultar panel")
         print("  7. Presiona 'S' para guardar resultados")
         print("  8. Presiona 'R' para reiniciar")
+        print("  H. Presiona 'H' para mostrar/ocultar el mapa de calor de la exploración")
+        print("  +/- cambian la velocidad de la abeja | 'F' salta al final del recorrido")
+        print(f"  'E' activa/desactiva el modo enjambre ({ABEJAS_ENJAMBRE} abejas volviendo a la meta)")
+        print("  9. Rueda del ratón = zoom | Flechas o arrastrar con botón derecho = mover vista")
+        print("  'T' guarda la traza de la última búsqueda | 'L' reproduce la última traza (restaura su mundo)")
+        print("  'P' muestra/oculta los tiempos por frame (p50/p95/p99) | 'G' los guarda en CSV")
         print("=" * 60)
     
     def ejecutar_busqueda(self, algoritmo_func, nombre_estrategia):
         """
         Ejecuta un algoritmo de búsqueda con análisis de visión completo.
         """
+        # El mensaje de carga tapa toda la pantalla
+        self.redibujo_completo = True
+        
         # Obtener coordenadas de inicio y meta
         inicio = None
         meta = None
@@ -78,7 +131,10 @@ class Juego:
                 meta=meta,
                 sistema_vision=self.sistema_vision,
                 pantalla=self.pantalla,
-                tamano_celda=TAMANO_CELDA
+                tamano_celda=TAMANO_CELDA,
+                presupuesto_segundos=PRESUPUESTO_VISION_SEGUNDOS,
+                presupuesto_llamadas=PRESUPUESTO_VISION_LLAMADAS,
+                prioridad=PRIORIDAD_VISION
             )
             
             if ruta:
@@ -89,6 +145,7 @@ class Juego:
                 
                 # Guardar estadísticas
                 self.estadisticas_actuales = estadisticas
+                self.mapa_calor.cargar_exploracion(estadisticas.ruta_completa)
                 self.ultimo_algoritmo_ejecutado = nombre_estrategia
                 
                 # Agregar al comparador
@@ -101,6 +158,7 @@ class Juego:
     
     def ejecutar_comparacion(self):
         """Ejecuta ambos algoritmos y realiza una comparación completa."""
+        self.redibujo_completo = True
         print(f"\n{'='*60}")
         print("📊 MODO COMPARACIÓN: Ejecutando BFS y DFS")
         print(f"{'='*60}")
@@ -122,39 +180,27 @@ class Juego:
             print("✗ ERROR: Debes seleccionar inicio y meta primero.")
             return
         
-        # Ejecutar BFS
-        self.ui_manager.dibujar_mensaje_cargando(self.pantalla, "Ejecutando BFS...")
-        ruta_bfs, stats_bfs = ejecutar_busqueda_con_analisis(
-            algoritmo=bfs_panal,
-            nombre="BFS",
+        # Ejecutar ambas búsquedas y analizar una sola vez la unión de sus flores
+        self.ui_manager.dibujar_mensaje_cargando(self.pantalla, "Ejecutando BFS y DFS...")
+        resultados, vision_compartida = ejecutar_comparacion_con_analisis(
+            estrategias=[("BFS", bfs_panal), ("DFS", dfs_panal)],
             mundo=self.mundo,
             inicio=inicio,
             meta=meta,
             sistema_vision=self.sistema_vision,
             pantalla=self.pantalla,
-            tamano_celda=TAMANO_CELDA
+            tamano_celda=TAMANO_CELDA,
+            presupuesto_segundos=PRESUPUESTO_VISION_SEGUNDOS,
+            presupuesto_llamadas=PRESUPUESTO_VISION_LLAMADAS
         )
+        self.comparador.registrar_vision_compartida(vision_compartida)
         
-        if ruta_bfs:
-            self.comparador.agregar_estadistica("BFS", stats_bfs)
-            print(stats_bfs.obtener_resumen_texto())
-        
-        # Ejecutar DFS
-        self.ui_manager.dibujar_mensaje_cargando(self.pantalla, "Ejecutando DFS...")
-        ruta_dfs, stats_dfs = ejecutar_busqueda_con_analisis(
-            algoritmo=dfs_panal,
-            nombre="DFS",
-            mundo=self.mundo,
-            inicio=inicio,
-            meta=meta,
-            sistema_vision=self.sistema_vision,
-            pantalla=self.pantalla,
-            tamano_celda=TAMANO_CELDA
-        )
-        
-        if ruta_dfs:
-            self.comparador.agregar_estadistica("DFS", stats_dfs)
-            print(stats_dfs.obtener_resumen_texto())
+        rutas = {}
+        for nombre, ruta, stats in resultados:
+            if ruta:
+                rutas[nombre] = (ruta, stats)
+                self.comparador.agregar_estadistica(nombre, stats)
+                print(stats.obtener_resumen_texto())
         
         # Realizar comparación
         if len(self.comparador.estadisticas) >= 2:
@@ -168,49 +214,211 @@ class Juego:
             
             # Usar la ruta del algoritmo con mayor score
             mejor_algoritmo = comparacion['ganador_score']
-            if mejor_algoritmo == "BFS":
-                self.agente_abeja.asignar_ruta(ruta_bfs)
-                self.estadisticas_actuales = stats_bfs
-            else:
-                self.agente_abeja.asignar_ruta(ruta_dfs)
-                self.estadisticas_actuales = stats_dfs
+            ruta_mejor, stats_mejor = rutas[mejor_algoritmo]
+            self.agente_abeja.asignar_ruta(ruta_mejor)
+            self.estadisticas_actuales = stats_mejor
+            self.mapa_calor.cargar_exploracion(stats_mejor.ruta_completa)
             
             print(f"\n🏆 Usando ruta de: {mejor_algoritmo} (Mayor score)")
     
+    def alternar_enjambre(self):
+        """Activa o desactiva el modo enjambre."""
+        if self.enjambre is not None:
+            self.enjambre = None
+            self.redibujo_completo = True
+            print("🐝 Modo enjambre desactivado")
+            return
+        
+        meta = None
+        for fila in self.mundo.grid:
+            for celda in fila:
+                if celda.tipo == TIPO_ENJAMBRE:
+                    meta = (celda.r, celda.c)
+        if not meta:
+            print("✗ ERROR: Debes seleccionar la meta primero.")
+            return
+        
+        self.enjambre = Enjambre.aleatorio(self.mundo, meta, ABEJAS_ENJAMBRE)
+        print(f"🐝 Modo enjambre: {self.enjambre.cantidad} abejas volando hacia la meta")
+    
+    def guardar_traza_actual(self):
+        """Guarda la traza binaria de la última búsqueda mostrada (tecla T)."""
+        estadisticas = self.estadisticas_actuales
+        if not estadisticas or not estadisticas.ruta_completa:
+            print("⚠ No hay ninguna búsqueda para guardar como traza")
+            return
+        ruta_archivo = os.path.join(DIRECTORIO_TRAZAS,
+                                    f"{estadisticas.nombre}_{datetime.now():%Y%m%d_%H%M%S}.traza")
+        try:
+            os.makedirs(DIRECTORIO_TRAZAS, exist_ok=True)
+            guardar_traza(ruta_archivo, self.mundo, estadisticas)
+            print(f"✓ Traza guardada en {ruta_archivo} ({os.path.getsize(ruta_archivo) / 1024:.1f} KB)")
+        except Exception as e:
+            print(f"⚠ Error guardando la traza: {e}")
+    
+    def reproducir_ultima_traza(self):
+        """
+        Reproduce una traza (tecla L) sin volver a ejecutar la búsqueda ni la
+        visión: la más reciente de este mundo o, si no hay ninguna (p. ej.
+        tras reiniciar o en otra sesión), la más reciente de todas,
+        restaurando antes el mundo guardado en ella.
+        """
+        huella = huella_mundo(self.mundo)
+        candidatas = sorted(glob.glob(os.path.join(DIRECTORIO_TRAZAS, '*.traza')),
+                            key=os.path.getmtime, reverse=True)
+        
+        def de_otro_mundo(ruta_archivo):
+            try:
+                return leer_huella(ruta_archivo) != huella
+            except (OSError, ValueError):
+                return True
+        
+        candidatas.sort(key=de_otro_mundo)  # Orden estable: primero las de este mundo
+        for ruta_archivo in candidatas:
+            try:
+                traza = cargar_traza(ruta_archivo)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Traza ilegible {ruta_archivo}: {e}")
+                continue
+            
+            camino, estadisticas = reproducir_traza(traza)
+            if not camino:
+                continue
+            if traza['huella'] != huella:
+                if traza['mundo'] is None or traza['N'] != self.mundo.N:
+                    continue
+                self.usar_mundo(Mundo(traza['N'], InstantaneaMundo(traza['N'], *traza['mundo'])), 'listo')
+                print(f"✓ Mundo restaurado desde {ruta_archivo}")
+            if not self.agente_abeja:
+                self.agente_abeja = Abeja(self.mundo, camino[0])
+            self.agente_abeja.asignar_ruta(camino)
+            self.estadisticas_actuales = estadisticas
+            self.ultimo_algoritmo_ejecutado = estadisticas.nombre
+            self.mapa_calor.cargar_exploracion(camino)
+            self.comparador.agregar_estadistica(estadisticas.nombre, estadisticas)
+            self.redibujo_completo = True
+            print(f"✓ Traza reproducida: {ruta_archivo} ({len(camino)} nodos, "
+                  f"{estadisticas.celdas_analizadas} flores)")
+            return
+        print(f"⚠ No hay trazas reproducibles en {DIRECTORIO_TRAZAS}")
+    
     def reiniciar(self):
         """Reinicia el juego."""
         print("\n🔄 Reiniciando juego...")
-        self.mundo = Mundo(TAMANO_N)
-        self.estado_seleccion = 'inicio'
+        self.usar_mundo(Mundo(TAMANO_N), 'inicio')
+        print("✓ Juego reiniciado")
+    
+    def usar_mundo(self, mundo, estado_seleccion):
+        """Sustituye el mundo y descarta todo lo calculado sobre el anterior."""
+        self.mundo = mundo
+        self.estado_seleccion = estado_seleccion
         self.agente_abeja = None
+        self.enjambre = None
         self.comparador.limpiar()
         self.sistema_vision.limpiar_cache()
+        self.sistema_vision.precargar_en_segundo_plano(self.mundo)
         self.mostrar_panel_comparacion = False
         self.estadisticas_actuales = None
-        print("✓ Juego reiniciado")
+        self.mapa_calor.reiniciar(self.mundo)
+        self.redibujo_completo = True
 
+    def actualizar_mapa_calor(self, evento):
+        """
+        Suscriptor del canal de eventos: añade al mapa de calor los nodos
+        recién expandidos, así se va llenando mientras corre la búsqueda. Al
+        terminar, ``cargar_exploracion`` lo sustituye por la exploración final.
+        """
+        # Solo lo publicado en el hilo principal es de esta búsqueda: las de la
+        # comparación en procesos (``buscar_estrategias``) publican en el canal
+        # de su proceso y sus eventos nunca llegan aquí
+        if threading.current_thread() is not threading.main_thread():
+            return
+        # El primer lote de una búsqueda empieza un mapa nuevo
+        if evento['expandidos'] <= PASO_EVENTOS_BUSQUEDA:
+            self.mapa_calor.reiniciar(self.mundo)
+        self.mapa_calor.agregar_visitas(evento['nuevos'])
+        
+        if not self.mostrar_mapa_calor:
+            return
+        if evento['tiempo'] - self.ultimo_mapa_calor < INTERVALO_PROGRESO_SEGUNDOS:
+            return
+        self.ultimo_mapa_calor = evento['tiempo']
+        # La capa es semitransparente: el mundo se repinta debajo (desde su capa estática)
+        self.mundo.dibujar(self.pantalla, self.camara)
+        rect = self.mapa_calor.dibujar(self.pantalla, self.camara)
+        if rect is not None:
+            pygame.display.update(rect)
+            self.redibujo_completo = True
+    
+    def mostrar_progreso(self, evento):
+        """
+        Suscriptor del canal de eventos: pinta la barra de progreso mientras
+        una búsqueda o el análisis de visión bloquean el bucle principal.
+        """
+        # Solo el hilo principal puede dibujar; las búsquedas de la comparación
+        # en procesos no publican en este canal
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if evento['tiempo'] - self.ultimo_progreso < INTERVALO_PROGRESO_SEGUNDOS:
+            return
+        self.ultimo_progreso = evento['tiempo']
+        
+        if evento['tipo'] == 'nodos_expandidos':
+            texto = f"{evento['algoritmo']}: {evento['expandidos']} nodos expandidos"
+            fraccion = None
+        else:
+            procesadas = evento['analizadas'] + evento['omitidas']
+            texto = f"Visión: {procesadas}/{evento['total']} flores"
+            if evento['eta'] is not None:
+                texto += f" (quedan ~{evento['eta']:.1f}s)"
+            fraccion = procesadas / evento['total'] if evento['total'] else None
+        self.ui_manager.dibujar_progreso(self.pantalla, texto, fraccion)
+        self.redibujo_completo = True  # La barra queda pintada fuera de las zonas sucias
+        pygame.event.pump()  # Que el sistema no dé la ventana por colgada
+    
+    def imprimir_eventos(self):
+        """Resumen de los eventos de progreso recibidos en la sesión."""
+        contadores = self.metricas_eventos.resumen()['contadores']
+        if contadores:
+            print("\n📡 Eventos: " + ", ".join(f"{tipo}={n}" for tipo, n in sorted(contadores.items())))
+        if self.registro_eventos:
+            self.registro_eventos.cerrar()
+            print(f"✓ Eventos guardados en {self.registro_eventos.ruta_archivo}")
+    
     def run(self):
         juego_en_marcha = True
         while juego_en_marcha:
+            self.perfilador.iniciar_frame()
+            # Segundos desde el frame anterior (acotado tras frames bloqueados)
+            dt = min(self.reloj.tick(FPS) / 1000.0, DT_MAXIMO)
+            self.perfilador.medir('espera')
+            
             for evento in pygame.event.get():
                 if evento.type == pygame.QUIT:
                     juego_en_marcha = False
 
-                if evento.type == pygame.MOUSEBUTTONDOWN:
+                # Solo el botón izquierdo selecciona (la rueda también genera clics)
+                if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1:
                     if self.estado_seleccion == 'inicio':
-                        col = evento.pos[0] // TAMANO_CELDA
-                        fila = evento.pos[1] // TAMANO_CELDA
+                        fila, col = self.camara.pantalla_a_celda(evento.pos)
                         
-                        if self.mundo.seleccionar_punto(evento.pos, TIPO_INICIO):
+                        if self.mundo.seleccionar_punto(evento.pos, TIPO_INICIO, self.camara):
                             self.agente_abeja = Abeja(self.mundo, (fila, col))
                             self.estado_seleccion = 'meta'
                             print("✓ Inicio seleccionado")
 
                     elif self.estado_seleccion == 'meta':
-                        if self.mundo.seleccionar_punto(evento.pos, TIPO_ENJAMBRE):
+                        if self.mundo.seleccionar_punto(evento.pos, TIPO_ENJAMBRE, self.camara):
                             self.estado_seleccion = 'listo'
                             print("✓ Meta seleccionada")
 
+                # Cámara: zoom con la rueda, desplazamiento arrastrando con el botón derecho
+                if evento.type == pygame.MOUSEWHEEL:
+                    self.camara.hacer_zoom(1.25 if evento.y > 0 else 0.8, pygame.mouse.get_pos())
+                
+                if evento.type == pygame.MOUSEMOTION and evento.buttons[2]:
+                    self.camara.desplazar(-evento.rel[0], -evento.rel[1])
+
                 if evento.type == pygame.KEYDOWN:
                     if self.estado_seleccion == 'listo':
                         if evento.key == pygame.K_1:  # BFS
@@ -219,6 +427,8 @@ class Juego:
                             self.ejecutar_busqueda(dfs_panal, "DFS")
                         elif evento.key == pygame.K_3:  # Comparación
                             self.ejecutar_comparacion()
+                        elif evento.key == pygame.K_e:  # Enjambre
+                            self.alternar_enjambre()
                     
                     # Controles globales
                     if evento.key == pygame.K_TAB:
@@ -227,52 +437,124 @@ class Juego:
                     
                     elif evento.key == pygame.K_s:
                         if len(self.comparador.estadisticas) > 0:
-                            self.comparador.guardar_comparacion()
+                            self.comparador.guardar_comparacion(tamano_grid=self.mundo.N)
                         else:
                             print("⚠ No hay estadísticas para guardar")
                     
                     elif evento.key == pygame.K_r:
                         self.reiniciar()
+                    
+                    elif evento.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                        if self.agente_abeja:
+                            self.agente_abeja.cambiar_velocidad(2.0)
+                    elif evento.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        if self.agente_abeja:
+                            self.agente_abeja.cambiar_velocidad(0.5)
+                    elif evento.key == pygame.K_f:
+                        if self.agente_abeja:
+                            self.agente_abeja.saltar_al_final()
+                    
+                    elif evento.key == pygame.K_h:
+                        self.mostrar_mapa_calor = not self.mostrar_mapa_calor
+                        self.redibujo_completo = True
+                        print(f"Mapa de calor: {'Visible' if self.mostrar_mapa_calor else 'Oculto'}")
+                    
+                    elif evento.key == pygame.K_t:
+                        self.guardar_traza_actual()
+                    elif evento.key == pygame.K_l:
+                        self.reproducir_ultima_traza()
+                    
+                    elif evento.key == pygame.K_p:
+                        self.mostrar_perfil = not self.mostrar_perfil
+                        print(f"Perfilador: {'Visible' if self.mostrar_perfil else 'Oculto'}")
+                    elif evento.key == pygame.K_g:
+                        self.perfilador.volcar()
+                    
+                    elif evento.key == pygame.K_LEFT:
+                        self.camara.desplazar(-PASO_DESPLAZAMIENTO, 0)
+                    elif evento.key == pygame.K_RIGHT:
+                        self.camara.desplazar(PASO_DESPLAZAMIENTO, 0)
+                    elif evento.key == pygame.K_UP:
+                        self.camara.desplazar(0, -PASO_DESPLAZAMIENTO)
+                    elif evento.key == pygame.K_DOWN:
+                        self.camara.desplazar(0, PASO_DESPLAZAMIENTO)
 
+            self.perfilador.medir('eventos')
+            
             # Actualizar y dibujar
-            self.actualizar()
+            self.actualizar(dt)
+            self.perfilador.medir('actualizar')
             self.dibujar()
-            self.reloj.tick(FPS)
+            self.perfilador.terminar_frame()
 
-    def actualizar(self):
+    def actualizar(self, dt=1.0 / FPS):
         """Actualiza el estado de todos los objetos del juego."""
         if self.agente_abeja:
-            self.agente_abeja.actualizar()
+            self.agente_abeja.actualizar(dt)
+        if self.enjambre:
+            self.enjambre.actualizar(dt)
 
     def dibujar(self):
-        # 1. Dibuja el mundo
-        self.mundo.dibujar(self.pantalla)
+        # 1. Dibuja el mundo (completo, o solo lo que se ensució desde el frame anterior)
+        if self.camara.version != self.version_camara_dibujada:
+            self.redibujo_completo = True
+            self.version_camara_dibujada = self.camara.version
+        if self.mostrar_mapa_calor:
+            # La capa es semitransparente: hay que repintar el mundo debajo cada frame
+            self.redibujo_completo = True
+        areas = None if self.redibujo_completo else self.rects_frame_anterior
+        rects_actualizados = self.mundo.dibujar(self.pantalla, self.camara, areas)
+        rects_frame = []
+        self.perfilador.medir('mundo')
+        
+        if self.mostrar_mapa_calor:
+            self.mapa_calor.dibujar(self.pantalla, self.camara)
+        self.perfilador.medir('mapa_calor')
 
         # 2. Dibuja la abeja si existe
         if self.agente_abeja:
-            self.agente_abeja.dibujar(self.pantalla)
+            rects_frame.append(self.agente_abeja.dibujar(self.pantalla, self.camara))
+        self.perfilador.medir('abeja')
+        
+        # 2b. Enjambre (un único blits para todas las abejas)
+        if self.enjambre:
+            rects_frame.extend(self.enjambre.dibujar(self.pantalla, self.camara))
+        self.perfilador.medir('enjambre')
 
         # 3. Dibuja UI
-        self.ui_manager.dibujar_instrucciones(self.pantalla, self.estado_seleccion)
+        rects_frame.append(self.ui_manager.dibujar_instrucciones(self.pantalla, self.estado_seleccion))
         
         # 4. Panel de comparación si está activo
         if self.mostrar_panel_comparacion and len(self.comparador.estadisticas) > 0:
-            self.ui_manager.dibujar_panel_comparacion(self.pantalla, self.comparador, self.agente_abeja)
+            rects_frame.append(
+                self.ui_manager.dibujar_panel_comparacion(self.pantalla, self.comparador, self.agente_abeja)
+            )
         
         # 5. Resumen simple si hay estadísticas actuales
         elif self.estadisticas_actuales and not self.mostrar_panel_comparacion:
-            self.ui_manager.dibujar_resumen_simple(
+            rects_frame.append(self.ui_manager.dibujar_resumen_simple(
                 self.pantalla, 
                 self.estadisticas_actuales, 
                 self.ultimo_algoritmo_ejecutado,
                 self.agente_abeja
-            )
+            ))
+        
+        # 5b. Overlay del perfilador
+        if self.mostrar_perfil:
+            rects_frame.append(self.ui_manager.dibujar_perfil(self.pantalla, self.perfilador))
+        self.perfilador.medir('ui')
 
-        # 6. Actualiza toda la pantalla
-        pygame.display.flip()
+        # 6. Actualiza solo las zonas modificadas
+        rects_frame = [rect for rect in rects_frame if rect]
+        pygame.display.update(rects_actualizados + rects_frame)
+        self.rects_frame_anterior = rects_frame
+        self.redibujo_completo = False
+        self.perfilador.medir('display')
 
 if __name__ == "__main__":
     juego = Juego()
     juego.run()
+    juego.imprimir_eventos()
+    obtener_gestor().imprimir_tiempos()
     pygame.quit()
     sys.exit()
\ No newline at end of file
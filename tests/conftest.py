@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Las pruebas importan los paquetes del proyecto y leen assets/ con rutas relativas a la raíz
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
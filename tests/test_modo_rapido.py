@@ -0,0 +1,50 @@
+"""
+Modo rápido con el backend stub: la masa softmax de las clases de flor debe
+dar la misma decisión que interpretar la predicción decodificada.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from vision.registro_modelos import softmax
+from vision.vision_system import VisionSystem
+
+RESPUESTAS = [
+    [{'label': 'daisy', 'score': 0.9}, {'label': 'tabby cat', 'score': 0.05}],
+    [{'label': 'tabby cat', 'score': 0.8}, {'label': 'daisy', 'score': 0.15}],
+    [{'label': 'rose', 'score': 0.5}, {'label': 'tulip', 'score': 0.2}, {'label': 'pot', 'score': 0.1}],
+    [{'label': 'sneaker', 'score': 0.55}, {'label': 'pop bottle', 'score': 0.3}],
+]
+
+
+@pytest.fixture
+def vision():
+    return VisionSystem("stub", usar_prefiltro=False, modo_rapido=True)
+
+
+@pytest.mark.parametrize('respuesta', RESPUESTAS)
+def test_masa_de_flor_coincide_con_interpretar_prediccion(vision, monkeypatch, respuesta):
+    monkeypatch.setattr(vision.image_classifier, 'respuesta', respuesta)
+    vision.resolver_indices_flor()
+    assert vision.usa_modo_rapido()
+
+    pixel_values = vision.image_classifier.preprocesar([Image.new('RGB', (50, 50))])
+    rapido = vision.clasificar_tensor_rapido(pixel_values)[0]
+    completo = vision.interpretar_prediccion(vision.image_classifier(pixel_values))
+
+    masa_flor = sum(r['score'] for r in respuesta if vision._interpretar_prediccion([r])['es_flor'])
+    assert rapido['es_flor'] == completo['es_flor']
+    assert rapido['probabilidad'] == pytest.approx(masa_flor if rapido['es_flor'] else 1.0 - masa_flor,
+                                                   rel=1e-5)
+    assert rapido['etiqueta'] == ('flor' if completo['es_flor'] else 'no flor')
+
+
+def test_lote_da_un_resultado_por_imagen(vision):
+    pixel_values = vision.image_classifier.preprocesar([Image.new('RGB', (50, 50))] * 3)
+    logits = vision.image_classifier.logits(pixel_values)
+    esperado = softmax(logits)[:, vision.indices_flor].sum(axis=1)
+
+    resultados = vision.clasificar_tensor_rapido(pixel_values)
+    assert len(resultados) == 3
+    assert np.allclose([r['probabilidad'] for r in resultados], esperado, rtol=1e-5)
@@ -0,0 +1,82 @@
+"""
+Prefiltro con imágenes que no están en el índice: no debe comportarse como
+una búsqueda de la propia imagen.
+"""
+
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from tests.conftest import RAIZ
+from vision.prefiltro import IndicePrefiltro
+
+OBJETOS = os.path.join(RAIZ, 'assets', 'objects')
+
+
+def copia_de_pantalla(nombre, lado=50):
+    """Un asset como aparece en una celda: reducido y recomprimido (no es el archivo del índice)."""
+    imagen = cv2.imread(os.path.join(OBJETOS, nombre))
+    reducida = cv2.resize(imagen, (lado, lado), interpolation=cv2.INTER_AREA)
+    _, datos = cv2.imencode('.jpg', reducida, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return cv2.imdecode(datos, cv2.IMREAD_COLOR)
+
+
+@pytest.fixture
+def indice_parcial(tmp_path):
+    """Índice con solo flor_1 y lata; flor_2 y tenis quedan fuera."""
+    for nombre in ('flor_1.png', 'lata.png'):
+        shutil.copy(os.path.join(OBJETOS, nombre), tmp_path / nombre)
+    return IndicePrefiltro(str(tmp_path))
+
+
+def test_imagenes_fuera_del_indice_escalan_al_modelo(indice_parcial):
+    for nombre in ('flor_2.png', 'tenis.png'):
+        ruta = os.path.join(OBJETOS, nombre)
+        assert not indice_parcial.es_referencia(ruta)
+        assert indice_parcial.consultar(cv2.imread(ruta)) is None
+
+
+def test_copia_reducida_de_una_referencia_se_resuelve(indice_parcial):
+    resultado = indice_parcial.consultar(copia_de_pantalla('flor_1.png'))
+    assert resultado is not None
+    assert resultado['es_flor']
+    assert resultado['probabilidad'] < 1.0  # No es la referencia exacta
+
+
+def test_copia_en_orden_rgb_da_el_mismo_resultado(indice_parcial):
+    copia = copia_de_pantalla('flor_1.png')
+    rgb = np.ascontiguousarray(copia[:, :, ::-1])
+    assert indice_parcial.consultar(rgb, rgb=True) == indice_parcial.consultar(copia)
+
+
+def test_ruido_escala_al_modelo(indice_parcial):
+    ruido = np.random.default_rng(0).integers(0, 256, (50, 50, 3), dtype=np.uint8)
+    assert indice_parcial.consultar(ruido) is None
+
+
+def test_es_referencia(indice_parcial, tmp_path):
+    assert indice_parcial.es_referencia(str(tmp_path / 'flor_1.png'))
+    assert not indice_parcial.es_referencia(os.path.join(OBJETOS, 'flor_1.png'))
+
+
+def test_assets_de_referencia_no_se_prefiltran_y_el_ahorro_no_es_negativo(monkeypatch):
+    from vision.vision_system import VisionSystem
+
+    monkeypatch.chdir(RAIZ)
+    vision = VisionSystem('stub', instrumentar=False)
+
+    # Solo el prefiltro: sin coste de modelo conocido no se estima ningún ahorro
+    assert vision.clasificar_objeto(copia_de_pantalla('flor_2.png'))['es_flor']
+    resumen = vision.resumen_prefiltro()
+    assert resumen['resueltas'] == 1
+    assert resumen['tiempo_ahorrado'] is None
+
+    # Un asset que es referencia del índice va al modelo, no se busca a sí mismo
+    entrada = vision.preparar_asset(os.path.join('assets', 'objects', 'flor_1.png'))
+    assert entrada['prefiltro'] is None
+    assert entrada['tensor'] is not None
+    vision.clasificar_asset(os.path.join('assets', 'objects', 'flor_1.png'))
+    assert vision.resumen_prefiltro()['tiempo_ahorrado'] >= 0.0
@@ -0,0 +1,89 @@
+"""
+Análisis de la ruta con presupuesto de llamadas al modelo (backend stub, sin
+hilo de precarga): el presupuesto se cobra con lo que costó cada celda y las
+flores se ordenan según la prioridad pedida.
+"""
+
+import random
+
+import pygame
+import pytest
+
+from tests.conftest import RAIZ
+from core.search_algorithms import (analizar_ruta_con_vision, bfs_panal,
+                                    ordenar_flores_por_prioridad, ruta_final_desde_exploracion)
+from game.constants import TAMANO_CELDA
+from game.grid_model import Mundo
+from game.stats_system import EstadisticasAlgoritmo
+from vision.vision_system import VisionSystem
+
+
+@pytest.fixture
+def escenario(monkeypatch):
+    """Mundo aleatorio fijo, su camino BFS y un sistema de visión stub sin prefiltro."""
+    monkeypatch.chdir(RAIZ)
+    pygame.init()
+    random.seed(5)
+    mundo = Mundo(20)
+    libres = [(celda.r, celda.c) for fila in mundo.grid for celda in fila if celda.tipo == 'vacio']
+    camino = bfs_panal(mundo, libres[0], libres[-1])
+    vision = VisionSystem("stub", usar_prefiltro=False)
+    pantalla = pygame.Surface((20 * TAMANO_CELDA, 20 * TAMANO_CELDA))
+    return mundo, camino, vision, pantalla
+
+
+def flores_del_camino(mundo, camino):
+    return [(r, c) for r, c in camino if mundo.grid[r][c].tipo == 'flor']
+
+
+@pytest.mark.parametrize('presupuesto', [1, 2])
+def test_presupuesto_cuenta_solo_las_llamadas_de_cada_celda(escenario, presupuesto):
+    mundo, camino, vision, pantalla = escenario
+    estadisticas = EstadisticasAlgoritmo("BFS")
+
+    # Llamadas ajenas a la búsqueda (como las de la precarga) no gastan presupuesto
+    vision.estadisticas_prefiltro['llamadas_modelo'] += 100
+    analizar_ruta_con_vision(camino, mundo, vision, pantalla, TAMANO_CELDA, estadisticas,
+                             presupuesto_llamadas=presupuesto)
+
+    flores = flores_del_camino(mundo, camino)
+    rutas_analizadas = {mundo.grid[r][c].imagen_original_path
+                        for r, c in flores if (r, c) not in estadisticas.celdas_omitidas}
+    assert estadisticas.origenes['modelo'] == presupuesto
+    assert len(rutas_analizadas) == presupuesto
+    assert estadisticas.celdas_analizadas + len(estadisticas.celdas_omitidas) == len(flores)
+    # Solo se omiten flores cuya imagen no llegó a clasificarse
+    for r, c in estadisticas.celdas_omitidas:
+        assert mundo.grid[r][c].imagen_original_path not in rutas_analizadas
+
+
+def test_sin_presupuesto_no_se_omite_nada(escenario):
+    mundo, camino, vision, pantalla = escenario
+    estadisticas = EstadisticasAlgoritmo("BFS")
+    analizar_ruta_con_vision(camino, mundo, vision, pantalla, TAMANO_CELDA, estadisticas)
+
+    rutas = {mundo.grid[r][c].imagen_original_path for r, c in flores_del_camino(mundo, camino)}
+    assert not estadisticas.celdas_omitidas
+    assert estadisticas.origenes['modelo'] == len(rutas)
+
+
+def test_prioridad_ruta_final_ordena_por_distancia(escenario):
+    mundo, camino, vision, _ = escenario
+    flores = flores_del_camino(mundo, camino)
+    ordenadas = ordenar_flores_por_prioridad(flores, camino, mundo, vision, 'ruta_final')
+
+    ruta_final = ruta_final_desde_exploracion(camino, mundo)
+    distancias = [min(abs(r - rf) + abs(c - cf) for rf, cf in ruta_final) for r, c in ordenadas]
+    assert sorted(ordenadas) == sorted(flores)
+    assert distancias == sorted(distancias)
+
+
+def test_prioridad_no_vistos_pone_primero_una_flor_por_imagen(escenario):
+    mundo, camino, vision, _ = escenario
+    flores = flores_del_camino(mundo, camino)
+    ordenadas = ordenar_flores_por_prioridad(flores, camino, mundo, vision, 'no_vistos')
+
+    rutas = [mundo.grid[r][c].imagen_original_path for r, c in ordenadas]
+    distintas = len(set(rutas))
+    assert sorted(ordenadas) == sorted(flores)
+    assert len(set(rutas[:distintas])) == distintas
@@ -0,0 +1,114 @@
+"""
+Trazas binarias: ida y vuelta del formato (varints, deltas zigzag, padres en
+2 bits, tabla de cadenas) y restauración del mundo guardado en la traza.
+"""
+
+import numpy as np
+import pytest
+
+import core.traza as traza_mod
+from core.search_algorithms import bfs_panal, dfs_panal
+from core.traza import (cargar_traza, codificar_varints, decodificar_varints, guardar_traza,
+                        huella_mundo, leer_huella, reproducir_traza, ruta_final_traza)
+from game.grid_model import CODIGOS_TIPO, InstantaneaMundo, Mundo
+from game.stats_system import EstadisticasAlgoritmo
+
+RUTAS = ('assets/objects/flor_1.png', 'assets/objects/lata.png')
+
+
+def mundo_fijo(N=24, semilla=7):
+    """Instantánea aleatoria pero fija, con obstáculos y flores, sin cargar imágenes."""
+    rng = np.random.default_rng(semilla)
+    sorteo = rng.random((N, N))
+    tipos = np.where(sorteo < 0.2, CODIGOS_TIPO.index('obstaculo'),
+                     np.where(sorteo < 0.35, CODIGOS_TIPO.index('flor'), CODIGOS_TIPO.index('vacio')))
+    tipos[0, 0] = tipos[N - 1, N - 1] = CODIGOS_TIPO.index('vacio')
+    indice_ruta = np.where(tipos == CODIGOS_TIPO.index('flor'), rng.integers(0, len(RUTAS), (N, N)), -1)
+    return InstantaneaMundo(N, tipos, indice_ruta, RUTAS)
+
+
+def estadisticas_de(nombre, mundo, camino, con_vision=True, omitir=0):
+    estadisticas = EstadisticasAlgoritmo(nombre)
+    estadisticas.ruta_completa = camino
+    estadisticas.longitud_ruta = len(camino)
+    estadisticas.tiempo_ejecucion = 0.25
+    estadisticas.tiempo_analisis_vision = 0.125
+    estadisticas.exito = True
+    flores = [pos for pos in camino if mundo.tipo_en(*pos) == 'flor']
+    estadisticas.flores_en_exploracion = len(flores)
+    analizadas = flores[:len(flores) - omitir] if con_vision else []
+    for i, pos in enumerate(analizadas):
+        estadisticas.registrar_celda_analizada(pos, 'flor', i % 3 != 0, ('daisy', 'can')[i % 2],
+                                               0.5, ('alta', 'media')[i % 2], ('modelo', 'cache')[i % 2])
+    for pos in flores[len(flores) - omitir:]:
+        estadisticas.registrar_celda_omitida(pos)
+    return estadisticas
+
+
+def ida_y_vuelta(tmp_path, mundo, estadisticas):
+    ruta_archivo = tmp_path / 'prueba.traza'
+    guardar_traza(str(ruta_archivo), mundo, estadisticas)
+    return cargar_traza(str(ruta_archivo)), ruta_archivo
+
+
+@pytest.mark.parametrize('algoritmo', [bfs_panal, dfs_panal])
+def test_ida_y_vuelta_del_orden_y_la_vision(tmp_path, algoritmo):
+    mundo = mundo_fijo()
+    camino = algoritmo(mundo, (0, 0), (mundo.N - 1, mundo.N - 1))
+    estadisticas = estadisticas_de(algoritmo.__name__, mundo, camino, omitir=2)
+
+    traza, ruta_archivo = ida_y_vuelta(tmp_path, mundo, estadisticas)
+    assert leer_huella(str(ruta_archivo)) == huella_mundo(mundo)
+    assert traza['orden'] == camino
+
+    camino_leido, leidas = reproducir_traza(traza, mundo)
+    assert camino_leido == camino
+    assert leidas.detalles_celdas == estadisticas.detalles_celdas
+    assert leidas.celdas_omitidas == estadisticas.celdas_omitidas
+    assert (leidas.tiempo_ejecucion, leidas.tiempo_analisis_vision) == (0.25, 0.125)
+
+    # Cada paso de la ruta final es entre vecinos y une inicio con meta
+    ruta = ruta_final_traza(traza)
+    assert ruta[0] == camino[0] and ruta[-1] == camino[-1]
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(ruta, ruta[1:]))
+
+
+def test_traza_sin_vision(tmp_path):
+    mundo = mundo_fijo()
+    camino = bfs_panal(mundo, (0, 0), (mundo.N - 1, mundo.N - 1))
+    traza, _ = ida_y_vuelta(tmp_path, mundo, estadisticas_de('BFS', mundo, camino, con_vision=False))
+    assert traza['vision'] == [] and traza['omitidas'] == []
+    assert traza['orden'] == camino
+
+
+def test_traza_de_otro_mundo_no_se_reproduce(tmp_path):
+    mundo = mundo_fijo()
+    camino = bfs_panal(mundo, (0, 0), (mundo.N - 1, mundo.N - 1))
+    traza, _ = ida_y_vuelta(tmp_path, mundo, estadisticas_de('BFS', mundo, camino))
+    assert reproducir_traza(traza, mundo_fijo(semilla=8)) == (None, None)
+
+
+def test_el_mundo_se_restaura_desde_la_traza(tmp_path):
+    mundo = mundo_fijo()
+    camino = dfs_panal(mundo, (0, 0), (mundo.N - 1, mundo.N - 1))
+    traza, _ = ida_y_vuelta(tmp_path, mundo, estadisticas_de('DFS', mundo, camino))
+
+    restaurado = Mundo(traza['N'], InstantaneaMundo(traza['N'], *traza['mundo']))
+    assert huella_mundo(restaurado) == huella_mundo(mundo)
+    assert reproducir_traza(traza, restaurado)[0] == camino
+
+
+@pytest.mark.parametrize('valores', [
+    [0, 1, 127, 128, 129],
+    [2 ** 14 - 1, 2 ** 14, 2 ** 14 + 1, 2 ** 21 - 1, 2 ** 21],
+    [10 ** 6 * 10 ** 6, 2 ** 35, 2 ** 63 - 1, 0],
+])
+def test_varints_en_los_limites(valores):
+    datos = codificar_varints(valores)
+    assert decodificar_varints(datos).tolist() == valores
+    assert codificar_varints([127]) == b'\x7f' and codificar_varints([128]) == b'\x80\x01'
+
+
+def test_deltas_zigzag_con_indices_grandes():
+    indices = [0, 999_999, 3, 10 ** 6 * 1000, 12, 12, 2 ** 40]
+    assert traza_mod._desde_deltas(traza_mod._deltas(indices)).tolist() == indices
@@ -0,0 +1,102 @@
+"""
+Instrumentación por etapas del sistema de visión.
+
+Cada etapa (lectura, prefiltro, ecualización, conversión PIL, preprocesado,
+modelo, interpretación...) acumula sus latencias en un histograma de cubetas
+potencia de dos, y se cuentan aciertos/fallos de cache y llamadas al modelo.
+Con ``activa = False`` cada punto de medida se reduce a una comprobación.
+"""
+
+import threading
+from time import perf_counter_ns
+
+NUM_CUBETAS = 40  # 2^40 ns ≈ 18 minutos
+
+
+class HistogramaLatencia:
+    """Histograma ligero de latencias en nanosegundos (cubetas log2)."""
+
+    def __init__(self):
+        self.cubetas = [0] * NUM_CUBETAS
+        self.cantidad = 0
+        self.total_ns = 0
+        self.minimo_ns = None
+        self.maximo_ns = 0
+
+    def registrar(self, ns):
+        self.cubetas[min(ns.bit_length(), NUM_CUBETAS - 1)] += 1
+        self.cantidad += 1
+        self.total_ns += ns
+        if self.minimo_ns is None or ns < self.minimo_ns:
+            self.minimo_ns = ns
+        if ns > self.maximo_ns:
+            self.maximo_ns = ns
+
+    def percentil(self, p):
+        """Percentil aproximado (límite superior de la cubeta), en ns."""
+        if self.cantidad == 0:
+            return 0
+        objetivo = self.cantidad * p / 100.0
+        acumulado = 0
+        for indice, cuenta in enumerate(self.cubetas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(1 << indice, self.maximo_ns)
+        return self.maximo_ns
+
+    def to_dict(self):
+        media = self.total_ns / self.cantidad if self.cantidad else 0
+        return {
+            'cantidad': self.cantidad,
+            'total_ms': self.total_ns / 1e6,
+            'media_ms': media / 1e6,
+            'min_ms': (self.minimo_ns or 0) / 1e6,
+            'max_ms': self.maximo_ns / 1e6,
+            'p50_ms': self.percentil(50) / 1e6,
+            'p95_ms': self.percentil(95) / 1e6
+        }
+
+
+class InstrumentacionVision:
+    """
+    Registro de latencias por etapa y contadores del sistema de visión.
+    Se puede usar desde varios hilos (la precarga registra en segundo plano).
+    """
+
+    def __init__(self, activa=True):
+        self.activa = activa
+        self.candado = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self.candado:
+            self.etapas = {}  # {nombre_etapa: HistogramaLatencia}
+            self.contadores = {}
+
+    def marca(self):
+        """Instante actual en ns, o 0 si la instrumentación está apagada."""
+        return perf_counter_ns() if self.activa else 0
+
+    def registrar_desde(self, etapa, marca):
+        """Registra en ``etapa`` el tiempo transcurrido desde ``marca``."""
+        if not self.activa:
+            return
+        transcurrido = perf_counter_ns() - marca
+        with self.candado:
+            histograma = self.etapas.get(etapa)
+            if histograma is None:
+                histograma = self.etapas[etapa] = HistogramaLatencia()
+            histograma.registrar(transcurrido)
+
+    def contar(self, contador, cantidad=1):
+        if self.activa:
+            with self.candado:
+                self.contadores[contador] = self.contadores.get(contador, 0) + cantidad
+
+    def instantanea(self):
+        """Copia serializable de todas las etapas y contadores."""
+        with self.candado:
+            return {
+                'etapas': {nombre: h.to_dict() for nombre, h in self.etapas.items()},
+                'contadores': dict(self.contadores)
+            }
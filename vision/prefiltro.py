@@ -0,0 +1,130 @@
+"""
+Prefiltro rápido previo al Vision Transformer.
+
+Calcula un descriptor barato (histograma HSV + pHash) y lo compara con un
+índice de referencias etiquetadas construido a partir de ``assets/objects``.
+Si la imagen se parece claramente a una sola clase se responde sin llamar al
+modelo; en caso contrario se devuelve ``None`` para escalar al ViT.
+
+El prefiltro sirve para imágenes que no son las referencias (celdas
+capturadas de pantalla, copias escaladas o recomprimidas): una referencia
+consultada contra sí misma daría distancia 0, así que quien clasifica un
+archivo comprueba antes ``es_referencia`` y no lo consulta.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+LADO_MINIATURA = 64
+BINS_HSV = [16, 8]  # Matiz, saturación
+
+
+def _normalizar_ruta(ruta):
+    return os.path.normcase(os.path.abspath(ruta))
+
+
+def calcular_histograma_hsv(imagen_bgr):
+    """Histograma H-S normalizado de una imagen BGR."""
+    hsv = cv2.cvtColor(imagen_bgr, cv2.COLOR_BGR2HSV)
+    histograma = cv2.calcHist([hsv], [0, 1], None, BINS_HSV, [0, 180, 0, 256])
+    cv2.normalize(histograma, histograma, alpha=1.0, norm_type=cv2.NORM_L1)
+    return histograma
+
+
+def calcular_phash(imagen_bgr):
+    """Hash perceptual de 64 bits (DCT 32x32 → bloque 8x8 frente a su mediana)."""
+    gris = cv2.cvtColor(imagen_bgr, cv2.COLOR_BGR2GRAY)
+    reducida = cv2.resize(gris, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    bloque = cv2.dct(reducida)[:8, :8].flatten()
+    return bloque > np.median(bloque[1:])
+
+
+def calcular_descriptor(imagen, rgb=False):
+    """
+    Descriptor (histograma, hash) sobre una miniatura de la imagen. Con
+    ``rgb`` la imagen está en orden RGB (p. ej. un corte de ``surfarray``,
+    que puede no ser contiguo): solo se reordena la miniatura.
+    """
+    miniatura = cv2.resize(imagen, (LADO_MINIATURA, LADO_MINIATURA),
+                           interpolation=cv2.INTER_AREA)
+    if rgb:
+        miniatura = cv2.cvtColor(miniatura, cv2.COLOR_RGB2BGR)
+    return calcular_histograma_hsv(miniatura), calcular_phash(miniatura)
+
+
+def distancia_descriptores(a, b):
+    """Distancia en [0, 1]: media de Bhattacharyya (color) y Hamming (forma)."""
+    d_hist = cv2.compareHist(a[0], b[0], cv2.HISTCMP_BHATTACHARYYA)
+    d_hash = np.count_nonzero(a[1] != b[1]) / a[1].size
+    return 0.5 * (d_hist + d_hash)
+
+
+class IndicePrefiltro:
+    """Índice de referencias etiquetadas (flor / no flor) para el prefiltro."""
+
+    def __init__(self, directorio=os.path.join('assets', 'objects'),
+                 umbral_distancia=0.25, margen=0.15):
+        self.directorio = directorio
+        self.umbral_distancia = umbral_distancia  # Distancia máxima a la referencia
+        self.margen = margen  # Separación mínima con la otra clase
+        self.referencias = []  # [(nombre, es_flor, descriptor)]
+        self.rutas_referencia = set()  # Rutas absolutas de las referencias
+        self.construir()
+
+    def construir(self):
+        """Calcula los descriptores de las referencias. Las flores son los 'flor*.png'."""
+        self.referencias = []
+        self.rutas_referencia = set()
+        if not os.path.isdir(self.directorio):
+            print(f"⚠ Prefiltro: no existe el directorio {self.directorio}")
+            return
+
+        for archivo in sorted(os.listdir(self.directorio)):
+            nombre, extension = os.path.splitext(archivo)
+            if extension.lower() not in ('.png', '.jpg', '.jpeg'):
+                continue
+            ruta = os.path.join(self.directorio, archivo)
+            imagen = cv2.imread(ruta)
+            if imagen is None:
+                continue
+            es_flor = nombre.startswith('flor')
+            self.referencias.append((nombre, es_flor, calcular_descriptor(imagen)))
+            self.rutas_referencia.add(_normalizar_ruta(ruta))
+
+    def es_referencia(self, ruta):
+        """Si ``ruta`` es uno de los archivos del índice."""
+        return _normalizar_ruta(ruta) in self.rutas_referencia
+
+    def consultar(self, imagen, rgb=False):
+        """
+        Devuelve un resultado con el formato de ``clasificar_objeto`` si la
+        decisión es segura, o ``None`` si hay que escalar al modelo. La imagen
+        es BGR (OpenCV) o, con ``rgb``, RGB.
+        """
+        if not self.referencias or imagen is None or imagen.size == 0 or imagen.ndim != 3:
+            return None
+
+        descriptor = calcular_descriptor(imagen, rgb)
+        mejor = {True: None, False: None}  # Mejor (distancia, nombre) por clase
+        for nombre, es_flor, referencia in self.referencias:
+            distancia = distancia_descriptores(descriptor, referencia)
+            if mejor[es_flor] is None or distancia < mejor[es_flor][0]:
+                mejor[es_flor] = (distancia, nombre)
+
+        candidatos = [(valor[0], valor[1], clase) for clase, valor in mejor.items() if valor is not None]
+        distancia, nombre, es_flor = min(candidatos)
+        rival = mejor[not es_flor]
+
+        if distancia > self.umbral_distancia:
+            return None
+        if rival is not None and rival[0] - distancia < self.margen:
+            return None
+
+        return {
+            'etiqueta': f"{nombre} (prefiltro)",
+            'probabilidad': float(1.0 - distancia),
+            'es_flor': es_flor,
+            'confianza': 'alta'
+        }
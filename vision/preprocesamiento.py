@@ -0,0 +1,40 @@
+"""
+Preprocesamiento de imágenes compartido por ``VisionSystem`` y ``vision_module``.
+"""
+
+import cv2
+import numpy as np
+
+# Pesos de luminancia (los mismos que usa cv2 para BGR2GRAY), en orden R, G, B
+PESOS_GRIS_RGB = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def ecualizacion_histograma(imagen):
+    """Aplica ecualización del histograma para mejorar la imagen."""
+    if imagen is None or imagen.size == 0:
+        return None
+
+    # Convertir a escala de grises si es necesario
+    if len(imagen.shape) == 3:
+        imagen_gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    else:
+        imagen_gris = imagen
+
+    # Aplicar ecualización
+    return cv2.equalizeHist(imagen_gris)
+
+
+def ecualizacion_histograma_vista_rgb(vista):
+    """
+    Ecualiza un corte de ``pygame.surfarray.pixels3d`` (ejes ancho, alto, RGB).
+
+    El reordenamiento de canales y la transposición van fusionados en el paso
+    a gris, de modo que el corte RGB nunca se copia: la única imagen nueva es
+    la gris que necesita ``equalizeHist``.
+    """
+    if vista is None or vista.size == 0:
+        return None
+
+    gris = np.dot(vista, PESOS_GRIS_RGB)  # (ancho, alto)
+    imagen_gris = np.ascontiguousarray((gris + 0.5).astype(np.uint8).T)
+    return cv2.equalizeHist(imagen_gris)
@@ -0,0 +1,336 @@
+"""
+Registro global de clasificadores de imágenes.
+
+Todos los módulos de visión (``VisionSystem`` y ``vision_module``) obtienen el
+modelo desde aquí, de modo que cada combinación backend/modelo se carga una
+sola vez por proceso y se puede liberar explícitamente.
+"""
+
+import gc
+import importlib
+import os
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image
+
+MODELO_VIT = "google/vit-base-patch16-224"
+
+
+class BackendClasificador:
+    """
+    Interfaz común de los backends.
+
+    Una instancia se comporta como el ``pipeline`` de transformers: recibe una
+    imagen PIL (o una lista) y devuelve una lista de ``{'label', 'score'}``
+    ordenada por score (o una lista de listas para entradas en lote).
+    """
+
+    nombre = "base"
+    soporta_tensores = False  # Si implementa preprocesar/clasificar_tensor
+
+    def __init__(self, modelo=MODELO_VIT):
+        self.modelo = modelo
+
+    def cargar(self):
+        """Carga los pesos. Debe lanzar una excepción si no es posible."""
+        raise NotImplementedError
+
+    def __call__(self, imagenes, top_k=5):
+        raise NotImplementedError
+
+    def preprocesar(self, imagenes):
+        """Convierte una lista de imágenes PIL en el tensor de entrada del modelo."""
+        raise NotImplementedError
+
+    def preprocesar_arreglos(self, arreglos):
+        """
+        Como ``preprocesar`` pero con arreglos uint8 (alto, ancho) en gris o
+        (alto, ancho, 3) en RGB, sin pasar por PIL cuando el backend puede.
+        """
+        return self.preprocesar([Image.fromarray(arreglo).convert('RGB') for arreglo in arreglos])
+
+    def logits(self, pixel_values):
+        """Logits del modelo como arreglo NumPy (lote, clases), sin post-proceso."""
+        raise NotImplementedError
+
+    def etiquetas(self):
+        """Diccionario {índice de clase: etiqueta} del modelo."""
+        raise NotImplementedError
+
+    def clasificar_tensor(self, pixel_values, top_k=5):
+        """Ejecuta el modelo sobre un tensor ya preprocesado (siempre en lote)."""
+        return _top_k_desde_logits(self.logits(pixel_values), self.etiquetas(), top_k)
+
+    def concatenar_tensores(self, tensores):
+        """Une varios tensores de ``preprocesar`` en un único lote."""
+        return np.concatenate(tensores, axis=0)
+
+    def descargar(self):
+        """Libera la memoria ocupada por el modelo."""
+
+
+def _vista_rgb(arreglo):
+    """Un arreglo gris (alto, ancho) visto como (alto, ancho, 3) sin copiarlo."""
+    if arreglo.ndim == 2:
+        return np.broadcast_to(arreglo[:, :, None], arreglo.shape + (3,))
+    return arreglo
+
+
+def softmax(logits):
+    """Softmax por fila, estable numéricamente."""
+    logits = logits - logits.max(axis=1, keepdims=True)
+    probabilidades = np.exp(logits)
+    probabilidades /= probabilidades.sum(axis=1, keepdims=True)
+    return probabilidades
+
+
+def _top_k_desde_logits(logits, id2label, top_k):
+    """Softmax por fila y las ``top_k`` clases en el formato del pipeline."""
+    probabilidades = softmax(logits)
+
+    resultados = []
+    for fila in probabilidades:
+        mejores = np.argsort(fila)[::-1][:top_k]
+        resultados.append([
+            {'label': id2label[int(i)], 'score': float(fila[i])}
+            for i in mejores
+        ])
+    return resultados
+
+
+class BackendPyTorch(BackendClasificador):
+    """ViT servido con el ``pipeline`` de transformers sobre PyTorch."""
+
+    nombre = "pytorch"
+    soporta_tensores = True
+
+    def __init__(self, modelo=MODELO_VIT):
+        super().__init__(modelo)
+        self.pipeline = None
+
+    def cargar(self):
+        from transformers import pipeline
+        self.pipeline = pipeline(task="image-classification", model=self.modelo)
+
+    def __call__(self, imagenes, top_k=5):
+        return self.pipeline(imagenes, top_k=top_k)
+
+    def preprocesar(self, imagenes):
+        return self.pipeline.image_processor(images=imagenes, return_tensors="pt")["pixel_values"]
+
+    def preprocesar_arreglos(self, arreglos):
+        return self.pipeline.image_processor(images=[_vista_rgb(a) for a in arreglos],
+                                             return_tensors="pt")["pixel_values"]
+
+    def concatenar_tensores(self, tensores):
+        import torch
+        return torch.cat(tensores, dim=0)
+
+    def logits(self, pixel_values):
+        import torch
+        with torch.no_grad():
+            logits = self.pipeline.model(pixel_values=pixel_values).logits
+        return logits.float().cpu().numpy()
+
+    def etiquetas(self):
+        return self.pipeline.model.config.id2label
+
+    def descargar(self):
+        self.pipeline = None
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+
+class BackendONNX(BackendClasificador):
+    """
+    ViT exportado a ONNX y ejecutado con onnxruntime.
+
+    La ruta del ``.onnx`` se toma de ``BEE_VIT_ONNX`` o de ``models/``; el
+    preprocesamiento y las etiquetas salen de la configuración de transformers.
+    """
+
+    nombre = "onnx"
+    soporta_tensores = True
+
+    def __init__(self, modelo=MODELO_VIT, ruta_onnx=None):
+        super().__init__(modelo)
+        self.ruta_onnx = ruta_onnx or os.environ.get(
+            "BEE_VIT_ONNX",
+            os.path.join("models", modelo.split("/")[-1] + ".onnx")
+        )
+        self.sesion = None
+        self.procesador = None
+        self.id2label = {}
+
+    def cargar(self):
+        import onnxruntime
+        from transformers import AutoConfig, AutoImageProcessor
+
+        self.sesion = onnxruntime.InferenceSession(self.ruta_onnx)
+        self.procesador = AutoImageProcessor.from_pretrained(self.modelo)
+        self.id2label = AutoConfig.from_pretrained(self.modelo).id2label
+
+    def __call__(self, imagenes, top_k=5):
+        es_lote = isinstance(imagenes, (list, tuple))
+        lote = list(imagenes) if es_lote else [imagenes]
+        resultados = self.clasificar_tensor(self.preprocesar(lote), top_k=top_k)
+        return resultados if es_lote else resultados[0]
+
+    def preprocesar(self, imagenes):
+        return self.procesador(images=imagenes, return_tensors="np")["pixel_values"]
+
+    def preprocesar_arreglos(self, arreglos):
+        return self.procesador(images=[_vista_rgb(a) for a in arreglos], return_tensors="np")["pixel_values"]
+
+    def logits(self, pixel_values):
+        return self.sesion.run(None, {"pixel_values": pixel_values})[0]
+
+    def etiquetas(self):
+        return self.id2label
+
+    def descargar(self):
+        self.sesion = None
+        self.procesador = None
+        gc.collect()
+
+
+class BackendStub(BackendClasificador):
+    """
+    Backend falso para pruebas: no carga pesos y responde siempre lo mismo.
+    La respuesta se puede cambiar con ``BackendStub.respuesta``.
+    """
+
+    nombre = "stub"
+    soporta_tensores = True
+    respuesta = [{'label': 'daisy', 'score': 0.99}]
+    lado_entrada = 224
+
+    def cargar(self):
+        pass
+
+    def __call__(self, imagenes, top_k=5):
+        if isinstance(imagenes, (list, tuple)):
+            return [list(self.respuesta[:top_k]) for _ in imagenes]
+        return list(self.respuesta[:top_k])
+
+    def preprocesar(self, imagenes):
+        # Mismo trabajo que el procesador del ViT: redimensionar y normalizar
+        lado = self.lado_entrada
+        lote = np.stack([
+            np.asarray(imagen.convert("RGB").resize((lado, lado)), dtype=np.float32)
+            for imagen in imagenes
+        ])
+        return ((lote / 255.0 - 0.5) / 0.5).transpose(0, 3, 1, 2)
+
+    def preprocesar_arreglos(self, arreglos):
+        lado = self.lado_entrada
+        lote = np.stack([
+            _vista_rgb(cv2.resize(arreglo, (lado, lado), interpolation=cv2.INTER_LINEAR))
+            for arreglo in arreglos
+        ]).astype(np.float32)
+        return ((lote / 255.0 - 0.5) / 0.5).transpose(0, 3, 1, 2)
+
+    def etiquetas(self):
+        # Las clases de la respuesta más una clase 'otro' con el resto de la masa
+        etiquetas = {i: r['label'] for i, r in enumerate(self.respuesta)}
+        etiquetas[len(self.respuesta)] = 'otro'
+        return etiquetas
+
+    def logits(self, pixel_values):
+        scores = [r['score'] for r in self.respuesta]
+        scores.append(max(1.0 - sum(scores), 1e-9))
+        fila = np.log(np.array(scores, dtype=np.float32))
+        return np.tile(fila, (len(pixel_values), 1))
+
+
+# --- Registro ---
+
+_backends = {
+    BackendPyTorch.nombre: BackendPyTorch,
+    BackendONNX.nombre: BackendONNX,
+    BackendStub.nombre: BackendStub,
+}
+# Backends definidos en otros módulos; se importan (y registran) al pedirlos
+_backends_diferidos = {
+    "servidor": "vision.servidor_inferencia",
+}
+_instancias = {}  # {(backend, modelo): BackendClasificador | _CargaFallida}
+_candado = threading.Lock()
+
+
+class _CargaFallida:
+    """Marca en ``_instancias`` de un modelo que no se pudo cargar."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def registrar_backend(nombre, clase):
+    """Registra una nueva clase de backend bajo ``nombre``."""
+    _backends[nombre] = clase
+
+
+def obtener_clasificador(backend="pytorch", modelo=MODELO_VIT):
+    """
+    Devuelve el clasificador compartido para (backend, modelo), creándolo y
+    cargándolo la primera vez que se pide. Si la carga falla, el error queda
+    registrado y las siguientes llamadas lo relanzan sin reintentar la carga
+    (``descargar_clasificador`` lo borra y permite reintentar).
+    """
+    if backend not in _backends and backend in _backends_diferidos:
+        importlib.import_module(_backends_diferidos[backend])
+    if backend not in _backends:
+        raise ValueError(f"Backend de visión desconocido: {backend}")
+
+    clave = (backend, modelo)
+    with _candado:
+        instancia = _instancias.get(clave)
+        if isinstance(instancia, _CargaFallida):
+            raise instancia.error
+        if instancia is None:
+            instancia = _backends[backend](modelo)
+            try:
+                instancia.cargar()
+            except Exception as e:
+                _instancias[clave] = _CargaFallida(e)
+                raise
+            _instancias[clave] = instancia
+        return instancia
+
+
+def fallo_de_carga(backend="pytorch", modelo=MODELO_VIT):
+    """Error con el que falló la carga de (backend, modelo), o ``None``."""
+    with _candado:
+        instancia = _instancias.get((backend, modelo))
+        return instancia.error if isinstance(instancia, _CargaFallida) else None
+
+
+def descargar_clasificador(backend=None, modelo=MODELO_VIT):
+    """
+    Libera el clasificador de (backend, modelo). Sin ``backend`` se liberan
+    todos los modelos cargados.
+    """
+    with _candado:
+        if backend is None:
+            claves = list(_instancias)
+        else:
+            claves = [(backend, modelo)] if (backend, modelo) in _instancias else []
+
+        for clave in claves:
+            instancia = _instancias.pop(clave)
+            if not isinstance(instancia, _CargaFallida):
+                instancia.descargar()
+
+
+def clasificadores_cargados():
+    """Lista de claves (backend, modelo) actualmente en memoria."""
+    with _candado:
+        return [clave for clave, instancia in _instancias.items()
+                if not isinstance(instancia, _CargaFallida)]
@@ -0,0 +1,303 @@
+"""
+Servidor local de inferencia para compartir un único modelo entre procesos.
+
+El servidor escucha en un socket Unix y es dueño del clasificador. Los
+clientes copian sus imágenes en un bloque de ``multiprocessing.shared_memory``
+y solo envían por el socket el nombre del bloque y las formas; el servidor
+agrupa las peticiones concurrentes en micro-lotes que se ejecutan juntos,
+sin esperar más de ``max_latencia`` desde la primera petición del lote.
+
+Uso:
+    python -m vision.servidor_inferencia --socket /tmp/bee_vision.sock
+
+y en los clientes ``VisionSystem(backend="servidor")`` (la ruta se toma de
+``BEE_VISION_SOCKET``).
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+from PIL import Image
+
+from vision.registro_modelos import (
+    MODELO_VIT, BackendClasificador, obtener_clasificador, registrar_backend
+)
+
+RUTA_SOCKET = os.environ.get("BEE_VISION_SOCKET", "/tmp/bee_vision.sock")
+
+
+def _adjuntar_memoria(nombre):
+    """
+    Abre un bloque creado por otro proceso. El cliente es su dueño, así que
+    se quita del resource_tracker para que el servidor no lo borre al salir.
+    """
+    memoria = shared_memory.SharedMemory(name=nombre)
+    try:
+        resource_tracker.unregister(memoria._name, "shared_memory")
+    except Exception:
+        pass
+    return memoria
+
+
+class _Peticion:
+    """Petición pendiente dentro de la cola de micro-lotes."""
+
+    def __init__(self, imagenes, top_k):
+        self.imagenes = imagenes
+        self.top_k = top_k
+        self.resultados = None
+        self.error = None
+        self.lista = threading.Event()
+
+
+class ServidorInferencia:
+    """Servidor de micro-lotes sobre un socket Unix."""
+
+    def __init__(self, ruta_socket=RUTA_SOCKET, backend="pytorch", modelo=MODELO_VIT,
+                 max_lote=16, max_latencia=0.010):
+        self.ruta_socket = ruta_socket
+        self.backend = backend
+        self.modelo = modelo
+        self.max_lote = max_lote  # Imágenes máximas por lote
+        self.max_latencia = max_latencia  # Segundos de espera para llenar un lote
+        self.cola = queue.Queue()
+        self.clasificador = None
+        self.activo = False
+
+        self.lotes_ejecutados = 0
+        self.imagenes_procesadas = 0
+
+    def iniciar(self):
+        """Carga el modelo y atiende conexiones hasta que se detiene."""
+        self.clasificador = obtener_clasificador(self.backend, self.modelo)
+        self.activo = True
+        threading.Thread(target=self._bucle_lotes, daemon=True).start()
+
+        if os.path.exists(self.ruta_socket):
+            os.unlink(self.ruta_socket)
+
+        with Listener(self.ruta_socket, family="AF_UNIX") as oyente:
+            print(f"✓ Servidor de inferencia escuchando en {self.ruta_socket}")
+            while self.activo:
+                try:
+                    conexion = oyente.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self._atender_cliente, args=(conexion,), daemon=True).start()
+
+    def _atender_cliente(self, conexion):
+        """Recibe peticiones de un cliente, las encola y devuelve su resultado."""
+        with conexion:
+            while True:
+                try:
+                    mensaje = conexion.recv()
+                except (EOFError, OSError):
+                    return
+
+                if mensaje.get("tipo") == "detener":
+                    self.activo = False
+                    conexion.send({"ok": True})
+                    # Despertar al accept() bloqueado para que vea activo=False
+                    Client(self.ruta_socket, family="AF_UNIX").close()
+                    return
+
+                try:
+                    imagenes = self._leer_imagenes(mensaje)
+                except Exception as e:
+                    conexion.send({"error": f"No se pudieron leer las imágenes: {e}"})
+                    continue
+
+                peticion = _Peticion(imagenes, mensaje.get("top_k", 5))
+                self.cola.put(peticion)
+                peticion.lista.wait()
+
+                if peticion.error is not None:
+                    conexion.send({"error": peticion.error})
+                else:
+                    conexion.send({"resultados": peticion.resultados})
+
+    def _leer_imagenes(self, mensaje):
+        """Copia las imágenes del bloque compartido a imágenes PIL propias."""
+        memoria = _adjuntar_memoria(mensaje["memoria"])
+        try:
+            imagenes = []
+            for desplazamiento, forma in mensaje["imagenes"]:
+                vista = np.ndarray(forma, dtype=np.uint8, buffer=memoria.buf, offset=desplazamiento)
+                imagenes.append(Image.fromarray(vista.copy(), "RGB"))
+                del vista
+            return imagenes
+        finally:
+            memoria.close()
+
+    def _bucle_lotes(self):
+        """Junta peticiones hasta ``max_lote`` imágenes o ``max_latencia`` y las ejecuta."""
+        while self.activo:
+            lote = [self.cola.get()]
+            total_imagenes = len(lote[0].imagenes)
+            limite = time.perf_counter() + self.max_latencia
+
+            while total_imagenes < self.max_lote:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    peticion = self.cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                lote.append(peticion)
+                total_imagenes += len(peticion.imagenes)
+
+            self._ejecutar_lote(lote)
+
+    def _ejecutar_lote(self, lote):
+        """Ejecuta el modelo una sola vez para todas las imágenes del lote."""
+        imagenes = [imagen for peticion in lote for imagen in peticion.imagenes]
+        top_k = max(peticion.top_k for peticion in lote)
+
+        try:
+            resultados = self.clasificador(imagenes, top_k=top_k)
+        except Exception as e:
+            for peticion in lote:
+                peticion.error = str(e)
+                peticion.lista.set()
+            return
+
+        self.lotes_ejecutados += 1
+        self.imagenes_procesadas += len(imagenes)
+
+        indice = 0
+        for peticion in lote:
+            cantidad = len(peticion.imagenes)
+            peticion.resultados = [r[:peticion.top_k] for r in resultados[indice:indice + cantidad]]
+            indice += cantidad
+            peticion.lista.set()
+
+
+class ClienteInferencia:
+    """
+    Cliente local del servidor. Se usa igual que el ``pipeline``: recibe una
+    imagen PIL o una lista y devuelve las predicciones en el mismo formato.
+    """
+
+    def __init__(self, ruta_socket=RUTA_SOCKET):
+        self.ruta_socket = ruta_socket
+        self.conexion = Client(ruta_socket, family="AF_UNIX")
+        self.candado = threading.Lock()
+
+    def __call__(self, imagenes, top_k=5):
+        es_lote = isinstance(imagenes, (list, tuple))
+        arreglos = [np.asarray(imagen.convert("RGB"), dtype=np.uint8)
+                    for imagen in (imagenes if es_lote else [imagenes])]
+
+        # Un solo bloque compartido con todas las imágenes una tras otra
+        tamano_total = max(sum(a.nbytes for a in arreglos), 1)
+        memoria = shared_memory.SharedMemory(create=True, size=tamano_total)
+        try:
+            descripcion = []
+            desplazamiento = 0
+            for arreglo in arreglos:
+                destino = np.ndarray(arreglo.shape, dtype=np.uint8, buffer=memoria.buf, offset=desplazamiento)
+                destino[...] = arreglo
+                del destino
+                descripcion.append((desplazamiento, arreglo.shape))
+                desplazamiento += arreglo.nbytes
+
+            with self.candado:
+                self.conexion.send({"memoria": memoria.name, "imagenes": descripcion, "top_k": top_k})
+                respuesta = self.conexion.recv()
+        finally:
+            memoria.close()
+            memoria.unlink()
+
+        if "error" in respuesta:
+            raise RuntimeError(f"Servidor de inferencia: {respuesta['error']}")
+
+        resultados = respuesta["resultados"]
+        return resultados if es_lote else resultados[0]
+
+    def detener_servidor(self):
+        """Pide al servidor que deje de aceptar conexiones."""
+        with self.candado:
+            self.conexion.send({"tipo": "detener"})
+            self.conexion.recv()
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+class BackendServidor(BackendClasificador):
+    """Backend del registro que delega en el servidor de inferencia local."""
+
+    nombre = "servidor"
+
+    def __init__(self, modelo=MODELO_VIT, ruta_socket=RUTA_SOCKET):
+        super().__init__(modelo)
+        self.ruta_socket = ruta_socket
+        self.cliente = None
+
+    def cargar(self):
+        self.cliente = ClienteInferencia(self.ruta_socket)
+
+    def __call__(self, imagenes, top_k=5):
+        return self.cliente(imagenes, top_k=top_k)
+
+    def descargar(self):
+        if self.cliente is not None:
+            self.cliente.cerrar()
+            self.cliente = None
+
+
+registrar_backend(BackendServidor.nombre, BackendServidor)
+
+
+def _ejecutar_servidor(ruta_socket, backend, modelo, max_lote, max_latencia):
+    ServidorInferencia(ruta_socket, backend, modelo, max_lote, max_latencia).iniciar()
+
+
+def iniciar_servidor_en_proceso(ruta_socket=RUTA_SOCKET, backend="pytorch", modelo=MODELO_VIT,
+                                max_lote=16, max_latencia=0.010, espera=60.0):
+    """
+    Lanza el servidor en un proceso hijo y espera a que el socket exista.
+    Devuelve el ``multiprocessing.Process``.
+    """
+    if os.path.exists(ruta_socket):
+        os.unlink(ruta_socket)
+
+    proceso = multiprocessing.Process(
+        target=_ejecutar_servidor,
+        args=(ruta_socket, backend, modelo, max_lote, max_latencia),
+        daemon=True
+    )
+    proceso.start()
+
+    limite = time.time() + espera
+    while not os.path.exists(ruta_socket):
+        if not proceso.is_alive() or time.time() > limite:
+            raise RuntimeError("El servidor de inferencia no pudo iniciarse")
+        time.sleep(0.05)
+    return proceso
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de inferencia ViT")
+    parser.add_argument("--socket", default=RUTA_SOCKET)
+    parser.add_argument("--backend", default="pytorch")
+    parser.add_argument("--modelo", default=MODELO_VIT)
+    parser.add_argument("--max-lote", type=int, default=16)
+    parser.add_argument("--max-latencia-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    ServidorInferencia(
+        ruta_socket=args.socket,
+        backend=args.backend,
+        modelo=args.modelo,
+        max_lote=args.max_lote,
+        max_latencia=args.max_latencia_ms / 1000.0
+    ).iniciar()
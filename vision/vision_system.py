@@ -1,25 +1,102 @@
+import itertools
+import os
+import queue
+import threading
+import time
+
 import cv2
 import numpy as np
 from PIL import Image
-from transformers import pipeline
 import pygame
 
+from core.eventos import obtener_canal
+from vision import preprocesamiento
+from vision.instrumentacion import InstrumentacionVision
+from vision.prefiltro import IndicePrefiltro
+from vision.registro_modelos import descargar_clasificador, obtener_clasificador, softmax
+
+# Prioridades de la cola de precarga (menor = antes)
+PRIORIDAD_URGENTE = 0
+PRIORIDAD_FONDO = 10
+
+# Palabras clave para identificar flores
+PALABRAS_CLAVE_FLORES = [
+    'flower', 'daisy', 'rose', 'sunflower', 'tulip',
+    'plant', 'petal', 'blossom', 'bloom', 'orchid', 'vase'
+]
+
 class VisionSystem:
     """Sistema de visión por computadora para identificar flores en el grid."""
     
-    def __init__(self):
-        """Inicializa el sistema de visión con el modelo ViT."""
+    def __init__(self, backend="pytorch", usar_prefiltro=True, instrumentar=True, modo_rapido=False):
+        """
+        Inicializa el sistema de visión con el modelo ViT.
+        El modelo se obtiene del registro compartido según ``backend``
+        ('pytorch', 'onnx' o 'stub'). Con ``usar_prefiltro`` las imágenes
+        pasan antes por un prefiltro barato y solo las dudosas llegan al ViT.
+        Con ``instrumentar`` se registran latencias por etapa. En
+        ``modo_rapido`` el modelo se ejecuta directamente y ``es_flor`` sale de
+        la masa de probabilidad de las clases de flor, sin decodificar etiquetas.
+        """
+        self.backend = backend
+        # El hilo de precarga registra en sus propios contadores (ver
+        # ``instrumentacion``), así los de cada búsqueda solo miden su trabajo
+        self._hilo_actual = threading.local()
+        self._instrumentacion = InstrumentacionVision(activa=instrumentar)
+        self.instrumentacion_precarga = InstrumentacionVision(activa=instrumentar)
+        self.modo_rapido = modo_rapido
+        self.indices_flor = None  # Clases ImageNet cuyas etiquetas son de flor
         self.image_classifier = None
         self.inicializar_modelo()
         self.cache_clasificaciones = {}  # Cache para evitar reclasificar
+        self.cache_tensores = {}  # {(ruta, mtime): {'prefiltro': ..., 'tensor': ...}}
+        self.cache_resultados_assets = {}  # {(ruta, mtime): resultado}
+        
+        # Precarga especulativa en segundo plano. El hilo de precarga y el
+        # principal comparten el backend, los caches de assets y los contadores
+        # de la cascada: todo eso se toca solo con ``candado_modelo``
+        self.candado_modelo = threading.RLock()
+        self.cola_precarga = queue.PriorityQueue()
+        self.secuencia_precarga = itertools.count()  # Desempate FIFO en la cola
+        self.pendientes_precarga = {}  # {(ruta, mtime): threading.Event}
+        self.origenes_precarga = {}  # {(ruta, mtime): 'prefiltro' o 'modelo'} de lo que resolvió el hilo
+        self.hilo_precarga = None
         
+        # Cascada: prefiltro por histograma/pHash antes del modelo
+        self.prefiltro = IndicePrefiltro() if usar_prefiltro else None
+        self._estadisticas_prefiltro = self.nuevas_estadisticas_prefiltro()
+        self.estadisticas_precarga = self.nuevas_estadisticas_prefiltro()
+    
+    @staticmethod
+    def nuevas_estadisticas_prefiltro():
+        return {
+            'consultas': 0,
+            'resueltas': 0,
+            'escaladas': 0,
+            'tiempo_prefiltro': 0.0,
+            'llamadas_modelo': 0,
+            'tiempo_modelo': 0.0
+        }
+    
+    @property
+    def instrumentacion(self):
+        """Instrumentación del hilo actual: la precarga tiene la suya."""
+        if getattr(self._hilo_actual, 'precarga', False):
+            return self.instrumentacion_precarga
+        return self._instrumentacion
+    
+    @property
+    def estadisticas_prefiltro(self):
+        """Contadores de la cascada del hilo actual: la precarga tiene los suyos."""
+        if getattr(self._hilo_actual, 'precarga', False):
+            return self.estadisticas_precarga
+        return self._estadisticas_prefiltro
+    
     def inicializar_modelo(self):
-        """Carga el modelo Vision Transformer."""
+        """Obtiene el modelo Vision Transformer del registro compartido."""
         try:
-            self.image_classifier = pipeline(
-                task="image-classification",
-                model="google/vit-base-patch16-224"
-            )
+            self.image_classifier = obtener_clasificador(self.backend)
+            self.resolver_indices_flor()
             print("✓ Modelo de visión cargado correctamente")
         except Exception as e:
             print(f"⚠ ERROR: No se pudo inicializar el Vision Transformer.")
@@ -27,19 +104,69 @@ class VisionSystem:
             print(f"   Error: {e}")
             self.image_classifier = None
     
-    def ecualizacion_histograma(self, imagen):
-        """Aplica ecualización del histograma para mejorar la imagen."""
-        if imagen is None or imagen.size == 0:
-            return None
+    def resolver_indices_flor(self):
+        """
+        Resuelve una sola vez qué índices de clase corresponden a las palabras
+        clave de flor, para el modo rápido.
+        """
+        self.indices_flor = None
+        if not self.image_classifier.soporta_tensores:
+            return
+        
+        etiquetas = self.image_classifier.etiquetas()
+        indices = [indice for indice, etiqueta in etiquetas.items()
+                   if any(palabra in etiqueta.lower() for palabra in PALABRAS_CLAVE_FLORES)]
+        self.indices_flor = np.array(sorted(indices), dtype=np.int64)
+    
+    def usa_modo_rapido(self):
+        """Indica si se puede puntuar a nivel de logits con el backend actual."""
+        return (self.modo_rapido and self.image_classifier is not None
+                and self.indices_flor is not None)
+    
+    def clasificar_tensor_rapido(self, pixel_values):
+        """
+        Modo rápido: forward directo y probabilidad de flor como la masa del
+        softmax sobre ``indices_flor``. Devuelve un resultado por imagen del lote.
+        """
+        with self.candado_modelo:
+            marca = self.instrumentacion.marca()
+            logits = self.image_classifier.logits(pixel_values)
+            self.instrumentacion.registrar_desde('modelo', marca)
+        self.instrumentacion.contar('llamadas_modelo', len(logits))
+        
+        marca = self.instrumentacion.marca()
+        probabilidades_flor = softmax(logits)[:, self.indices_flor].sum(axis=1)
+        resultados = []
+        for probabilidad_flor in probabilidades_flor:
+            es_flor = bool(probabilidad_flor >= 0.5)
+            probabilidad = float(probabilidad_flor if es_flor else 1.0 - probabilidad_flor)
             
-        # Convertir a escala de grises si es necesario
-        if len(imagen.shape) == 3:
-            imagen_gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-        else:
-            imagen_gris = imagen
+            if probabilidad >= 0.7:
+                confianza = 'alta'
+            elif probabilidad >= 0.4:
+                confianza = 'media'
+            else:
+                confianza = 'baja'
             
-        # Aplicar ecualización
-        imagen_mejorada = cv2.equalizeHist(imagen_gris)
+            resultados.append({
+                'etiqueta': 'flor' if es_flor else 'no flor',
+                'probabilidad': probabilidad,
+                'es_flor': es_flor,
+                'confianza': confianza
+            })
+        self.instrumentacion.registrar_desde('interpretacion', marca)
+        return resultados
+    
+    def descargar_modelo(self):
+        """Libera el modelo compartido (lo descarga para todo el proceso)."""
+        descargar_clasificador(self.backend)
+        self.image_classifier = None
+    
+    def ecualizacion_histograma(self, imagen):
+        """Aplica ecualización del histograma para mejorar la imagen."""
+        marca = self.instrumentacion.marca()
+        imagen_mejorada = preprocesamiento.ecualizacion_histograma(imagen)
+        self.instrumentacion.registrar_desde('ecualizacion', marca)
         return imagen_mejorada
     
     def capturar_celda_desde_pantalla(self, pantalla, fila, columna, tamano_celda):
@@ -47,6 +174,8 @@ class VisionSystem:
         x = columna * tamano_celda
         y = fila * tamano_celda
         
+        marca = self.instrumentacion.marca()
+        
         # Obtener la superficie de la celda
         celda_surface = pantalla.subsurface((x, y, tamano_celda, tamano_celda))
         
@@ -58,88 +187,616 @@ class VisionSystem:
         # Convertir de RGB a BGR para OpenCV
         imagen_bgr = cv2.cvtColor(imagen_numpy, cv2.COLOR_RGB2BGR)
         
+        self.instrumentacion.registrar_desde('captura_pantalla', marca)
         return imagen_bgr
     
     def capturar_celda_desde_imagen(self, ruta_imagen):
         """Carga una imagen desde disco (para las flores guardadas)."""
         try:
+            marca = self.instrumentacion.marca()
             imagen = cv2.imread(ruta_imagen)
+            self.instrumentacion.registrar_desde('lectura', marca)
             return imagen
         except Exception as e:
             print(f"Error cargando imagen {ruta_imagen}: {e}")
             return None
     
-    def clasificar_objeto(self, imagen):
-        """Clasifica una imagen usando Vision Transformer."""
+    def preparar_asset(self, ruta_imagen):
+        """
+        Devuelve la entrada del cache de assets para una imagen de disco.
+        
+        La primera vez se lee la imagen, se pasa por el prefiltro y, si este
+        no la resuelve, se guarda el tensor listo para el modelo (ecualización,
+        gris→RGB, PIL, redimensionado y normalización ya aplicados). La clave
+        incluye la fecha de modificación, así un asset editado se recalcula.
+        """
+        with self.candado_modelo:
+            return self._preparar_asset(ruta_imagen)
+    
+    def _preparar_asset(self, ruta_imagen):
+        try:
+            clave = (ruta_imagen, os.path.getmtime(ruta_imagen))
+        except OSError as e:
+            print(f"Error cargando imagen {ruta_imagen}: {e}")
+            return None
+        
+        entrada = self.cache_tensores.get(clave)
+        if entrada is not None:
+            self.instrumentacion.contar('cache_assets_aciertos')
+            return entrada
+        self.instrumentacion.contar('cache_assets_fallos')
+        
+        imagen = self.capturar_celda_desde_imagen(ruta_imagen)
+        if imagen is None:
+            return None
+        
+        # Una referencia del prefiltro se encontraría a sí misma: va directa al modelo
+        prefiltrar = not self.es_referencia_prefiltro(ruta_imagen)
+        entrada = {'prefiltro': self.consultar_prefiltro(imagen) if prefiltrar else None, 'tensor': None}
+        
+        if (entrada['prefiltro'] is None and self.image_classifier is not None
+                and self.image_classifier.soporta_tensores):
+            try:
+                imagen_mejorada = self.ecualizacion_histograma(imagen)
+                
+                marca = self.instrumentacion.marca()
+                imagen_pil = Image.fromarray(imagen_mejorada).convert('RGB')
+                self.instrumentacion.registrar_desde('conversion_pil', marca)
+                
+                marca = self.instrumentacion.marca()
+                entrada['tensor'] = self.image_classifier.preprocesar([imagen_pil])
+                self.instrumentacion.registrar_desde('preprocesado', marca)
+            except Exception as e:
+                print(f"Error preprocesando {ruta_imagen}: {e}")
+        
+        self.cache_tensores[clave] = entrada
+        return entrada
+    
+    def precargar_en_segundo_plano(self, mundo):
+        """
+        Encola con prioridad baja la clasificación de todas las imágenes de
+        flores del mundo, para que al buscar los resultados ya estén en cache.
+        
+        Ese trabajo se mide en ``instrumentacion_precarga`` y
+        ``estadisticas_precarga``; cuando una búsqueda usa un resultado del
+        hilo se cuenta en su ``resueltas_por_precarga``.
+        """
+        rutas = {celda.imagen_original_path
+                 for fila in mundo.grid for celda in fila
+                 if celda.tipo == 'flor' and celda.imagen_original_path}
+        
+        if self.hilo_precarga is None or not self.hilo_precarga.is_alive():
+            self.hilo_precarga = threading.Thread(target=self._bucle_precarga, daemon=True)
+            self.hilo_precarga.start()
+        
+        for ruta in sorted(rutas):
+            self._encolar_asset(ruta, PRIORIDAD_FONDO)
+        print(f"✓ {len(rutas)} imágenes de flores encoladas para clasificación en segundo plano")
+    
+    def _clave_asset(self, ruta_imagen):
+        try:
+            return (ruta_imagen, os.path.getmtime(ruta_imagen))
+        except OSError:
+            return None
+    
+    def _encolar_asset(self, ruta_imagen, prioridad):
+        """Encola un asset (o lo adelanta si ya estaba) y devuelve su evento de fin."""
+        clave = self._clave_asset(ruta_imagen)
+        with self.candado_modelo:
+            if clave in self.cache_resultados_assets:
+                # Ya resuelto: un evento suelto, sin registrarlo como pendiente
+                evento = threading.Event()
+                evento.set()
+                return evento
+            evento = self.pendientes_precarga.get(clave)
+            if evento is None:
+                evento = self.pendientes_precarga[clave] = threading.Event()
+        # Una entrada repetida con mayor prioridad adelanta el trabajo; la
+        # original se descarta al salir de la cola porque ya habrá resultado
+        self.cola_precarga.put((prioridad, next(self.secuencia_precarga), ruta_imagen))
+        return evento
+    
+    def _bucle_precarga(self):
+        self._hilo_actual.precarga = True
+        while True:
+            _, _, ruta_imagen = self.cola_precarga.get()
+            clave = self._clave_asset(ruta_imagen)
+            with self.candado_modelo:
+                if clave not in self.cache_resultados_assets:
+                    resultado, origen = self._clasificar_asset_sin_cache(ruta_imagen)
+                    self._guardar_resultado_asset(clave, resultado)
+                    self.origenes_precarga[clave] = origen
+                evento = self.pendientes_precarga.pop(clave, None)
+            if evento is not None:
+                evento.set()
+    
+    def _usar_resultado_precarga(self, clave):
+        """
+        Anota en la instrumentación de quien llama que usa un resultado que
+        calculó el hilo de precarga; devuelve su origen o ``None``.
+        """
+        origen = self.origenes_precarga.pop(clave, None)
+        if origen is not None:
+            self.instrumentacion.contar('resueltas_por_precarga')
+        return origen
+    
+    def _guardar_resultado_asset(self, clave, resultado):
+        if clave is not None and resultado and resultado['etiqueta'] != 'Error_VC':
+            self.cache_resultados_assets[clave] = resultado
+    
+    def clasificar_asset(self, ruta_imagen, origenes=None):
+        """
+        Clasifica una imagen de disco. Si la precarga ya la resolvió se usa ese
+        resultado; si está en la cola, se adelanta y se espera a que termine.
+        Si se pasa ``origenes`` se anota {ruta: origen} con 'cache',
+        'prefiltro' o 'modelo' según lo que costó esta petición.
+        """
+        clave = self._clave_asset(ruta_imagen)
+        resultado = self.cache_resultados_assets.get(clave)
+        origen = 'cache'
+        if resultado is not None:
+            self.instrumentacion.contar('cache_resultados_aciertos')
+            self._usar_resultado_precarga(clave)
+        elif self.hilo_precarga is not None and self.hilo_precarga.is_alive():
+            # Adelantado por esta petición: cuesta lo que le costó al hilo
+            marca = self.instrumentacion.marca()
+            self._encolar_asset(ruta_imagen, PRIORIDAD_URGENTE).wait()
+            self.instrumentacion.registrar_desde('espera_precarga', marca)
+            resultado = self.cache_resultados_assets.get(clave)
+            origen = self._usar_resultado_precarga(clave) or 'modelo'
+        
+        if resultado is None:
+            with self.candado_modelo:
+                resultado, origen = self._clasificar_asset_sin_cache(ruta_imagen)
+                self._guardar_resultado_asset(clave, resultado)
+        if origenes is not None:
+            origenes[ruta_imagen] = origen
+        return resultado
+    
+    def _clasificar_asset_sin_cache(self, ruta_imagen):
+        """
+        Clasifica una imagen de disco partiendo del cache de tensores.
+        Devuelve (resultado, origen).
+        """
+        entrada = self.preparar_asset(ruta_imagen)
+        if entrada is None:
+            return None, 'modelo'
+        if entrada['prefiltro'] is not None:
+            return entrada['prefiltro'], 'prefiltro'
+        if entrada['tensor'] is None:
+            # El backend no trabaja con tensores (p. ej. el servidor): camino completo
+            with self.candado_modelo:
+                return self._clasificar_objeto(self.capturar_celda_desde_imagen(ruta_imagen),
+                                               not self.es_referencia_prefiltro(ruta_imagen))
+        
+        try:
+            inicio = time.perf_counter()
+            if self.usa_modo_rapido():
+                resultado = self.clasificar_tensor_rapido(entrada['tensor'])[0]
+            else:
+                marca = self.instrumentacion.marca()
+                results = self.image_classifier.clasificar_tensor(entrada['tensor'])[0]
+                self.instrumentacion.registrar_desde('modelo', marca)
+                self.instrumentacion.contar('llamadas_modelo')
+                resultado = self.interpretar_prediccion(results)
+            self.estadisticas_prefiltro['tiempo_modelo'] += time.perf_counter() - inicio
+            self.estadisticas_prefiltro['llamadas_modelo'] += 1
+            return resultado, 'modelo'
+        except Exception as e:
+            print(f"Error durante la clasificación: {e}")
+            return {
+                'etiqueta': 'Error_VC',
+                'probabilidad': 0.0,
+                'es_flor': False,
+                'confianza': 'baja'
+            }, 'modelo'
+    
+    def clasificar_assets_lote(self, rutas):
+        """
+        Clasifica varias imágenes de disco con una sola pasada del modelo.
+        
+        Los resultados ya conocidos y los que resuelve el prefiltro no llegan
+        al modelo; el resto de tensores cacheados se apilan en un único lote.
+        Devuelve {ruta: (resultado, origen)} con origen 'cache', 'prefiltro'
+        o 'modelo'.
+        """
+        resultados = {}
+        pendientes = []  # [(ruta, clave, tensor)]
+        
+        with self.candado_modelo:
+            for ruta in rutas:
+                clave = self._clave_asset(ruta)
+                resultado = self.cache_resultados_assets.get(clave)
+                if resultado is not None:
+                    self.instrumentacion.contar('cache_resultados_aciertos')
+                    self._usar_resultado_precarga(clave)
+                    resultados[ruta] = (resultado, 'cache')
+                    continue
+                
+                entrada = self.preparar_asset(ruta)
+                if entrada is None:
+                    continue
+                if entrada['prefiltro'] is not None:
+                    self._guardar_resultado_asset(clave, entrada['prefiltro'])
+                    resultados[ruta] = (entrada['prefiltro'], 'prefiltro')
+                elif entrada['tensor'] is None:
+                    resultado, origen = self._clasificar_asset_sin_cache(ruta)
+                    self._guardar_resultado_asset(clave, resultado)
+                    resultados[ruta] = (resultado, origen)
+                else:
+                    pendientes.append((ruta, clave, entrada['tensor']))
+            
+            if not pendientes:
+                return resultados
+            
+            try:
+                inicio = time.perf_counter()
+                pixel_values = self.image_classifier.concatenar_tensores(
+                    [tensor for _, _, tensor in pendientes])
+                if self.usa_modo_rapido():
+                    lote = self.clasificar_tensor_rapido(pixel_values)
+                else:
+                    marca = self.instrumentacion.marca()
+                    lote_results = self.image_classifier.clasificar_tensor(pixel_values)
+                    self.instrumentacion.registrar_desde('modelo', marca)
+                    self.instrumentacion.contar('llamadas_modelo', len(pendientes))
+                    lote = [self.interpretar_prediccion(results) for results in lote_results]
+                self.estadisticas_prefiltro['tiempo_modelo'] += time.perf_counter() - inicio
+                self.estadisticas_prefiltro['llamadas_modelo'] += len(pendientes)
+            except Exception as e:
+                print(f"Error durante la clasificación: {e}")
+                lote = [{
+                    'etiqueta': 'Error_VC',
+                    'probabilidad': 0.0,
+                    'es_flor': False,
+                    'confianza': 'baja'
+                } for _ in pendientes]
+            
+            for (ruta, clave, _), resultado in zip(pendientes, lote):
+                self._guardar_resultado_asset(clave, resultado)
+                resultados[ruta] = (resultado, 'modelo')
+        
+        return resultados
+    
+    def es_referencia_prefiltro(self, ruta_imagen):
+        """Si la imagen es una de las referencias del índice del prefiltro."""
+        return self.prefiltro is not None and self.prefiltro.es_referencia(ruta_imagen)
+    
+    def consultar_prefiltro(self, imagen, rgb=False):
+        """
+        Primera etapa de la cascada. Devuelve el resultado del prefiltro si es
+        seguro o ``None`` si la imagen (BGR, o RGB con ``rgb``) debe
+        escalarse al modelo.
+        """
+        if self.prefiltro is None:
+            return None
+        
+        inicio = time.perf_counter()
+        marca = self.instrumentacion.marca()
+        resultado = self.prefiltro.consultar(imagen, rgb)
+        self.instrumentacion.registrar_desde('prefiltro', marca)
+        with self.candado_modelo:
+            self.estadisticas_prefiltro['tiempo_prefiltro'] += time.perf_counter() - inicio
+            self.estadisticas_prefiltro['consultas'] += 1
+            
+            if resultado is None:
+                self.estadisticas_prefiltro['escaladas'] += 1
+            else:
+                self.estadisticas_prefiltro['resueltas'] += 1
+        return resultado
+    
+    def resumen_prefiltro(self, desde=None):
+        """
+        Devuelve los contadores de la cascada, con la tasa de escalado y el
+        tiempo de modelo ahorrado estimado. Si se pasa ``desde`` (un resumen
+        anterior) se devuelve solo lo ocurrido a partir de él. El ahorro es
+        ``None`` mientras el modelo no se haya ejecutado nunca (no hay con qué
+        estimar su coste) y nunca es negativo.
+        """
+        with self.candado_modelo:
+            resumen = dict(self.estadisticas_prefiltro)
+        # El coste medio del modelo se estima con todo el historial
+        llamadas = resumen['llamadas_modelo']
+        tiempo_modelo = resumen['tiempo_modelo']
+        if desde:
+            for clave in resumen:
+                resumen[clave] -= desde.get(clave, 0)
+        
+        resumen['tasa_escalado'] = (resumen['escaladas'] / resumen['consultas'] * 100
+                                    if resumen['consultas'] > 0 else 0.0)
+        resumen['tiempo_ahorrado'] = None
+        if llamadas > 0 and tiempo_modelo > 0:
+            tiempo_modelo_promedio = tiempo_modelo / llamadas
+            resumen['tiempo_ahorrado'] = max(0.0, resumen['resueltas'] * tiempo_modelo_promedio
+                                             - resumen['tiempo_prefiltro'])
+        return resumen
+    
+    def clasificar_objeto(self, imagen, usar_prefiltro=True):
+        """
+        Clasifica una imagen en cascada: prefiltro barato y, si no es
+        concluyente, Vision Transformer.
+        """
+        with self.candado_modelo:
+            return self._clasificar_objeto(imagen, usar_prefiltro)[0]
+    
+    def _clasificar_objeto(self, imagen, usar_prefiltro):
+        """``clasificar_objeto`` devolviendo (resultado, origen)."""
+        if usar_prefiltro and imagen is not None and imagen.size > 0:
+            resultado_prefiltro = self.consultar_prefiltro(imagen)
+            if resultado_prefiltro is not None:
+                return resultado_prefiltro, 'prefiltro'
+        
         if self.image_classifier is None or imagen is None or imagen.size == 0:
             return {
                 'etiqueta': 'Clasificador_No_Disponible',
                 'probabilidad': 0.0,
                 'es_flor': False,
                 'confianza': 'baja'
-            }
+            }, 'modelo'
         
         try:
             # Mejorar la imagen primero
             imagen_mejorada = self.ecualizacion_histograma(imagen)
             
             # Convertir a PIL Image en RGB
+            marca = self.instrumentacion.marca()
             if len(imagen_mejorada.shape) == 2:
                 imagen_pil = Image.fromarray(imagen_mejorada).convert('RGB')
             else:
                 imagen_rgb = cv2.cvtColor(imagen_mejorada, cv2.COLOR_BGR2RGB)
                 imagen_pil = Image.fromarray(imagen_rgb)
+            self.instrumentacion.registrar_desde('conversion_pil', marca)
             
-            # Clasificar
-            results = self.image_classifier(imagen_pil)
+            # Clasificar (incluye el preprocesado interno del pipeline)
+            inicio = time.perf_counter()
+            if self.usa_modo_rapido():
+                marca = self.instrumentacion.marca()
+                pixel_values = self.image_classifier.preprocesar([imagen_pil])
+                self.instrumentacion.registrar_desde('preprocesado', marca)
+                resultado = self.clasificar_tensor_rapido(pixel_values)[0]
+            else:
+                marca = self.instrumentacion.marca()
+                results = self.image_classifier(imagen_pil)
+                self.instrumentacion.registrar_desde('modelo', marca)
+                self.instrumentacion.contar('llamadas_modelo')
+                resultado = self.interpretar_prediccion(results)
+            self.estadisticas_prefiltro['tiempo_modelo'] += time.perf_counter() - inicio
+            self.estadisticas_prefiltro['llamadas_modelo'] += 1
             
-            if results and len(results) > 0:
-                etiqueta = results[0]['label'].lower()
-                probabilidad = results[0]['score']
-                
-                # Palabras clave para identificar flores
-                palabras_clave_flores = [
-                    'flower', 'daisy', 'rose', 'sunflower', 'tulip',
-                    'plant', 'petal', 'blossom', 'bloom', 'orchid', 'vase'
-                ]
-
-            
-                
-                es_flor = any(palabra in etiqueta for palabra in palabras_clave_flores)
-                
-                # Determinar nivel de confianza
-                if probabilidad >= 0.7:
-                    confianza = 'alta'
-                elif probabilidad >= 0.4:
-                    confianza = 'media'
-                else:
-                    confianza = 'baja'
-                
-                return {
-                    'etiqueta': etiqueta,
-                    'probabilidad': probabilidad,
-                    'es_flor': es_flor,
-                    'confianza': confianza
-                }
+            return resultado, 'modelo'
             
+        except Exception as e:
+            print(f"Error durante la clasificación: {e}")
             return {
-                'etiqueta': 'Clasificación_Inconclusa',
+                'etiqueta': 'Error_VC',
                 'probabilidad': 0.0,
                 'es_flor': False,
                 'confianza': 'baja'
-            }
+            }, 'modelo'
+    
+    def interpretar_prediccion(self, results):
+        """Convierte la salida del clasificador en el diccionario de resultado."""
+        marca = self.instrumentacion.marca()
+        try:
+            return self._interpretar_prediccion(results)
+        finally:
+            self.instrumentacion.registrar_desde('interpretacion', marca)
+    
+    def _interpretar_prediccion(self, results):
+        if results and len(results) > 0:
+            etiqueta = results[0]['label'].lower()
+            probabilidad = results[0]['score']
             
+            es_flor = any(palabra in etiqueta for palabra in PALABRAS_CLAVE_FLORES)
+            
+            # Determinar nivel de confianza
+            if probabilidad >= 0.7:
+                confianza = 'alta'
+            elif probabilidad >= 0.4:
+                confianza = 'media'
+            else:
+                confianza = 'baja'
+            
+            return {
+                'etiqueta': etiqueta,
+                'probabilidad': probabilidad,
+                'es_flor': es_flor,
+                'confianza': confianza
+            }
+        
+        return {
+            'etiqueta': 'Clasificación_Inconclusa',
+            'probabilidad': 0.0,
+            'es_flor': False,
+            'confianza': 'baja'
+        }
+    
+    def clasificar_celdas_desde_pantalla(self, pantalla, posiciones, tamano_celda, origenes=None):
+        """
+        Clasifica en un solo lote varias celdas capturadas de la pantalla.
+        
+        Se toma una única vista ``surfarray`` de toda la pantalla y cada celda
+        es un corte de esa vista (sin copiar píxeles). Cada corte pasa primero
+        por el prefiltro, como en ``clasificar_objeto``; los que no resuelve se
+        ecualizan (el paso a gris en orden RGB va dentro) y la imagen gris es
+        la entrada del modelo, sin copias PIL ni RGB. Devuelve
+        {(fila, col): resultado}; si se pasa ``origenes`` se rellena con
+        {(fila, col): 'prefiltro' o 'modelo'}.
+        """
+        if not posiciones:
+            return {}
+        
+        resultados = {}
+        pendientes = []  # [((fila, col), imagen gris ecualizada)]
+        vista = pygame.surfarray.pixels3d(pantalla)  # (ancho, alto, 3) en RGB
+        try:
+            for fila, columna in posiciones:
+                x = columna * tamano_celda
+                y = fila * tamano_celda
+                corte = vista[x:x + tamano_celda, y:y + tamano_celda]
+                
+                # El prefiltro trabaja en (alto, ancho): transponer la vista no copia
+                resultado_prefiltro = self.consultar_prefiltro(corte.transpose(1, 0, 2), rgb=True)
+                if resultado_prefiltro is not None:
+                    resultados[(fila, columna)] = resultado_prefiltro
+                    continue
+                
+                marca = self.instrumentacion.marca()
+                pendientes.append(((fila, columna),
+                                   preprocesamiento.ecualizacion_histograma_vista_rgb(corte)))
+                self.instrumentacion.registrar_desde('captura_pantalla', marca)
+        finally:
+            # Liberar la vista (y el último corte) desbloquea la superficie
+            corte = None
+            del vista
+        
+        if origenes is not None:
+            origenes.update((posicion, 'prefiltro') for posicion in resultados)
+            origenes.update((posicion, 'modelo') for posicion, _ in pendientes)
+        if not pendientes:
+            return resultados
+        
+        if self.image_classifier is None:
+            resultados.update((posicion, self.clasificar_objeto(None)) for posicion, _ in pendientes)
+            return resultados
+        
+        imagenes = [imagen for _, imagen in pendientes]
+        try:
+            with self.candado_modelo:
+                inicio = time.perf_counter()
+                if self.image_classifier.soporta_tensores:
+                    marca = self.instrumentacion.marca()
+                    pixel_values = self.image_classifier.preprocesar_arreglos(imagenes)
+                    self.instrumentacion.registrar_desde('preprocesado', marca)
+                    if self.usa_modo_rapido():
+                        lote = self.clasificar_tensor_rapido(pixel_values)
+                    else:
+                        marca = self.instrumentacion.marca()
+                        lote_results = self.image_classifier.clasificar_tensor(pixel_values)
+                        self.instrumentacion.registrar_desde('modelo', marca)
+                        self.instrumentacion.contar('llamadas_modelo', len(imagenes))
+                        lote = [self.interpretar_prediccion(results) for results in lote_results]
+                else:
+                    # Backends sin tensores (p. ej. el servidor) reciben imágenes PIL
+                    marca = self.instrumentacion.marca()
+                    imagenes_pil = [Image.fromarray(imagen).convert('RGB') for imagen in imagenes]
+                    self.instrumentacion.registrar_desde('conversion_pil', marca)
+                    marca = self.instrumentacion.marca()
+                    lote_results = self.image_classifier(imagenes_pil)
+                    self.instrumentacion.registrar_desde('modelo', marca)
+                    self.instrumentacion.contar('llamadas_modelo', len(imagenes))
+                    lote = [self.interpretar_prediccion(results) for results in lote_results]
+                self.estadisticas_prefiltro['tiempo_modelo'] += time.perf_counter() - inicio
+                self.estadisticas_prefiltro['llamadas_modelo'] += len(imagenes)
         except Exception as e:
             print(f"Error durante la clasificación: {e}")
-            return {
+            lote = [{
                 'etiqueta': 'Error_VC',
                 'probabilidad': 0.0,
                 'es_flor': False,
                 'confianza': 'baja'
-            }
+            } for _ in pendientes]
+        
+        resultados.update(zip((posicion for posicion, _ in pendientes), lote))
+        return resultados
+    
+    def analizar_celdas_desde_pantalla(self, mundo, posiciones, pantalla, tamano_celda, origenes=None):
+        """
+        Analiza en lote las celdas que deben capturarse de pantalla y guarda
+        los resultados en el cache de clasificaciones.
+        """
+        pendientes = [(r, c) for r, c in posiciones
+                      if f"{r}_{c}" not in self.cache_clasificaciones]
+        resultados = self.clasificar_celdas_desde_pantalla(pantalla, pendientes, tamano_celda, origenes)
+        for (r, c), resultado in resultados.items():
+            self.cache_clasificaciones[f"{r}_{c}"] = resultado
+        return resultados
+    
+    def consultar_cache_celda(self, mundo, fila, columna, contar=True):
+        """
+        Devuelve el resultado de una celda si ya se conoce (cache de celdas o
+        resultado de su imagen) sin calcular nada; ``None`` en otro caso.
+        Con ``contar`` el acierto cuenta en ``cache_celdas_aciertos`` (los
+        fallos los cuenta quien calcula después la celda).
+        """
+        marca = self.instrumentacion.marca()
+        resultado = self.cache_clasificaciones.get(f"{fila}_{columna}")
+        
+        if resultado is None:
+            celda = mundo.grid[fila][columna]
+            if celda.tipo == 'flor' and celda.imagen_original_path:
+                clave = self._clave_asset(celda.imagen_original_path)
+                resultado = self.cache_resultados_assets.get(clave)
+                if resultado is not None:
+                    self.cache_clasificaciones[f"{fila}_{columna}"] = resultado
+                    if contar:
+                        self._usar_resultado_precarga(clave)
+        
+        if contar:
+            if resultado is not None:
+                self.instrumentacion.contar('cache_celdas_aciertos')
+            self.instrumentacion.registrar_desde('cache_celda', marca)
+        return resultado
+    
+    def analizar_celdas_lote(self, mundo, posiciones, pantalla, tamano_celda, consumo=None):
+        """
+        Analiza varias celdas a la vez: las ya conocidas salen del cache, las
+        flores con imagen se agrupan por asset (cada imagen se clasifica una
+        vez) y el resto se captura de pantalla en un solo lote.
+        Devuelve {(fila, col): (resultado, origen)}. Si se pasa ``consumo``
+        se le suman en 'llamadas_modelo' las imágenes que pasaron por el
+        modelo en este lote.
+        """
+        inicio = time.perf_counter()
+        resultados = {}
+        por_asset = {}  # {ruta: [(fila, col)]}
+        desde_pantalla = []
+        aciertos = 0
+        
+        for fila, columna in posiciones:
+            resultado = self.consultar_cache_celda(mundo, fila, columna)
+            if resultado is not None:
+                resultados[(fila, columna)] = (resultado, 'cache')
+                aciertos += 1
+                continue
+            self.instrumentacion.contar('cache_celdas_fallos')
+            
+            celda = mundo.grid[fila][columna]
+            if celda.tipo == 'flor' and celda.imagen_original_path:
+                por_asset.setdefault(celda.imagen_original_path, []).append((fila, columna))
+            else:
+                desde_pantalla.append((fila, columna))
+        
+        llamadas = 0
+        for ruta, (resultado, origen) in self.clasificar_assets_lote(list(por_asset)).items():
+            llamadas += origen == 'modelo'
+            for fila, columna in por_asset[ruta]:
+                self.cache_clasificaciones[f"{fila}_{columna}"] = resultado
+                resultados[(fila, columna)] = (resultado, origen)
+        
+        if desde_pantalla:
+            origenes = {}
+            lote = self.analizar_celdas_desde_pantalla(mundo, desde_pantalla, pantalla, tamano_celda, origenes)
+            for posicion, resultado in lote.items():
+                resultados[posicion] = (resultado, origenes.get(posicion, 'modelo'))
+            llamadas += sum(1 for origen in origenes.values() if origen == 'modelo')
+        
+        if consumo is not None:
+            consumo['llamadas_modelo'] = consumo.get('llamadas_modelo', 0) + llamadas
+        
+        canal = obtener_canal()
+        if canal.activo('celdas_clasificadas'):
+            canal.publicar('celdas_clasificadas', celdas=len(resultados), desde_cache=aciertos,
+                           assets=len(por_asset), desde_pantalla=len(desde_pantalla),
+                           segundos=time.perf_counter() - inicio)
+        return resultados
     
-    def analizar_celda_del_grid(self, mundo, fila, columna, pantalla, tamano_celda):
-        """Analiza una celda específica del grid y determina si contiene una flor."""
+    def analizar_celda_del_grid(self, mundo, fila, columna, pantalla, tamano_celda, origenes=None):
+        """
+        Analiza una celda específica del grid y determina si contiene una flor.
+        Si se pasa ``origenes`` se anota {(fila, col): origen} con 'cache',
+        'prefiltro' o 'modelo' según lo que costó esta celda.
+        """
         celda = mundo.grid[fila][columna]
         
         # Crear clave única para el cache
@@ -147,19 +804,26 @@ class VisionSystem:
         
         # Si ya la analizamos, devolver resultado del cache
         if cache_key in self.cache_clasificaciones:
+            self.instrumentacion.contar('cache_celdas_aciertos')
+            if origenes is not None:
+                origenes[(fila, columna)] = 'cache'
             return self.cache_clasificaciones[cache_key]
+        self.instrumentacion.contar('cache_celdas_fallos')
         
         resultado = None
         
         # Si la celda tiene una imagen de flor asignada, usarla
         if celda.tipo == 'flor' and celda.imagen_original_path:
-            imagen = self.capturar_celda_desde_imagen(celda.imagen_original_path)
-            if imagen is not None:
-                resultado = self.clasificar_objeto(imagen)
+            origenes_asset = {}
+            resultado = self.clasificar_asset(celda.imagen_original_path, origenes_asset)
+            origen = origenes_asset[celda.imagen_original_path]
         else:
             # Capturar desde la pantalla
             imagen = self.capturar_celda_desde_pantalla(pantalla, fila, columna, tamano_celda)
-            resultado = self.clasificar_objeto(imagen)
+            with self.candado_modelo:
+                resultado, origen = self._clasificar_objeto(imagen, True)
+        if origenes is not None:
+            origenes[(fila, columna)] = origen
         
         # Guardar en cache
         if resultado: